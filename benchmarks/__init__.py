@@ -0,0 +1 @@
+"""Py2D performance benchmarks. Run from the repository root, e.g. python -m benchmarks.bench_vector"""
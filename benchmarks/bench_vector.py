@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Benchmark memory use and hashing speed of Vector and FrozenVector.
+
+Compares the slotted Vector and the FrozenVector against a legacy layout that carries a __dict__ and hashes through string formatting.
+
+	$ python -m benchmarks.bench_vector
+"""
+
+import random
+import timeit
+import tracemalloc
+
+from py2d.Math import Vector, FrozenVector
+
+N = 100000
+
+
+class LegacyVector(Vector):
+	"""Vector with the old per-instance __dict__ and string-based hash, for comparison"""
+
+	def __hash__(self):
+		return hash("%.4f %.4f" % (self.x, self.y))
+
+
+def measure_memory(cls, coords):
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	vectors = [cls(x, y) for x, y in coords]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+
+	return vectors, after - before
+
+
+def measure_hashing(vectors, repeat=5):
+	# building a set and probing it is what boolean operations and FOV do with polygon vertices
+	def run():
+		s = set(vectors)
+		for v in vectors:
+			v in s
+
+	return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+	random.seed(0)
+	coords = [(random.uniform(-1000, 1000), random.uniform(-1000, 1000)) for _ in range(N)]
+
+	print("%d vertices" % N)
+	print("%-14s %12s %12s %14s" % ("class", "memory [MB]", "bytes/vec", "set+probe [s]"))
+
+	for cls in (LegacyVector, Vector, FrozenVector):
+		vectors, mem = measure_memory(cls, coords)
+		t = measure_hashing(vectors)
+		print("%-14s %12.2f %12.1f %14.4f" % (cls.__name__, mem / 1e6, float(mem) / N, t))
+
+
+if __name__ == "__main__":
+	main()
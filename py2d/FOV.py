@@ -51,6 +51,9 @@ class Vision:
 		# convert obstructor line strips to lists of line segments
 		self.obs_segs = flatten_list([ list(zip(strip, strip[1:])) for strip in obstructors ])
 
+		# index obstructor segments once for casting rays, culling by radius and finding segments crossing lines of sight
+		self.obs_bvh = py2d.Math.SegmentBVH(self.obs_segs)
+
 		self.cached_vision = None
 		self.cached_position = None
 		self.cached_radius = None
@@ -87,6 +90,9 @@ class Vision:
 
 		radius_squared = radius * radius
 
+		# the boundary is tested against every candidate point, so index it once
+		prepared_boundary = boundary.prepare()
+
 
 		closest_points = lambda points, reference: sorted(points, key=lambda p: (p - reference).get_length_squared())
 
@@ -106,19 +112,20 @@ class Vision:
 
 			if p not in bpoints:
 				if (eye - p).get_length_squared() > radius_squared: return False
-				if not boundary.contains_point(p): return False
+				if not prepared_boundary.contains_point(p): return False
 
-			for line_segment in obs_segs:
-				if py2d.Math.check_intersect_lineseg_lineseg( eye, p, line_segment[0], line_segment[1]):
-					if line_segment[0] != p and line_segment[1] != p:
-						return False
+			for i in self.obs_bvh.query_lineseg(eye, p):
+				line_segment = self.obs_segs[i]
+				if line_segment[0] != p and line_segment[1] != p and lineseg_in_radius(line_segment):
+					return False
 
 			return True
 
 		def lineseg_in_radius(seg):
 			return py2d.Math.distance_point_lineseg_squared(eye, seg[0], seg[1]) <= radius_squared
 
-		obs_segs = filter(lineseg_in_radius, self.obs_segs)
+		obs_segs = [ self.obs_segs[i] for i in self.obs_bvh.query_box(eye.x - radius, eye.y - radius, eye.x + radius, eye.y + radius)
+		             if lineseg_in_radius(self.obs_segs[i]) ]
 
 		# add all obstruction points and boundary points directly visible from the eye
 		visible_points = list(filter(check_visibility, set(self.obs_points + boundary.points )))
@@ -131,15 +138,11 @@ class Vision:
 
 		# filter boundary_intersection_points to only include visible points
 		# - need extra code here to handle points on obstructors!
-		for line_segment in obs_segs:
-			i = 0
-			while i < len(boundary_intersection_points):
-				p = boundary_intersection_points[i]
-
-				if py2d.Math.distance_point_lineseg_squared(p, line_segment[0], line_segment[1]) > 0.0001 and py2d.Math.check_intersect_lineseg_lineseg(eye, p, line_segment[0], line_segment[1]):
-					boundary_intersection_points.remove(p)
-				else:
-					i+=1
+		def blocks_boundary_point(p, line_segment):
+			return py2d.Math.distance_point_lineseg_squared(p, line_segment[0], line_segment[1]) > 0.0001 and lineseg_in_radius(line_segment)
+
+		boundary_intersection_points = [ p for p in boundary_intersection_points
+		                                 if not any(blocks_boundary_point(p, self.obs_segs[i]) for i in self.obs_bvh.query_lineseg(eye, p)) ]
 
 		visible_points += boundary_intersection_points
 
@@ -154,9 +157,13 @@ class Vision:
 			n = poly.points[ (i+1) % len(poly.points) ]
 
 			# intersect visible point with obstructors and boundary polygon
-			intersections = set(py2d.Math.intersect_linesegs_ray(obs_segs, eye, c) + py2d.Math.intersect_poly_ray(boundary.points, eye, c))
+			accept = lambda ip, seg_index=None, c=c: ip != c and prepared_boundary.contains_point(ip)
+
+			intersections = [ip for ip in set(py2d.Math.intersect_poly_ray(boundary.points, eye, c)) if accept(ip)]
 
-			intersections = [ip for ip in intersections if ip != c and boundary.contains_point(ip)]
+			# only the closest obstructor intersection matters
+			hit = self.obs_bvh.cast_ray(eye, c, accept)
+			if hit: intersections.append(hit[0])
 
 
 			if self.debug: self.debug_points.extend([(pt, 0x00FF00) for pt in intersections])
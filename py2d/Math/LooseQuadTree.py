@@ -0,0 +1,211 @@
+import math
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import clip_ray_box, clip_lineseg_box, lineseg_boxes
+from py2d.Math.SpatialIndex import SpatialIndex
+
+class LooseQuadTree(SpatialIndex):
+	"""Loose quadtree for objects of very different sizes.
+
+	The square root node covers the bounds of the tree and every node is split into four quadrants. In a loose quadtree, each
+	node accepts objects whose center lies in the node and that are at most as large as the node itself, so the objects stick
+	out of the node by at most half its size. An object is stored in the smallest node that accepts it. Its depth only depends
+	on its size, so large objects stay near the root and small objects sink down without ever being split or duplicated.
+
+	Nodes are stored in a dict by (depth, x, y) and only exist while they or one of their descendants hold objects.
+	Objects are referred to by integer handles that are handed out by L{insert}. Objects whose center lies outside of the
+	bounds of the tree or that are larger than the tree are kept in a separate set that is checked by every query.
+
+	The tree can be passed as the index argument of L{intersect_linesegs_lineseg} and L{intersect_linesegs_ray} if it was
+	created from the same segment list with L{from_linesegs}. It is a standalone index for applications that move many
+	objects of mixed sizes: the static obstructors of L{py2d.FOV.Vision} are kept in a L{SegmentBVH}, and boolean operations
+	find their candidate edges with L{sweep_overlapping_pairs}.
+
+		>>> tree = LooseQuadTree((0, 0, 100, 100))
+		>>> wall = tree.insert((Vector(0, 50), Vector(100, 50)))
+		>>> crate = tree.insert(Vector(80, 80), (79, 79, 81, 81))
+		>>> tree.query_box(70, 70, 90, 90)
+		[1]
+		>>> tree.query_ray(Vector(80, 200), Vector(80, 199))
+		[0, 1]
+		>>> tree.stats['objects_per_depth'][:6]
+		[1, 0, 0, 0, 0, 1]
+	"""
+
+	def __init__(self, bounds, max_depth=8):
+		"""Create a new, empty loose quadtree.
+
+		@type bounds: tuple
+		@param bounds: The (left, top, right, bottom) box that the tree should cover. The root node is a square around it.
+
+		@type max_depth: int
+		@param max_depth: The depth of the smallest nodes
+		"""
+
+		SpatialIndex.__init__(self)
+
+		left, top, right, bottom = bounds
+		self.size = float(max(right - left, bottom - top, EPSILON))
+		self.left, self.top = float(left), float(top)
+		self.max_depth = max_depth
+
+		# (depth, x, y) -> set of handles stored in the node
+		self.nodes = {}
+
+		# (depth, x, y) -> number of objects stored in the node and all of its descendants
+		self.counts = {}
+
+		self.outside = set()
+		self.locations = {}
+
+	@staticmethod
+	def from_linesegs(segs, bounds=None, max_depth=8):
+		"""Create a tree from a list of line segments, so that the handle of every segment is its index in the list.
+
+		@type segs: List
+		@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+
+		@type bounds: tuple
+		@param bounds: The (left, top, right, bottom) box that the tree should cover. By default, the bounds of the segments.
+		"""
+
+		segs = list(segs)
+		if bounds is None:
+			boxes = lineseg_boxes(segs) or [(0, 0, 1, 1)]
+			# pad the far sides, since segments centered on them would otherwise end up outside of the tree
+			bounds = (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes) + EPSILON, max(b[3] for b in boxes) + EPSILON)
+
+		tree = LooseQuadTree(bounds, max_depth)
+		for seg in segs: tree.insert(seg)
+		return tree
+
+	def _node_size(self, depth):
+		return self.size / (1 << depth)
+
+	def _loose_box(self, node):
+		depth, x, y = node
+		s = self._node_size(depth)
+		left, top = self.left + x * s, self.top + y * s
+		return (left - s * 0.5, top - s * 0.5, left + s * 1.5, top + s * 1.5)
+
+	def _locate(self, box):
+		"""Find the node that an object with the given box belongs to, or None if its center is outside of the tree"""
+
+		cx, cy = (box[0] + box[2]) * 0.5, (box[1] + box[3]) * 0.5
+		fx, fy = (cx - self.left) / self.size, (cy - self.top) / self.size
+		if not (0 <= fx < 1 and 0 <= fy < 1): return None
+
+		# objects larger than the root would stick out of its loose box
+		extent = max(box[2] - box[0], box[3] - box[1])
+		if extent > self.size: return None
+
+		# the deepest node that is still at least as large as the object
+		depth = self.max_depth if extent <= 0 else min(self.max_depth, int(math.floor(math.log(self.size / extent, 2))))
+		while depth > 0 and extent > self._node_size(depth): depth -= 1
+
+		n = 1 << depth
+		return (depth, min(int(fx * n), n - 1), min(int(fy * n), n - 1))
+
+	def _ancestors(self, node):
+		depth, x, y = node
+		while depth >= 0:
+			yield (depth, x, y)
+			depth, x, y = depth - 1, x >> 1, y >> 1
+
+	def _add(self, handle, box):
+		node = self._locate(box)
+		self.locations[handle] = node
+
+		if node is None:
+			self.outside.add(handle)
+			return
+
+		self.nodes.setdefault(node, set()).add(handle)
+		for n in self._ancestors(node):
+			self.counts[n] = self.counts.get(n, 0) + 1
+
+	def _discard(self, handle):
+		node = self.locations.pop(handle)
+
+		if node is None:
+			self.outside.discard(handle)
+			return
+
+		objects = self.nodes[node]
+		objects.discard(handle)
+		if not objects: del self.nodes[node]
+
+		for n in self._ancestors(node):
+			self.counts[n] -= 1
+			if not self.counts[n]: del self.counts[n]
+
+	def _moved(self, handle, box):
+		return self._locate(box) != self.locations[handle]
+
+	def _search(self, box, box_test):
+		"""Collect the handles of all objects whose boxes pass box_test, descending only into nodes whose loose boxes pass it"""
+
+		out = [ h for h in self.outside if box_test(self.boxes[h]) ]
+
+		stack = [(0, 0, 0)] if (0, 0, 0) in self.counts else []
+		while stack:
+			node = stack.pop()
+			if not box_test(self._loose_box(node)): continue
+
+			out.extend(h for h in self.nodes.get(node, ()) if box_test(self.boxes[h]))
+
+			depth, x, y = node
+			for child in ((depth + 1, 2 * x, 2 * y), (depth + 1, 2 * x + 1, 2 * y), (depth + 1, 2 * x, 2 * y + 1), (depth + 1, 2 * x + 1, 2 * y + 1)):
+				if child in self.counts: stack.append(child)
+
+		out.sort()
+		return out
+
+	def query_lineseg(self, p1, p2):
+		"""Find all objects whose bounding boxes are crossed by the line segment p1, p2
+
+		@return: A sorted list of handles
+		"""
+		def box_test(b):
+			return clip_lineseg_box(p1, p2, _padded(b)) is not None
+
+		return self._search(None, box_test)
+
+	def query_ray(self, p1, p2):
+		"""Find all objects whose bounding boxes are crossed by the ray starting at p1 and passing through p2
+
+		@return: A sorted list of handles
+		"""
+		def box_test(b):
+			return clip_ray_box(p1, p2, _padded(b)) is not None
+
+		return self._search(None, box_test)
+
+	def get_stats(self):
+		"""Get statistics about the shape of the tree for tuning its bounds and maximum depth.
+
+		@return: A dict with the number of objects, objects outside of the bounds, occupied nodes and the deepest occupied depth, as well as lists of object and node counts per depth.
+		"""
+
+		objects_per_depth = [0] * (self.max_depth + 1)
+		nodes_per_depth = [0] * (self.max_depth + 1)
+		for (depth, x, y), objects in self.nodes.items():
+			objects_per_depth[depth] += len(objects)
+			nodes_per_depth[depth] += 1
+
+		return {
+			'objects': len(self.objects),
+			'outside': len(self.outside),
+			'nodes': len(self.nodes),
+			'depth': max(depth for depth, x, y in self.nodes) if self.nodes else None,
+			'max_objects_per_node': max(len(objects) for objects in self.nodes.values()) if self.nodes else 0,
+			'objects_per_depth': objects_per_depth,
+			'nodes_per_depth': nodes_per_depth,
+		}
+
+	stats = property(get_stats)
+
+
+def _padded(box):
+	# boxes of axis-parallel segments are flat, pad them so that lines through their edges are not lost to rounding
+	return (box[0] - EPSILON, box[1] - EPSILON, box[2] + EPSILON, box[3] + EPSILON)
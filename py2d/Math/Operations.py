@@ -1,7 +1,16 @@
 import math
+import bisect
 
 from py2d.Math.Vector import *
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# lists of line segments at least this long are intersected with the NumPy batch kernels
+BATCH_MIN_SEGMENTS = 64
+
 def __intersect_line_line_u(p1, p2, q1, q2):
 
 	d = (q2.y - q1.y) * (p2.x - p1.x) - (q2.x - q1.x) * (p2.y - p1.y)
@@ -121,7 +130,7 @@ def intersect_lineseg_ray(p1, p2, q1, q2):
 
 	return Vector(p1.x + ll[0] * (p2.x - p1.x) , p1.y + ll[0] * (p2.y - p1.y) )
 
-def intersect_linesegs_ray(segs, p1, p2):
+def intersect_linesegs_ray(segs, p1, p2, index=None):
 	"""Intersect a list of line segments and a ray
 
 	@type segs: List
@@ -133,8 +142,19 @@ def intersect_linesegs_ray(segs, p1, p2):
 	@type p2: Vector
 	@param p2: The second point on the ray
 
+	@type index: SegmentBVH or SpatialHashGrid
+	@param index: Optional spatial index over segs. Only the segments returned by its query_ray method are intersected.
+
 	@return: The list of intersections or an empty list
 	"""
+	if index is not None: segs = [ segs[i] for i in index.query_ray(p1, p2) ]
+	else: segs = list(segs)
+
+	if numpy is not None and len(segs) >= BATCH_MIN_SEGMENTS:
+		a, b = linesegs_to_arrays(segs)
+		u_a, u_b, points, hit = batch_intersect_lineseg_ray(a, b, (p1.x, p1.y), (p2.x, p2.y))
+		return [ Vector(x, y) for x, y in points[hit].tolist() ]
+
 	intersect_points = []
 
 	for line_segment in segs:
@@ -145,7 +165,7 @@ def intersect_linesegs_ray(segs, p1, p2):
 
 	return intersect_points
 
-def intersect_linesegs_lineseg(segs, p1, p2):
+def intersect_linesegs_lineseg(segs, p1, p2, index=None):
 	"""Intersect a list of line segments and a line segment
 
 	@type segs: List
@@ -157,8 +177,22 @@ def intersect_linesegs_lineseg(segs, p1, p2):
 	@type p2: Vector
 	@param p2: The second point on the line segment
 
+	@type index: SegmentBVH or SpatialHashGrid
+	@param index: Optional spatial index over segs. Only the segments returned by its query_lineseg method are intersected.
+
 	@return: The list of intersections or an empty list
 	"""
+	if index is not None: segs = [ segs[i] for i in index.query_lineseg(p1, p2) ]
+	else: segs = list(segs)
+
+	if numpy is not None and len(segs) >= BATCH_MIN_SEGMENTS:
+		a, b = linesegs_to_arrays(segs)
+		u_a, u_b, points, hit = batch_intersect_lineseg_lineseg(a, b, (p1.x, p1.y), (p2.x, p2.y))
+
+		# drop intersections of segments that end in p2
+		hit &= ~(numpy.all(numpy.abs(a - (p2.x, p2.y)) < EPSILON, axis=1) | numpy.all(numpy.abs(b - (p2.x, p2.y)) < EPSILON, axis=1))
+		return [ Vector(x, y) for x, y in points[hit].tolist() ]
+
 	intersect_points = []
 
 	for line_segment in segs:
@@ -194,11 +228,184 @@ def intersect_linesegs_linesegs(segs1, segs2):
 
 	@return: The list of intersections or an empty list
 	"""
-	intersect_points = []
-	for ls1 in segs1:
-		intersect_points += intersect_linesegs_lineseg(segs2, ls1[0], ls1[1])
+	segs1, segs2 = list(segs1), list(segs2)
 
-	return intersect_points
+	# intersect_linesegs_lineseg(segs2, ls1[0], ls1[1]) for every ls1, so segs2 is the first argument of intersect_lineseg_lineseg
+	intersections = intersect_linesegs_linesegs_indexed(segs2, segs1)
+	intersections.sort(key=lambda ijp: (ijp[1], ijp[0]))
+
+	return [ p for j, i, p in intersections if segs2[j][0] != segs1[i][1] and segs2[j][1] != segs1[i][1] ]
+
+def intersect_linesegs_linesegs_indexed(segs1, segs2):
+	"""Find all intersections between two lists of line segments.
+
+	Only pairs of segments with overlapping bounding boxes are tested. They are found by sweeping over the segments in order of their left x coordinate,
+	so the cost depends on the number of segments and overlapping pairs instead of the product of the list lengths.
+
+	@type segs1: List
+	@param segs1: The first list of line segments, i.e. a list of 2-tuples of vectors
+
+	@type segs2: List
+	@param segs2: The second list of line segments, i.e. a list of 2-tuples of vectors
+
+	@return: A list of (i, j, point) tuples ordered by i and j, where point is intersect_lineseg_lineseg(segs1[i][0], segs1[i][1], segs2[j][0], segs2[j][1])
+	"""
+
+	out = []
+	for i, j in sweep_overlapping_pairs(lineseg_boxes(segs1), lineseg_boxes(segs2)):
+		p = intersect_lineseg_lineseg(segs1[i][0], segs1[i][1], segs2[j][0], segs2[j][1])
+		if p: out.append((i, j, p))
+
+	out.sort(key=lambda ijp: (ijp[0], ijp[1]))
+	return out
+
+def lineseg_boxes(segs):
+	"""Get the bounding boxes of a list of line segments as (left, top, right, bottom) tuples, like Polygon.bounding_box"""
+	out = []
+	for a, b in segs:
+		x_min, x_max = (a.x, b.x) if a.x < b.x else (b.x, a.x)
+		y_min, y_max = (a.y, b.y) if a.y < b.y else (b.y, a.y)
+		out.append((x_min, y_min, x_max, y_max))
+	return out
+
+def clip_ray_box(p1, p2, box):
+	"""Clip a ray to an axis-aligned box.
+
+	@type p1: Vector
+	@param p1: The starting point of the ray
+
+	@type p2: Vector
+	@param p2: The second point on the ray
+
+	@type box: tuple
+	@param box: The box as a (left, top, right, bottom) tuple
+
+	@return: The ray parameters (t_enter, t_leave) of the part of the ray p1 + t * (p2 - p1) inside the box, or None if the ray misses the box
+	"""
+
+	t_enter, t_leave = 0.0, float('inf')
+	for o, d, lo, hi in ((p1.x, p2.x - p1.x, box[0], box[2]), (p1.y, p2.y - p1.y, box[1], box[3])):
+		if d == 0:
+			if o < lo or o > hi: return None
+		else:
+			t0, t1 = float(lo - o) / d, float(hi - o) / d
+			if t0 > t1: t0, t1 = t1, t0
+			if t0 > t_enter: t_enter = t0
+			if t1 < t_leave: t_leave = t1
+
+	if t_enter > t_leave: return None
+	return (t_enter, t_leave)
+
+def clip_lineseg_box(p1, p2, box):
+	"""Clip a line segment to an axis-aligned box.
+
+	@type box: tuple
+	@param box: The box as a (left, top, right, bottom) tuple
+
+	@return: The segment parameters (t_enter, t_leave) of the part of the segment p1 + t * (p2 - p1) inside the box, or None if the segment misses the box
+	"""
+
+	t = clip_ray_box(p1, p2, box)
+	if t is None or t[0] > 1: return None
+	return (t[0], min(t[1], 1.0))
+
+def distance_point_box_squared(p, box):
+	"""Get the squared distance from a point to an axis-aligned box given as a (left, top, right, bottom) tuple. Points inside the box have a distance of 0."""
+	dx = max(box[0] - p.x, 0, p.x - box[2])
+	dy = max(box[1] - p.y, 0, p.y - box[3])
+	return dx * dx + dy * dy
+
+def sweep_overlapping_pairs(boxes1, boxes2=None):
+	"""Find all pairs of overlapping boxes from two lists of boxes.
+
+	The boxes are swept from left to right. Every box is only compared to the boxes of the other list whose x interval is still open when it starts.
+	Boxes that touch at their boundaries count as overlapping.
+
+	@type boxes1: List
+	@param boxes1: List of (left, top, right, bottom) tuples
+
+	@type boxes2: List
+	@param boxes2: List of (left, top, right, bottom) tuples. If None, the overlapping pairs within boxes1 are found instead.
+
+	@return: A list of index pairs (i, j) so that boxes1[i] and boxes2[j] overlap, in no particular order. Without boxes2, pairs (i, j) with i < j so that boxes1[i] and boxes1[j] overlap.
+	"""
+
+	if boxes2 is None: return _sweep_overlapping_pairs_self(boxes1)
+
+	events = [ (b[0], 0, i) for i, b in enumerate(boxes1) ] + [ (b[0], 1, j) for j, b in enumerate(boxes2) ]
+	events.sort()
+
+	boxes = (boxes1, boxes2)
+	active = ([], [])
+
+	pairs = []
+	for x_min, side, i in events:
+		_, y_min, _, y_max = boxes[side][i]
+
+		other_boxes = boxes[1 - side]
+		still_active = []
+		for j in active[1 - side]:
+			o = other_boxes[j]
+			if o[2] < x_min: continue
+
+			still_active.append(j)
+			if o[1] <= y_max and o[3] >= y_min:
+				pairs.append((i, j) if side == 0 else (j, i))
+
+		active[1 - side][:] = still_active
+		active[side].append(i)
+
+	return pairs
+
+def _sweep_overlapping_pairs_self(boxes):
+	order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+
+	active = []
+	pairs = []
+	for i in order:
+		x_min, y_min, _, y_max = boxes[i]
+
+		still_active = []
+		for j in active:
+			o = boxes[j]
+			if o[2] < x_min: continue
+
+			still_active.append(j)
+			if o[1] <= y_max and o[3] >= y_min:
+				pairs.append((i, j) if i < j else (j, i))
+
+		still_active.append(i)
+		active = still_active
+
+	return pairs
+
+def morton_order(boxes):
+	"""Sort boxes along a Z-order (Morton) curve through their centers, so that boxes that are close in the resulting order are also close in the plane.
+
+	@type boxes: List
+	@param boxes: List of (left, top, right, bottom) tuples
+
+	@return: A list of indices into boxes
+	"""
+
+	if not boxes: return []
+
+	centers = [ ((b[0] + b[2]) * 0.5, (b[1] + b[3]) * 0.5) for b in boxes ]
+	x_min, x_max = min(c[0] for c in centers), max(c[0] for c in centers)
+	y_min, y_max = min(c[1] for c in centers), max(c[1] for c in centers)
+
+	# quantize the centers to 16 bits per axis
+	scale = 0xFFFF / max(x_max - x_min, y_max - y_min, EPSILON)
+
+	def spread(v):
+		v = (v | (v << 8)) & 0x00FF00FF
+		v = (v | (v << 4)) & 0x0F0F0F0F
+		v = (v | (v << 2)) & 0x33333333
+		v = (v | (v << 1)) & 0x55555555
+		return v
+
+	codes = [ spread(int((x - x_min) * scale)) | (spread(int((y - y_min) * scale)) << 1) for x, y in centers ]
+	return sorted(range(len(boxes)), key=codes.__getitem__)
 
 def intersect_lineseg_lineseg(p1, p2, q1, q2):
 	"""Intersect two line segments
@@ -229,6 +436,74 @@ def intersect_lineseg_lineseg(p1, p2, q1, q2):
 
 	return Vector(p1.x + ll[0] * (p2.x - p1.x) , p1.y + ll[0] * (p2.y - p1.y) )
 
+def linesegs_to_arrays(segs):
+	"""Convert a list of line segments to two (N,2) NumPy arrays of start and end points"""
+	a = numpy.array([ (s[0].x, s[0].y, s[1].x, s[1].y) for s in segs ], dtype=float).reshape(-1, 4)
+	return a[:, 0:2], a[:, 2:4]
+
+def batch_intersect_line_line_u(p1, p2, q1, q2):
+	"""Vectorized version of the line parameter computation for many pairs of lines.
+
+	The arguments are NumPy arrays of points with shapes that broadcast against each other, e.g. (N,2) arrays for N pairs of lines,
+	(N,2) arrays and (2,) points to intersect N lines with one line, or (N,1,2) and (1,M,2) arrays to intersect all pairs of N and M lines.
+
+	@return: A tuple (u_a, u_b, parallel) of arrays with the parameters of the intersection point along p and q, and a mask of parallel lines for which the parameters are undefined.
+	"""
+
+	if numpy is None: raise ImportError("Batch intersections require NumPy")
+
+	p1, p2, q1, q2 = (numpy.asarray(v, dtype=float) for v in (p1, p2, q1, q2))
+
+	pd = p2 - p1
+	qd = q2 - q1
+	pq = p1 - q1
+
+	d = qd[..., 1] * pd[..., 0] - qd[..., 0] * pd[..., 1]
+	n1 = qd[..., 0] * pq[..., 1] - qd[..., 1] * pq[..., 0]
+	n2 = pd[..., 0] * pq[..., 1] - pd[..., 1] * pq[..., 0]
+
+	parallel = d == 0
+	d = numpy.where(parallel, 1.0, d)
+
+	return n1 / d, n2 / d, parallel
+
+def batch_intersect_lineseg_lineseg(p1, p2, q1, q2):
+	"""Intersect many pairs of line segments at once.
+
+	This computes the same results as L{intersect_lineseg_lineseg}, including its bounding box early-outs, for all pairs using NumPy broadcasting.
+	See L{batch_intersect_line_line_u} for the accepted argument shapes.
+
+	@return: A tuple (u_a, u_b, points, hit) of arrays. points holds the intersection points computed along p, and the boolean mask hit tells which pairs actually intersect.
+	"""
+
+	u_a, u_b, parallel = batch_intersect_line_line_u(p1, p2, q1, q2)
+	p1, p2, q1, q2 = (numpy.asarray(v, dtype=float) for v in (p1, p2, q1, q2))
+
+	hit = ~parallel
+	hit &= numpy.maximum(q1[..., 0], q2[..., 0]) >= numpy.minimum(p1[..., 0], p2[..., 0])
+	hit &= numpy.minimum(q1[..., 0], q2[..., 0]) <= numpy.maximum(p1[..., 0], p2[..., 0])
+	hit &= numpy.maximum(q1[..., 1], q2[..., 1]) >= numpy.minimum(p1[..., 1], p2[..., 1])
+	hit &= numpy.minimum(q1[..., 1], q2[..., 1]) <= numpy.maximum(p1[..., 1], p2[..., 1])
+	hit &= (u_a >= 0) & (u_a <= 1) & (u_b >= 0) & (u_b <= 1)
+
+	return u_a, u_b, p1 + u_a[..., numpy.newaxis] * (p2 - p1), hit
+
+def batch_intersect_lineseg_ray(p1, p2, q1, q2):
+	"""Intersect many pairs of line segments p1-p2 and rays q1-q2 at once.
+
+	This computes the same results as L{intersect_lineseg_ray} for all pairs using NumPy broadcasting.
+	See L{batch_intersect_line_line_u} for the accepted argument shapes.
+
+	@return: A tuple (u_a, u_b, points, hit) of arrays. points holds the intersection points computed along the segments, and the boolean mask hit tells which pairs actually intersect.
+	"""
+
+	u_a, u_b, parallel = batch_intersect_line_line_u(p1, p2, q1, q2)
+	p1, p2 = numpy.asarray(p1, dtype=float), numpy.asarray(p2, dtype=float)
+
+	hit = ~parallel & (u_a >= 0) & (u_a <= 1) & (u_b >= 0)
+
+	return u_a, u_b, p1 + u_a[..., numpy.newaxis] * (p2 - p1), hit
+
 def check_intersect_lineseg_lineseg(p1, p2, q1, q2):
 	"""Check if two line segments intersect - this can conserve memory if we don't need the intersection points
 
@@ -312,3 +587,220 @@ def point_orientation(a,b,c):
 	"""
 	return (b.x - a.x) * (c.y - a.y) - (c.x - a.x) * (b.y - a.y) > 0
 
+def winding_numbers(loops, points):
+	"""Compute the winding numbers of many points with respect to a set of closed loops.
+
+	Reference: http://softsurfer.com/Archive/algorithm_0103/algorithm_0103.htm
+
+	The points are sorted by their y coordinate once. Every edge then only visits the points whose y coordinate lies strictly
+	inside its y interval, so the cost grows with the number of edges that a horizontal line through a point crosses, rather
+	than with the total number of edges for every point.
+
+	@type loops: List
+	@param loops: List of point lists. Each one is closed by an edge from its last point to its first point.
+
+	@type points: List
+	@param points: List of points to compute winding numbers for
+
+	@return: A list of winding numbers, one for each point. Edges going up in y that cross the ray from a point in positive x direction count -1, edges going down count +1.
+	"""
+
+	order = sorted(range(len(points)), key=lambda k: points[k].y)
+	ys = [ points[k].y for k in order ]
+
+	wn = [0] * len(points)
+	for pp in loops:
+		for a, b in zip(pp, pp[1:] + pp[:1]):
+			if a.y == b.y: continue
+
+			if a.y < b.y:
+				start, end, d = bisect.bisect_right(ys, a.y), bisect.bisect_left(ys, b.y), -1
+			else:
+				start, end, d = bisect.bisect_right(ys, b.y), bisect.bisect_left(ys, a.y), 1
+
+			if start >= end: continue
+
+			slope = (b.x - a.x) / (b.y - a.y)
+			for k in order[start:end]:
+				p = points[k]
+				if a.x + (p.y - a.y) * slope > p.x: wn[k] += d
+
+	return wn
+
+
+
+def _nearest_ray_hit(segs, indices, p1, p2, accept, best, best_t):
+	"""Find the nearest hit of the ray p1, p2 on the segments segs[i] for i in indices. Shared by the cast_ray methods of the
+	segment indices.
+
+	The intersection test is the same as in L{intersect_lineseg_ray}, but inlined and keeping the distance along the ray.
+
+	@param best: The nearest (point, i) hit found so far, or None
+	@param best_t: The ray parameter of best, or infinity. Only hits closer than this are considered.
+
+	@return: The new (best, best_t)
+	"""
+
+	dx, dy = p2.x - p1.x, p2.y - p1.y
+	for i in indices:
+		a, b = segs[i]
+		d = dy * (b.x - a.x) - dx * (b.y - a.y)
+		if d == 0: continue
+
+		u_a = float(dx * (a.y - p1.y) - dy * (a.x - p1.x)) / d
+		u_b = float((b.x - a.x) * (a.y - p1.y) - (b.y - a.y) * (a.x - p1.x)) / d
+		if u_a < 0 or u_a > 1 or u_b < 0 or u_b >= best_t: continue
+
+		point = Vector(a.x + u_a * (b.x - a.x), a.y + u_a * (b.y - a.y))
+		if accept and not accept(point, i): continue
+
+		best, best_t = (point, i), u_b
+
+	return best, best_t
+
+class SegmentGrid(object):
+	"""Uniform grid over a static set of line segments for casting many rays against them.
+
+	Every segment is registered in all grid cells covered by its bounding box. A ray walks through the cells it passes in order
+	and only tests the segments registered there, stopping as soon as the nearest hit is known.
+
+		>>> grid = SegmentGrid([ (Vector(2, -1), Vector(2, 1)), (Vector(4, -1), Vector(4, 1)) ])
+		>>> grid.cast_ray(Vector(0, 0), Vector(1, 0))
+		(Vector(2.000, 0.000), 0)
+	"""
+
+	def __init__(self, segs, cell_size=None):
+		"""Create a new segment grid.
+
+		@type segs: List
+		@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+
+		@type cell_size: float
+		@param cell_size: The edge length of the grid cells. By default, it is chosen from the extent and number of the segments.
+		"""
+
+		self.segs = list(segs)
+		self.cells = {}
+
+		boxes = lineseg_boxes(self.segs)
+		if not boxes:
+			self.cell_size = cell_size or 1.0
+			self.bounds = None
+			return
+
+		x_min = min(b[0] for b in boxes)
+		y_min = min(b[1] for b in boxes)
+		x_max = max(b[2] for b in boxes)
+		y_max = max(b[3] for b in boxes)
+		self.bounds = (x_min, y_min, x_max, y_max)
+
+		if not cell_size:
+			# aim for about one segment per cell, but make cells at least as large as an average segment
+			extent = max(x_max - x_min, y_max - y_min, EPSILON)
+			mean_size = sum(max(b[2] - b[0], b[3] - b[1]) for b in boxes) / len(boxes)
+			cell_size = max(extent / math.ceil(math.sqrt(len(boxes))), mean_size, EPSILON)
+
+		self.cell_size = float(cell_size)
+
+		# pad the boxes so that segments touching a cell boundary are registered on both sides of it.
+		# otherwise, a ray passing exactly through a cell corner could skip the cell a segment is registered in.
+		for i, b in enumerate(boxes):
+			cx0, cy0 = self._cell(b[0] - EPSILON, b[1] - EPSILON)
+			cx1, cy1 = self._cell(b[2] + EPSILON, b[3] + EPSILON)
+			for cx in range(cx0, cx1 + 1):
+				for cy in range(cy0, cy1 + 1):
+					self.cells.setdefault((cx, cy), []).append(i)
+
+	def _cell(self, x, y):
+		return (int(math.floor((x - self.bounds[0]) / self.cell_size)), int(math.floor((y - self.bounds[1]) / self.cell_size)))
+
+	def cast_ray(self, p1, p2, accept=None):
+		"""Find the nearest segment hit by a ray.
+
+		@type p1: Vector
+		@param p1: The starting point of the ray
+
+		@type p2: Vector
+		@param p2: The second point on the ray
+
+		@type accept: function
+		@param accept: Optional function f(point, i) that decides whether a hit on segment i at point should be considered
+
+		@return: A tuple (point, i) of the nearest intersection point and the index of the segment that was hit, or None
+		"""
+
+		if self.bounds is None: return None
+
+		x_min, y_min, x_max, y_max = self.bounds
+		dx, dy = p2.x - p1.x, p2.y - p1.y
+		if dx == 0 and dy == 0: return None
+
+		t = clip_ray_box(p1, p2, self.bounds)
+		if t is None: return None
+		t_enter, t_leave = t
+
+		# walk the grid cells along the ray (Amanatides & Woo)
+		cs = self.cell_size
+		n_x, n_y = self._cell(x_max + EPSILON, y_max + EPSILON)
+		cx, cy = self._cell(p1.x + t_enter * dx, p1.y + t_enter * dy)
+		cx, cy = min(max(cx, 0), n_x), min(max(cy, 0), n_y)
+
+		step_x = 1 if dx > 0 else -1
+		step_y = 1 if dy > 0 else -1
+		t_next_x = ((x_min + (cx + (dx > 0)) * cs) - p1.x) / dx if dx != 0 else float('inf')
+		t_next_y = ((y_min + (cy + (dy > 0)) * cs) - p1.y) / dy if dy != 0 else float('inf')
+		t_delta_x = cs / abs(dx) if dx != 0 else float('inf')
+		t_delta_y = cs / abs(dy) if dy != 0 else float('inf')
+
+		tested = set()
+		best, best_t = None, float('inf')
+		while 0 <= cx <= n_x and 0 <= cy <= n_y:
+
+			cell = [ i for i in self.cells.get((cx, cy), ()) if i not in tested ]
+			tested.update(cell)
+			best, best_t = _nearest_ray_hit(self.segs, cell, p1, p2, accept, best, best_t)
+
+			# hits in later cells can not be closer than the exit of this cell
+			t_exit = min(t_next_x, t_next_y)
+			if best_t <= t_exit or t_exit > t_leave: break
+
+			if t_next_x < t_next_y:
+				cx += step_x
+				t_next_x += t_delta_x
+			else:
+				cy += step_y
+				t_next_y += t_delta_y
+
+		return best
+
+	def cast_rays(self, rays, accept=None):
+		"""Find the nearest segment hit for many rays.
+
+		@type rays: List
+		@param rays: A list of rays given as 2-tuples of vectors (starting point, second point on the ray)
+
+		@type accept: function
+		@param accept: Optional function f(point, i) that decides whether a hit on segment i at point should be considered
+
+		@return: A list with a (point, i) tuple or None for every ray, see L{cast_ray}
+		"""
+		return [ self.cast_ray(p1, p2, accept) for p1, p2 in rays ]
+
+
+def cast_rays(segs, rays, accept=None):
+	"""Find the nearest intersection of many rays with a list of line segments.
+
+	If you cast rays against the same segments repeatedly, create a L{SegmentGrid} once and use its cast_rays method instead.
+
+	@type segs: List
+	@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+
+	@type rays: List
+	@param rays: A list of rays given as 2-tuples of vectors (starting point, second point on the ray)
+
+	@type accept: function
+	@param accept: Optional function f(point, i) that decides whether a hit on segment i at point should be considered
+
+	@return: A list with a (point, i) tuple or None for every ray, where i is the index of the segment that was hit
+	"""
+	return SegmentGrid(segs).cast_rays(rays, accept)
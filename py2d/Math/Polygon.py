@@ -1,9 +1,26 @@
 import math
+import bisect
 import itertools
+import multiprocessing
+from array import array
 from collections import defaultdict
 
 from py2d.Math.Vector import *
 from py2d.Math.Operations import *
+from py2d.Math.SegmentBVH import SegmentBVH
+from py2d.Math.ResultCache import cached_operation
+from py2d.Math.Triangulation import triangulate_coords
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# number of point/edge pairs that Polygon.contains_points processes per chunk
+CONTAINS_POINTS_CHUNK = 1 << 20
+
+# batches with fewer jobs than this are run in the calling process by Polygon.boolean_operations
+BOOLEAN_OPERATIONS_MIN_PARALLEL = 64
 
 def tip_decorator_pointy(a,b,c,d,is_cw):
 	intersection = intersect_line_line(a,b,c,d)
@@ -141,6 +158,7 @@ class Polygon(object):
 		return p
 
 	@staticmethod
+	@cached_operation('boolean_operation')
 	def boolean_operation(polygon_a, polygon_b, operation):
 		"""Perform a boolean operation on two polygons.
 
@@ -150,6 +168,12 @@ class Polygon(object):
 
 		This implementation will only consider island-type polygons, so control tables are replaced by small boolean expressions.
 
+		Edge intersections are found with a sweep over the edge bounding boxes and vertices are classified with
+		L{PreparedPolygon}s. For typical inputs, with short edges whose boxes overlap only a few others, this is close to
+		O((n + k) log n) time for n vertices and k intersections. In the worst case the sweep still compares O(n * m) pairs
+		of edges for polygons with n and m vertices, and preparing a polygon takes O(n^2) time. Polygons whose bounding boxes
+		are apart are not intersected or classified at all.
+
 		@type polygon_a: Polygon
 		@param polygon_a: The first polygon
 
@@ -160,30 +184,32 @@ class Polygon(object):
 		@param operation: The operation to perform. Either 'u' for union, 'i' for intersection, or 'd' for difference.
 		"""
 
-		def inorder_extend(v, v1, v2, ints):
-			"""Extend a sequence v by points ints that are on the segment v1, v2"""
+		def edge_order(v1, v2, ints):
+			"""Sort points ints that are on the segment v1, v2 in the direction from v1 to v2"""
 
-			k, r = None, False
-			if v1.x < v2.x:
+			if v1.x != v2.x:
 				k = lambda i: i.x
-				r = True
-			elif v1.x > v2.x:
-				k = lambda i: i.x
-				r = False
-			elif v1.y < v2.y:
-				k = lambda i: i.y
-				r = True
+				r = v1.x < v2.x
 			else:
 				k = lambda i: i.y
-				r = False
+				r = v1.y < v2.y
+
+			return list(reversed(sorted(ints, key=k, reverse=r)))
+
+		def build_ring(pts, classes, intersections):
+			"""Build the vertex ring of a polygon, with the intersections of every edge inserted after its first point.
 
-			l = [ (p, 2) for p in sorted(ints, key=k, reverse=r) ]
+			Intersections on the closing edge are put in front of the first point, as the old insertion-based code did.
+			"""
 
-			i = next((i for i, p in enumerate(v) if p[0] == v2), -1)
-			assert(i>=0)
+			n = len(pts)
+			ring = [ (p, 2) for p in edge_order(pts[-1], pts[0], intersections.get(n - 1, ())) ]
+			for i in range(n):
+				ring.append( (pts[i], classes[i]) )
+				if i < n - 1 and i in intersections:
+					ring.extend( (p, 2) for p in edge_order(pts[i], pts[i+1], intersections[i]) )
 
-			for e in l:
-				v.insert(i, e)
+			return ring
 
 		if operation not in 'uid' or len(operation) > 1: raise ValueError("Operation must be 'u', 'i' or 'd'!")
 
@@ -194,34 +220,54 @@ class Polygon(object):
 			polygon_b = polygon_b.clone()
 			polygon_b.flip()
 
-		# initialize vector rings
-		v_a = [(p, polygon_b.contains_point(p)) for p in polygon_a.points]
-		v_b = [(p, polygon_a.contains_point(p)) for p in polygon_b.points]
+		pts_a, pts_b = polygon_a.points, polygon_b.points
 
-
-		# find all intersections
 		intersections_a = defaultdict(list)
 		intersections_b = defaultdict(list)
-		for a1, a2 in list(zip(v_a, v_a[1:])) + [(v_a[-1], v_a[0])]:
-			for b1, b2 in list(zip(v_b, v_b[1:])) + [(v_b[-1], v_b[0])]:
-				i = intersect_lineseg_lineseg(a1[0],a2[0],b1[0],b2[0])
-				if i:
-					intersections_a[(a1[0],a2[0])].append(i)
-					intersections_b[(b1[0],b2[0])].append(i)
 
+		a_left, a_top, a_right, a_bottom = polygon_a.get_bounding_box()
+		b_left, b_top, b_right, b_bottom = polygon_b.get_bounding_box()
+		if a_right + EPSILON < b_left or b_right + EPSILON < a_left or a_bottom + EPSILON < b_top or b_bottom + EPSILON < a_top:
+
+			# the polygons are apart, so all vertices are outside of the other polygon and no edges intersect
+			prepared_a = prepared_b = None
+			classes_a, classes_b = [0] * len(pts_a), [0] * len(pts_b)
+
+		else:
+			prepared_a, prepared_b = PreparedPolygon(pts_a), PreparedPolygon(pts_b)
+			classes_a, classes_b = [ prepared_b.contains_point(p) for p in pts_a ], [ prepared_a.contains_point(p) for p in pts_b ]
+
+			# find all intersections
+			edges_a = list(zip(pts_a, pts_a[1:])) + [(pts_a[-1], pts_a[0])]
+			edges_b = list(zip(pts_b, pts_b[1:])) + [(pts_b[-1], pts_b[0])]
+			for i, j in sorted(sweep_overlapping_pairs(lineseg_boxes(edges_a), lineseg_boxes(edges_b))):
+				(a1, a2), (b1, b2) = edges_a[i], edges_b[j]
+				p = intersect_lineseg_lineseg(a1, a2, b1, b2)
+				if p:
+					intersections_a[i].append(p)
+					intersections_b[j].append(p)
+					continue
 
-		# extend vector rings by intersections
-		for k, v in intersections_a.items():
-			inorder_extend(v_a, k[0], k[1], v)
+				# collinear edges do not intersect in a single point, but the ends of each one that lie on the other one split it
+				intersections_a[i].extend( q for q in (b1, b2) if q != a1 and q != a2 and distance_point_lineseg_squared(q, a1, a2) < EPSILON * EPSILON )
+				intersections_b[j].extend( q for q in (a1, a2) if q != b1 and q != b2 and distance_point_lineseg_squared(q, b1, b2) < EPSILON * EPSILON )
 
-		for k, v in intersections_b.items():
-			inorder_extend(v_b, k[0], k[1], v)
+		# initialize vector rings, extended by the intersections
+		v_a = build_ring(pts_a, classes_a, intersections_a)
+		v_b = build_ring(pts_b, classes_b, intersections_b)
 
 
 		edge_fragments = defaultdict(list)
 
-		def extend_fragments(v, poly, fragment_type):
+		# fragments of a that lie on the boundary of b
+		shared = set()
+
+		def extend_fragments(v, prepared, fragment_type, is_a):
 			for v1, v2 in list(zip(v, v[1:])) + [(v[-1], v[0])]:
+				if v1[0] == v2[0]:
+					# intersections at vertices duplicate them in the ring
+					continue
+
 				if v1[1] == fragment_type or v2[1] == fragment_type:
 					# one of the vertices is of the required type
 					edge_fragments[v1[0]].append( v2[0] )
@@ -229,38 +275,47 @@ class Polygon(object):
 				elif v1[1] == 2 and v2[1] == 2:
 					# we have two boundary vertices
 					m = (v1[0] + v2[0]) / 2.0
-					t = poly.contains_point(m)
+					t = prepared.contains_point(m)
+
+					if t == 2 and is_a:
+						shared.add( (v1[0], v2[0]) )
+
+					elif t == 2 and (v1[0], v2[0]) in shared:
+						# both polygons have this fragment in the same direction, keep it once
+						continue
+
+					elif t == 2 and (v2[0], v1[0]) in shared:
+						# the polygons are on different sides of this fragment, so it is not part of the result
+						edge_fragments[v2[0]].remove( v1[0] )
+						if not edge_fragments[v2[0]]: del edge_fragments[v2[0]]
+						continue
+
 					if t == fragment_type or t == 2:
 						edge_fragments[v1[0]].append( v2[0] )
 
 		fragment_type_a = 1 if operation == 'i' else 0
 		fragment_type_b = 1 if operation != 'u' else 0
 
-		extend_fragments(v_a, polygon_b, fragment_type_a)
-		extend_fragments(v_b, polygon_a, fragment_type_b)
-
-		def print_edge():
-			for k in edge_fragments.keys():
-				for v in edge_fragments[k]:
-					print("%s -> %s" % (k, v))
-
-
+		extend_fragments(v_a, prepared_b, fragment_type_a, True)
+		extend_fragments(v_b, prepared_a, fragment_type_b, False)
 
 
 		output = []
 		while edge_fragments:
-			start = list(edge_fragments.keys())[0]
+			start = next(iter(edge_fragments))
 			current = edge_fragments[start][0]
 			sequence = [start]
+			position = {start: 0}
 
 			# follow along the edge fragments sequence
-			while not current in sequence:
+			while not current in position:
+				position[current] = len(sequence)
 				sequence.append(current)
 				current = edge_fragments[current][0]
 
 
 			# get only the cyclic part of the sequence
-			sequence = sequence[sequence.index(current):]
+			sequence = sequence[position[current]:]
 
 			for c,n in list(zip(sequence, sequence[1:])) + [(sequence[-1], sequence[0])]:
 				edge_fragments[c].remove(n)
@@ -299,8 +354,11 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
-		@return: A list of fragment polygons
+		@return: A list of fragment polygons, or a L{PolygonSet} if one of the arguments is a PolygonSet or L{PolygonWithHoles}
 		"""
+		if not (isinstance(polygon_a, Polygon) and isinstance(polygon_b, Polygon)):
+			return PolygonSet.from_any(polygon_a).union(polygon_b)
+
 		return Polygon.boolean_operation(polygon_a, polygon_b, 'u')
 
 	@staticmethod
@@ -313,8 +371,11 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
-		@return: A list of fragment polygons
+		@return: A list of fragment polygons, or a L{PolygonSet} if one of the arguments is a PolygonSet or L{PolygonWithHoles}
 		"""
+		if not (isinstance(polygon_a, Polygon) and isinstance(polygon_b, Polygon)):
+			return PolygonSet.from_any(polygon_a).intersect(polygon_b)
+
 		return Polygon.boolean_operation(polygon_a, polygon_b, 'i')
 
 	@staticmethod
@@ -327,11 +388,173 @@ class Polygon(object):
 		@type polygon_b: Polygon
 		@param polygon_b: The second polygon
 
-		@return: A list of fragment polygons
+		@return: A list of fragment polygons, or a L{PolygonSet} if one of the arguments is a PolygonSet or L{PolygonWithHoles}
 		"""
+		if not (isinstance(polygon_a, Polygon) and isinstance(polygon_b, Polygon)):
+			return PolygonSet.from_any(polygon_a).subtract(polygon_b)
+
 		return Polygon.boolean_operation(polygon_a, polygon_b, 'd')
 
 
+	@staticmethod
+	def boolean_operations(jobs, processes=None, chunk_size=None):
+		"""Perform many independent boolean operations in a pool of worker processes.
+
+		Polygons are sent to the workers as flat arrays of coordinates and the fragments are sent back the same way, which is
+		much cheaper than pickling lists of Vectors. Small batches and batches with processes=1 are run in the calling process.
+
+		@type jobs: List
+		@param jobs: List of (polygon_a, polygon_b, operation) tuples, with operation being 'u', 'i' or 'd' as for L{boolean_operation}
+
+		@type processes: int
+		@param processes: The number of worker processes. Defaults to the number of CPUs.
+
+		@type chunk_size: int
+		@param chunk_size: The number of jobs sent to a worker at once. By default, every worker gets about four chunks.
+
+		@return: A list with the list of fragment polygons of every job, in the order of the jobs
+		"""
+
+		jobs = list(jobs)
+		for a, b, operation in jobs:
+			if operation not in 'uid' or len(operation) > 1: raise ValueError("Operation must be 'u', 'i' or 'd'!")
+
+		if processes is None: processes = multiprocessing.cpu_count()
+
+		if processes <= 1 or len(jobs) < BOOLEAN_OPERATIONS_MIN_PARALLEL:
+			return [ Polygon.boolean_operation(a, b, operation) for a, b, operation in jobs ]
+
+		if not chunk_size: chunk_size = max(1, len(jobs) // (processes * 4))
+
+		encoded = [ (encode_polygon(a), encode_polygon(b), operation) for a, b, operation in jobs ]
+
+		pool = multiprocessing.Pool(processes)
+		try:
+			results = pool.map(_boolean_operation_job, encoded, chunk_size)
+		finally:
+			pool.close()
+			pool.join()
+
+		return [ [ decode_polygon(f) for f in fragments ] for fragments in results ]
+
+
+	@staticmethod
+	def union_all(polygons):
+		"""Get the union of many polygons.
+
+		Instead of adding the polygons to a growing result one at a time, the polygons are sorted along a Morton curve so that
+		neighbours in the list are close in the plane, and merged pairwise in a balanced tree (cascaded union). Each merge step
+		only unions regions whose bounding boxes touch, so every vertex takes part in O(log n) boolean operations.
+
+		@type polygons: List
+		@param polygons: The polygons to merge
+
+		@return: A list of regions. Every region is a list [outline, hole, hole, ...] of Polygons. Outlines have the orientation of the first polygon, holes the opposite one.
+		"""
+
+		polygons = [ p for p in polygons if len(p) >= 3 ]
+		if not polygons: return []
+
+		clockwise = polygons[0].is_clockwise()
+
+		groups = []
+		for i in morton_order([ p.get_bounding_box() for p in polygons ]):
+			outline = polygons[i].clone_cw() if clockwise else polygons[i].clone_ccw()
+			groups.append([ (tuple(outline.get_bounding_box()), [outline]) ])
+
+		while len(groups) > 1:
+			groups = [ Polygon._merge_regions(groups[i], groups[i+1], clockwise) if i + 1 < len(groups) else groups[i] for i in range(0, len(groups), 2) ]
+
+		return [ region for box, region in groups[0] ]
+
+	@staticmethod
+	def _merge_regions(left, right, clockwise):
+		"""Merge two lists of disjoint (box, region) pairs into one list of disjoint (box, region) pairs"""
+
+		def boxes_touch(a, b):
+			return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+		def overlap(x, y):
+			return x[0].overlaps(y[0]) and not Polygon._region_in_holes(x, y) and not Polygon._region_in_holes(y, x)
+
+		result = list(left)
+		queue = list(right)
+		while queue:
+			box, region = queue.pop()
+
+			k = next((k for k, (other_box, other) in enumerate(result) if boxes_touch(box, other_box) and overlap(region, other)), None)
+			if k is None:
+				result.append((box, region))
+				continue
+
+			other_box, other = result.pop(k)
+			merged = [ (tuple(r[0].get_bounding_box()), r) for r in Polygon._union_regions(other, region, clockwise) ]
+
+			# a single region may now overlap further regions, several regions only touch each other
+			if len(merged) == 1:
+				queue.append(merged[0])
+			else:
+				result.extend(merged)
+
+		return result
+
+	@staticmethod
+	def _region_in_holes(x, y):
+		"""Check whether the outline of region y lies in one of the holes of region x"""
+
+		y_left, y_top, y_right, y_bottom = y[0].get_bounding_box()
+		for hole in x[1:]:
+			left, top, right, bottom = hole.get_bounding_box()
+			if y_left < left or y_right > right or y_top < top or y_bottom > bottom: continue
+
+			prepared = PreparedPolygon(hole.points)
+			if all(prepared.contains_point(p) == 1 for p in y[0].points) and not intersect_poly_poly(hole.points, y[0].points):
+				return True
+
+		return False
+
+	@staticmethod
+	def _union_regions(x, y, clockwise):
+		"""Get the union of two overlapping regions, given as lists [outline, hole, hole, ...]"""
+
+		def uncovered(holes, outline):
+			"""Get the parts of holes that are outside of outline"""
+			out = []
+			for hole in holes:
+				out.extend(Polygon._region_parts(Polygon.boolean_operation(hole, outline, 'd'), not clockwise) if _polygons_touch(hole, outline) else [hole])
+			return out
+
+		fragments = Polygon.boolean_operation(x[0], y[0], 'u')
+		outlines = Polygon._region_parts(fragments, clockwise)
+		if not outlines: return [x, y]
+
+		# the complement of x | y inside the new outlines: holes enclosed by the outline union, holes of one region not covered
+		# by the outline of the other one, and places where holes of both regions overlap
+		holes = Polygon._region_parts(fragments, not clockwise)
+		holes += uncovered(x[1:], y[0])
+		holes += uncovered(y[1:], x[0])
+		holes += [ f for hx in x[1:] for hy in y[1:] if _polygons_touch(hx, hy) for f in Polygon._region_parts(Polygon.boolean_operation(hx, hy, 'i'), not clockwise) ]
+
+		return Polygon._assign_holes(outlines, holes)
+
+	@staticmethod
+	def _region_parts(polygons, clockwise):
+		"""Filter the non-degenerate polygons of the given orientation from boolean operation fragments"""
+		return [ p for p in polygons if len(p) >= 3 and abs(p.get_signed_area()) > EPSILON and p.is_clockwise() == clockwise ]
+
+	@staticmethod
+	def _assign_holes(outlines, holes):
+		"""Build regions [outline, hole, hole, ...] by putting every hole into the outline that contains most of its points"""
+
+		if len(outlines) == 1: return [ outlines + holes ]
+
+		regions = [ [o] for o in outlines ]
+		for hole in holes:
+			best = max(regions, key=lambda r: sum(1 for p in hole.points if r[0].contains_point(p)))
+			best.append(hole)
+
+		return regions
+
 	@staticmethod
 	def offset(polys, amount, tip_decorator=tip_decorator_pointy, debug_callback=None):
 		"""Shrink or grow a polygon by a given amount.
@@ -342,7 +565,7 @@ class Polygon(object):
 		Computers and Information in Engineering Conference
 
 		@type polys: List
-		@param polys: The list of polygons to offset. Counter-clockwise polygons will be treated as islands, clockwise polygons as holes.
+		@param polys: The list of polygons to offset. Counter-clockwise polygons will be treated as islands, clockwise polygons as holes. L{PolygonWithHoles} and L{PolygonSet} objects are split into their outlines and holes.
 
 		@type amount: float
 		@param amount: The amount to offset. Positive values will grow the polygon, negative values will shrink.
@@ -351,24 +574,51 @@ class Polygon(object):
 		@param tip_decorator: A function used for decorating tips generated in the offset polygon
 		"""
 
+		return Polygon.offset_many(polys, [amount], tip_decorator, debug_callback)[amount]
+
+	@staticmethod
+	@cached_operation('offset_many')
+	def offset_many(polys, amounts, tip_decorator=tip_decorator_pointy, debug_callback=None):
+		"""Shrink or grow polygons by several amounts at once, e.g. for a number of agent radii.
+
+		The edge normals and vertex convexity of the input polygons only depend on the input, so they are computed once and
+		shared by all amounts. The offset rings are then built from them, decomposed and classified separately for every amount.
+
+		@type polys: List
+		@param polys: The list of polygons to offset, see L{offset}
+
+		@type amounts: List
+		@param amounts: The amounts to offset. Positive values will grow the polygon, negative values will shrink.
+
+		@type tip_decorator: function
+		@param tip_decorator: A function used for decorating tips generated in the offset polygon
+
+		@return: A dict mapping every amount to the list of offset polygons for it
+		"""
+
 		# fix passing a single polygon instead of a poly list
-		if isinstance(polys, Polygon): polys = [polys]
+		if isinstance(polys, (Polygon, PolygonWithHoles, PolygonSet)): polys = [polys]
 
-		if amount == 0: return polys
+		polys = [ q for p in polys for q in (p.get_polygons() if isinstance(p, (PolygonWithHoles, PolygonSet)) else [p]) ]
 
-		def offset_poly(poly):
-			r = []
-			for i in range(len(poly.points)):
-				c, n, n2 = poly.points[i], poly.points[ (i+1) % len(poly) ], poly.points[ (i+2) % len(poly) ]
-				is_convex = point_orientation(c,n,n2)
+		def vertex_frames(poly):
+			"""Get the neighbours, edge normals and convexity of every vertex, which are the same for every amount"""
+
+			pts = poly.points
+			normals = [ (pts[(i+1) % len(pts)] - pts[i]).normal().normalize() for i in range(len(pts)) ]
+
+			frames = []
+			for i in range(len(pts)):
+				c, n, n2 = pts[i], pts[ (i+1) % len(pts) ], pts[ (i+2) % len(pts) ]
+				frames.append( (c, n, n2, normals[i], normals[ (i+1) % len(pts) ], point_orientation(c,n,n2)) )
 
-				unit_normal = (n - c).normal().normalize()
-				unit_normal2 = (n2 - n).normal().normalize()
+			return frames
 
+		def offset_poly(frames, amount):
+			r = []
+			for c, n, n2, unit_normal, unit_normal2, is_convex in frames:
 				c_prime = c + unit_normal * amount
 				n_prime = n + unit_normal * amount
-				n2_prime = n2 + unit_normal2 * amount
-				n_prime2 = n + unit_normal2 * amount
 
 				r.append(c_prime)
 				r.append(n_prime)
@@ -376,6 +626,8 @@ class Polygon(object):
 				if is_convex == (amount > 0):
 					r.append(n)
 				else:
+					n2_prime = n2 + unit_normal2 * amount
+					n_prime2 = n + unit_normal2 * amount
 					r.extend(tip_decorator(c_prime, n_prime, n_prime2, n2_prime, True))
 
 
@@ -385,94 +637,75 @@ class Polygon(object):
 		def decompose(poly_points):
 			"""Decompose a possibly self-intersecting polygon into multiple simple polygons."""
 
-			def inorder_extend(v, v1, v2, ints):
-				"""Extend a sequence v by points ints that are on the segment v1, v2"""
-
-				k, r = None, False
-				if v1.x < v2.x:
-					k = lambda i: i.x
-					r = True
-				elif v1.x > v2.x:
-					k = lambda i: i.x
-					r = False
-				elif v1.y < v2.y:
-					k = lambda i: i.y
-					r = True
+			pts = list(poly_points)
+			edges = list(zip(pts, pts[1:] + pts[:1]))
+
+			# find self-intersections, only testing edges with overlapping bounding boxes
+			ints = defaultdict(list)
+			for i, j in sorted(sweep_overlapping_pairs(lineseg_boxes(edges))):
+				a, b = edges[i]
+				c, d = edges[j]
+
+				x = intersect_lineseg_lineseg(a, b, c, d)
+				if x and x not in (a,b,c,d):
+					ints[i].append( x )
+					ints[j].append( x )
+
+			# add self-intersection points to poly, in order along their edges. the points on the closing edge go to the
+			# front, so that the loops start at the same point as they always have.
+			ring = []
+			for i, (a, b) in enumerate(edges):
+				on_edge = sorted(ints.get(i, ()), key=lambda x: (x - a).length_squared)
+				if i == len(edges) - 1:
+					ring[:0] = on_edge
+					ring.append(a)
 				else:
-					k = lambda i: i.y
-					r = False
+					ring.append(a)
+					ring.extend(on_edge)
 
-				l = sorted(ints, key=k, reverse=r)
-				i = next((i for i, p in enumerate(v) if p == v2), -1)
-				assert(i>=0)
+			return extract_loops(ring)
 
-				for e in l:
-					v.insert(i, e)
 
-			pts = [p for p in poly_points]
+		def extract_loops(ring):
+			"""Split a point sequence into loops at the points that it visits more than once.
 
-			# find self-intersections
-			ints = defaultdict(list)
-			for i in range(len(pts)):
-				for j in range(i+1, len(pts)):
-					a = pts[i]
-					b = pts[(i+1)%len(pts)]
-					c = pts[j]
-					d = pts[(j+1)%len(pts)]
+			The sequence is walked once while the points of the current open path are kept on a stack. When a point is
+			visited again, the part of the path after its first visit is a closed loop and is popped off the stack.
+			Points are looked up in a grid of EPSILON-sized cells, so that revisits are found in constant time.
+			"""
 
-					x = intersect_lineseg_lineseg(a, b, c, d)
-					if x and x not in (a,b,c,d):
-						ints[(a,b)].append( x )
-						ints[(c,d)].append( x )
+			def cell(p):
+				return (int(math.floor(p.x / EPSILON)), int(math.floor(p.y / EPSILON)))
 
+			stack = []
+			cells = defaultdict(list)
 
-			# add self-intersection points to poly
-			for k, v in ints.items():
-				inorder_extend(pts, k[0], k[1], v)
+			def find(p):
+				cx, cy = cell(p)
+				found = [ k for x in (cx - 1, cx, cx + 1) for y in (cy - 1, cy, cy + 1) for k in cells.get((x, y), ()) if stack[k] == p ]
+				return min(found) if found else None
 
-			# build a list of loops
 			out = []
-			while pts:
-
-				# build up a list of seen points until we re-visit one - a loop!
-				seen = []
-				for p in pts + [pts[0]]:
-					if p not in seen:
-						seen.append(p)
-					else:
-						break
+			for p in ring:
+				k = find(p)
+				if k is not None:
+					loop = stack[k:]
+					del stack[k:]
+					for q in loop:
+						c = cells[cell(q)]
+						c.pop()
+						if not c: del cells[cell(q)]
 
-				loop = seen[seen.index(p):]
+					out.append(loop)
 
-				# remove the loop from pts
-				for p in loop:
-					pts.remove(p)
+				cells[cell(p)].append(len(stack))
+				stack.append(p)
 
-				out.append(loop)
+			if stack: out.append(stack)
 
 			return out
 
 
-		def winding_number(p, raw):
-
-			# compute winding number of point
-			#http://softsurfer.com/Archive/algorithm_0103/algorithm_0103.htm
-
-			wn = 0
-			for pp in raw:
-				for a,b in list(zip(pp, pp[1:])) + [(pp[-1], pp[0])]:
-					if a.y < p.y and b.y > p.y:
-						i = intersect_lineseg_ray(a,b,p,p+VECTOR_X)
-						if i and i.x > p.x:
-							wn -= 1
-
-					if a.y > p.y and b.y < p.y:
-						i = intersect_lineseg_ray(a,b,p,p+VECTOR_X)
-						if i and i.x > p.x:
-							wn += 1
-			return wn
-
-
 		def find_point_in_poly(pts):
 			# find point inside of pts according to http://www.exaflop.org/docs/cgafaq/cga2.html#Subject%202.06:%20How%20do%20I%20find%20a%20single%20point%20inside%20a%20simple%20polygonu
 
@@ -513,37 +746,49 @@ class Polygon(object):
 				debug_callback(p,color,text)
 
 
-		raw = []
-		for poly in polys:
+		frames = None
+		results = {}
+		for amount in amounts:
+			if amount in results: continue
 
-			offset = offset_poly(poly)
-			decomp = decompose( offset )
+			if amount == 0:
+				results[amount] = polys
+				continue
 
-			raw.extend( decomp )
+			if frames is None: frames = [ vertex_frames(poly) for poly in polys ]
 
+			raw = []
+			for poly_frames in frames:
 
-		#print "\n-----------------\n"
-		output = []
-		for poly in raw:
+				offset = offset_poly(poly_frames, amount)
+				decomp = decompose( offset )
 
-			poly = Polygon.simplify_sequence(poly)
-			p = find_point_in_poly( poly )
-			wn = winding_number(p, raw)
+				raw.extend( decomp )
 
 
-			dbg(p, 0xffff00, "%d %d" % (wn, len(poly)))
-			#print "%d %d" % (wn, len(poly))
+			# loops that collapse to a line or a point enclose nothing
+			loops = [ poly for poly in raw if len(Polygon.simplify_sequence(poly)) >= 3 ]
+			points = [ find_point_in_poly( poly ) for poly in loops ]
 
-			# shrink: include poly in solution only if winding number of that region is greater than 1
-			# grow: include only if winding number is 1
-			if False or (amount < 0 and wn > 0) or (amount > 0 and wn == 1):
-				output.append(Polygon.from_pointlist(poly))
+			#print "\n-----------------\n"
+			output = []
+			for poly, p, wn in zip(loops, points, winding_numbers(raw, points)):
 
+				dbg(p, 0xffff00, "%d %d" % (wn, len(poly)))
+				#print "%d %d" % (wn, len(poly))
 
+				# shrink: include poly in solution only if winding number of that region is greater than 1
+				# grow: include only if winding number is 1
+				if False or (amount < 0 and wn > 0) or (amount > 0 and wn == 1):
+					output.append(Polygon.from_pointlist(poly))
+
+			results[amount] = output
 
-		return output
+
+		return results
 
 	@staticmethod
+	@cached_operation('convex_decompose')
 	def convex_decompose(polygon, holes=[], debug_callback=None):
 		"""Decompose a polygon into convex parts
 
@@ -553,12 +798,22 @@ class Polygon(object):
 		doi 10.1007/s11750-008-0055-2
 
 		@type polygon: Polygon
-		@param polygon: The possibly concave polygon to decompose.
+		@param polygon: The possibly concave polygon to decompose. A L{PolygonWithHoles} brings its own holes, and the regions of a L{PolygonSet} are decomposed one by one.
 
 		@type holes: List
 		@param holes: A list of polygons inside of polygon to be considered as holes
 		"""
 
+		if isinstance(polygon, PolygonSet):
+			return [ q for region in polygon for q in Polygon.convex_decompose(region, [ h for h in holes if _polygons_touch(region.outline, h) ], debug_callback) ]
+
+		if isinstance(polygon, PolygonWithHoles):
+			holes = polygon.holes + list(holes)
+			polygon = polygon.outline
+
+		# holes get removed from the list while they are absorbed, do not change the list of the caller
+		holes = list(holes)
+
 		def dbg(p, c, t):
 			if debug_callback: debug_callback(p,c,t)
 
@@ -759,17 +1014,64 @@ class Polygon(object):
 
 		return out
 
+	@staticmethod
+	@cached_operation('triangulate')
+	def triangulate(polygon, holes=[]):
+		"""Triangulate a polygon with holes, e.g. for rendering or physics.
+
+		Unlike L{convex_decompose}, this takes O(n log n) time for typical inputs and scales to many thousands of vertices.
+		See L{triangulate_coords} for the algorithm.
+
+			>>> coords, indices = Polygon.triangulate(Polygon.from_tuples([ (0, 0), (4, 0), (4, 4), (0, 4) ]))
+			>>> list(indices)
+			[2, 3, 0, 0, 1, 2]
+
+		@type polygon: Polygon
+		@param polygon: The polygon to triangulate. A L{PolygonWithHoles} brings its own holes, and the regions of a L{PolygonSet} are triangulated one by one.
+
+		@type holes: List
+		@param holes: A list of polygons inside of polygon to be considered as holes
+
+		@return: A tuple (coords, indices). coords is the flat array of the coordinates x0, y0, x1, y1, ... of the points of polygon followed by the points of all holes, and indices is an array of unsigned ints with three point indices for every triangle. All triangles are clockwise.
+		"""
+
+		if isinstance(polygon, PolygonSet):
+			coords, indices = array('d'), array('I')
+			for region in polygon:
+				c, i = Polygon.triangulate(region, [ h for h in holes if _polygons_touch(region.outline, h) ])
+
+				offset = len(coords) // 2
+				coords.extend(c)
+				indices.extend(k + offset for k in i)
+
+			return coords, indices
+
+		if isinstance(polygon, PolygonWithHoles):
+			holes = list(polygon.holes) + list(holes)
+			polygon = polygon.outline
+
+		coords = array('d')
+		hole_starts = []
+		for poly in [polygon] + list(holes):
+			if poly is not polygon: hole_starts.append(len(coords) // 2)
+			coords.extend(poly.get_coords() if isinstance(poly, ArrayPolygon) else [ c for p in poly.points for c in (p.x, p.y) ])
+
+		return coords, triangulate_coords(coords, hole_starts)
+
 	def is_self_intersecting(self):
+		"""Determines whether two non-adjacent edges of the polygon intersect.
+
+		Only edges with overlapping bounding boxes are tested, see L{sweep_overlapping_pairs}.
+		"""
 
-		for i in range(len(self.points)):
-			for j in range(i+1, len(self.points)):
-				a = self.points[i]
-				b = self.points[(i+1)%len(self.points)]
-				c = self.points[j]
-				d = self.points[(j+1)%len(self.points)]
+		pts = self.points
+		edges = list(zip(pts, pts[1:] + pts[:1]))
+		for i, j in sweep_overlapping_pairs(lineseg_boxes(edges)):
+			a, b = edges[i]
+			c, d = edges[j]
 
-				if not (b == c or d == a):
-					if check_intersect_lineseg_lineseg(a, b, c, d): return True
+			if not (b == c or d == a):
+				if check_intersect_lineseg_lineseg(a, b, c, d): return True
 
 		return False
 
@@ -790,6 +1092,18 @@ class Polygon(object):
 		return point_orientation(a,b,c)
 
 
+	def get_signed_area(self):
+		"""Get the signed area of the polygon. The area is positive for clockwise and negative for counter-clockwise polygons."""
+		return Polygon.signed_area_s(self.points)
+
+	@staticmethod
+	def signed_area_s(pts):
+		"""Get the signed area of the polygon defined by the point list pts"""
+		s = 0.0
+		for a, b in zip(pts, pts[1:] + pts[:1]):
+			s += a.x * b.y - b.x * a.y
+		return s / 2.0
+
 	def is_convex(self):
 		"""Determines whether the polygon is convex."""
 		return Polygon.is_convex_s(self.points)
@@ -821,6 +1135,10 @@ class Polygon(object):
 		"""
 		return Polygon.contains_point_s(self.points, p)
 
+	def prepare(self):
+		"""Get a L{PreparedPolygon} for fast repeated containment queries against the current shape of the polygon"""
+		return PreparedPolygon(self.points)
+
 	@staticmethod
 	def contains_point_s(pts, p) :
 		"""Checks if the polygon defined by the point list pts contains the point p"""
@@ -847,6 +1165,160 @@ class Polygon(object):
 		# we are inside if we have an odd amount of polygon intersections
 		return 1 if len(intersections) % 2 == 1 else 0
 
+	def distance_point_squared(self, p):
+		"""Get the squared distance from p to the polygon. Points inside the polygon or on its boundary have a distance of 0."""
+		if self.contains_point(p): return 0
+
+		pts = self.points
+		return min(distance_point_lineseg_squared(p, a, b) if a != b else (p - a).length_squared
+		           for a, b in zip(pts, pts[1:] + pts[:1]))
+
+	def overlaps(self, other):
+		"""Checks whether the polygon and another polygon overlap. Polygons that only touch at their boundaries count as overlapping.
+
+		@type other: Polygon
+		@param other: The polygon to test against
+		"""
+
+		a_left, a_top, a_right, a_bottom = self.get_bounding_box()
+		b_left, b_top, b_right, b_bottom = other.get_bounding_box()
+		if a_left > b_right or b_left > a_right or a_top > b_bottom or b_top > a_bottom: return False
+
+		pts_a, pts_b = self.points, other.points
+		edges_a = list(zip(pts_a, pts_a[1:] + pts_a[:1]))
+		edges_b = list(zip(pts_b, pts_b[1:] + pts_b[:1]))
+
+		for i, j in sweep_overlapping_pairs(lineseg_boxes(edges_a), lineseg_boxes(edges_b)):
+			if check_intersect_lineseg_lineseg(edges_a[i][0], edges_a[i][1], edges_b[j][0], edges_b[j][1]): return True
+
+		# the boundaries do not cross, so the polygons only overlap if one is inside of the other
+		return bool(other.contains_point(pts_a[0]) or self.contains_point(pts_b[0]))
+
+	def contains_point_convex(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary, assuming that the polygon is convex.
+
+		This is an O(log n) alternative to L{contains_point} for polygons that are known to be convex, e.g. the results of
+		L{convex_decompose}. The result is undefined for non-convex polygons.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+		return Polygon.contains_point_convex_s(self.points, p)
+
+	@staticmethod
+	def contains_point_convex_s(pts, p):
+		"""Checks if the convex polygon defined by the point list pts contains the point p, see L{contains_point_convex}"""
+
+		n = len(pts)
+		o = pts[0]
+
+		def cross(a, b):
+			return (b.x - a.x) * (p.y - a.y) - (b.y - a.y) * (p.x - a.x)
+
+		def on_edge(i):
+			a, b = pts[i], pts[(i+1) % n]
+			if a.x == b.x and a.y == b.y: return (p - a).length_squared < EPSILON * EPSILON
+			return distance_point_lineseg_squared(p, a, b) < EPSILON * EPSILON
+
+		if n < 3: return 2 if any(on_edge(i) for i in range(n)) else 0
+
+		# the fan of rays from o to the other points turns in the direction of the polygon orientation
+		a, b = pts[1], pts[-1]
+		sign = (a.x - o.x) * (b.y - o.y) - (a.y - o.y) * (b.x - o.x)
+		if sign == 0: sign = Polygon.signed_area_s(pts)
+		if sign == 0: return 2 if any(on_edge(i) for i in range(n)) else 0
+		sign = 1 if sign > 0 else -1
+
+		# binary search for the last ray from o that p is not behind, giving the triangle o, pts[k], pts[k+1] around p
+		lo, hi = 1, n - 2
+		while lo < hi:
+			mid = (lo + hi + 1) // 2
+			if cross(o, pts[mid]) * sign >= 0:
+				lo = mid
+			else:
+				hi = mid - 1
+		k = lo
+
+		# a point near the boundary is near the outer edge of its triangle, one of its neighbors or one of the edges at o
+		for i in (k - 1, k, k + 1, 0, n - 1):
+			if 0 <= i < n and on_edge(i): return 2
+
+		# if o has flat neighbor points, the sides of the triangle can be part of the boundary as well
+		for j in (k, k + 1):
+			c = pts[j]
+			if c.x == o.x and c.y == o.y: continue
+
+			for d in (pts[1], pts[-1]):
+				if (d.x - o.x) * (c.y - o.y) == (d.y - o.y) * (c.x - o.x) and distance_point_lineseg_squared(p, o, c) < EPSILON * EPSILON:
+					return 2
+
+		if cross(o, pts[1]) * sign > 0 and cross(o, pts[-1]) * sign < 0 and cross(pts[k], pts[k+1]) * sign > 0:
+			return 1
+
+		return 0
+
+	def contains_points(self, points):
+		"""Checks which of many points are contained in the polygon, or on the boundary.
+
+		The boundary distances and ray crossings of all points are computed against all edges at once using NumPy.
+
+		@type points: List, VectorArray or array-like
+		@param points: The points to classify, as a list of Vectors or anything convertible to an (N,2) NumPy array
+
+		@return: An integer NumPy array with 0 for points outside, 1 for points in the polygon and 2 for points on the boundary
+		"""
+		return Polygon.contains_points_s(self.as_tuple_list(), points)
+
+	@staticmethod
+	def contains_points_s(pts, points, chunk_size=CONTAINS_POINTS_CHUNK):
+		"""Checks which points are contained in the polygon defined by pts, see L{contains_points}
+
+		@type pts: List
+		@param pts: The points of the polygon, as Vectors or 2-tuples
+
+		@type chunk_size: int
+		@param chunk_size: Maximum number of point/edge pairs to process at once, to bound the memory use
+		"""
+
+		if numpy is None: raise ImportError("Batch containment tests require NumPy")
+
+		a = numpy.array([ (p[0], p[1]) if isinstance(p, tuple) else (p.x, p.y) for p in pts ], dtype=float).reshape(-1, 2)
+		b = numpy.roll(a, -1, axis=0)
+
+		# a VectorArray, but not a NumPy array, whose data attribute is a raw buffer
+		if not isinstance(points, numpy.ndarray) and hasattr(points, 'data'): points = points.data
+		if len(points) and isinstance(points[0], Vector): points = [ (p.x, p.y) for p in points ]
+		q = numpy.asarray(points, dtype=float).reshape(-1, 2)
+
+		result = numpy.zeros(len(q), dtype=int)
+		if len(a) == 0 or len(q) == 0: return result
+
+		ab = b - a
+		ab_len_squared = numpy.einsum('ij,ij->i', ab, ab)
+		ab_len_squared_safe = numpy.where(ab_len_squared == 0, 1.0, ab_len_squared)
+
+		# the edges that cross a horizontal line, and the inverse slopes needed to find the crossing x coordinate
+		slope = ab[:, 0] / numpy.where(ab[:, 1] == 0, 1.0, ab[:, 1])
+
+		step = max(1, chunk_size // len(a))
+		for start in range(0, len(q), step):
+			qc = q[start:start+step, numpy.newaxis, :]
+			qx, qy = qc[..., 0], qc[..., 1]
+
+			# squared distance to the closest point on every edge
+			aq = qc - a
+			t = numpy.clip((aq[..., 0] * ab[:, 0] + aq[..., 1] * ab[:, 1]) / ab_len_squared_safe, 0.0, 1.0)
+			ex = aq[..., 0] - t * ab[:, 0]
+			ey = aq[..., 1] - t * ab[:, 1]
+			boundary = numpy.any(ex * ex + ey * ey < EPSILON * EPSILON, axis=1)
+
+			# crossing number of a ray cast in x direction, counting edges that span the ray height half-open
+			spans = (a[:, 1] > qy) != (b[:, 1] > qy)
+			crossings = numpy.count_nonzero(spans & (qx < a[:, 0] + (qy - a[:, 1]) * slope), axis=1)
+
+			result[start:start+step] = numpy.where(boundary, 2, crossings % 2)
+
+		return result
+
 	def as_tuple_list(self):
 		return [(p.x, p.y) for p in self.points]
 
@@ -868,6 +1340,12 @@ class Polygon(object):
 	def get_bottom(self):
 		return max(self.points, key=lambda p: p.y).y
 
+	def get_bounding_box(self):
+		"""Get the bounding box of the polygon as a (left, top, right, bottom) tuple"""
+		xs = [p.x for p in self.points]
+		ys = [p.y for p in self.points]
+		return (min(xs), min(ys), max(xs), max(ys))
+
 	append = add_point
 	extend = add_points
 
@@ -881,3 +1359,874 @@ class Polygon(object):
 
 	width = property(get_width)
 	height = property(get_height)
+
+	bounding_box = property(get_bounding_box)
+	signed_area = property(get_signed_area)
+
+
+class ArrayPolygon(Polygon):
+	"""Polygon that stores its coordinates in a contiguous array of floats.
+
+	The bounding box, center, signed area, orientation and convexity are computed once and cached until the polygon is changed through one of its mutation methods.
+
+	The points property returns a new list of FrozenVectors, so an ArrayPolygon can not be modified by changing that list or its points. Use add_point, add_points, item assignment and deletion, flip, sort_around or assign to points instead.
+	"""
+
+	def __init__(self):
+		"""Create a new, empty ArrayPolygon object"""
+		self._coords = array('d')
+		self._cache = {}
+
+	@staticmethod
+	def from_pointlist(points):
+		"""Create an array polygon from a list of points
+
+		@type points: List
+		@param points: List of Vectors that make up the polygon
+		"""
+
+		p = ArrayPolygon()
+		p.points = points
+		return p
+
+	@staticmethod
+	def from_tuples(tuples):
+		"""Create an array polygon from 2-tuples
+
+		@type tuples: List
+		@param tuples: List of tuples of x,y coordinates
+		"""
+
+		p = ArrayPolygon()
+		for t in tuples:
+			p._coords.append(t[0])
+			p._coords.append(t[1])
+		return p
+
+	@staticmethod
+	def from_polygon(polygon):
+		"""Create an array polygon with the same points as polygon
+
+		@type polygon: Polygon
+		@param polygon: The polygon to copy the points from
+		"""
+		return ArrayPolygon.from_pointlist(polygon.points)
+
+	def get_coords(self):
+		"""Get the flat coordinate array [x0, y0, x1, y1, ...] of the polygon.
+
+		If you change the array in place, call L{invalidate} afterwards.
+		"""
+		return self._coords
+
+	def invalidate(self):
+		"""Drop all cached properties. Only needed after changing the coordinate array directly."""
+		self._cache.clear()
+
+	def _cached(self, key, compute):
+		try:
+			return self._cache[key]
+		except KeyError:
+			value = self._cache[key] = compute()
+			return value
+
+	def get_points(self):
+		return list(self._cached('points', self._compute_points))
+
+	def set_points(self, points):
+		coords = array('d')
+		for p in points:
+			coords.append(p.x)
+			coords.append(p.y)
+
+		self._coords = coords
+		self._cache.clear()
+
+	def _compute_points(self):
+		c = self._coords
+		return [FrozenVector(c[i], c[i+1]) for i in range(0, len(c), 2)]
+
+	def add_point(self, point):
+		"""Add a new point at the end of the polygon
+
+		@type point: Vector
+		@param point: The new Vector to add to the polygon
+		"""
+		self._coords.append(point.x)
+		self._coords.append(point.y)
+		self._cache.clear()
+
+	def add_points(self, points):
+		"""Add multiple new points to the end of the polygon
+
+		@type points: List
+		@param points: A list of Vectors to add
+		"""
+		for p in points:
+			self._coords.append(p.x)
+			self._coords.append(p.y)
+		self._cache.clear()
+
+	def sort_around(self, center):
+		"""Re-order points by their angle with respect to a certain center point"""
+		poly = Polygon.from_pointlist(self.points)
+		poly.sort_around(center)
+		self.points = poly.points
+
+	def clone(self):
+		"""Return a copy of the polygon that shares the cached properties computed so far"""
+		poly = ArrayPolygon()
+		poly._coords = array('d', self._coords)
+		poly._cache = dict(self._cache)
+		return poly
+
+	def flip(self):
+		"""Reverses the orientation of the polygon"""
+		c = self._coords
+		xs, ys = c[0::2], c[1::2]
+		xs.reverse()
+		ys.reverse()
+		c[0::2], c[1::2] = xs, ys
+
+		# the bounding box and center do not depend on the point order
+		self._cache = dict((k, v) for k, v in self._cache.items() if k in ('bbox', 'center'))
+		return self
+
+	def __getitem__(self, key):
+		if isinstance(key, slice): return self.points[key]
+
+		if key < 0: key += len(self)
+		if key < 0 or key >= len(self): raise IndexError("polygon index out of range")
+
+		return FrozenVector(self._coords[2*key], self._coords[2*key+1])
+
+	def __setitem__(self, key, value):
+		if isinstance(key, slice):
+			pts = self.points
+			pts[key] = value
+			self.points = pts
+			return
+
+		if key < 0: key += len(self)
+		if key < 0 or key >= len(self): raise IndexError("polygon assignment index out of range")
+
+		self._coords[2*key] = value.x
+		self._coords[2*key+1] = value.y
+		self._cache.clear()
+
+	def __delitem__(self, key):
+		if isinstance(key, slice):
+			pts = self.points
+			del pts[key]
+			self.points = pts
+			return
+
+		if key < 0: key += len(self)
+		if key < 0 or key >= len(self): raise IndexError("polygon index out of range")
+
+		del self._coords[2*key:2*key+2]
+		self._cache.clear()
+
+	def __len__(self):
+		return len(self._coords) // 2
+
+	def as_tuple_list(self):
+		c = self._coords
+		return [(c[i], c[i+1]) for i in range(0, len(c), 2)]
+
+	def get_bounding_box(self):
+		"""Get the bounding box of the polygon as a (left, top, right, bottom) tuple"""
+		return self._cached('bbox', self._compute_bounding_box)
+
+	def _compute_bounding_box(self):
+		xs, ys = self._coords[0::2], self._coords[1::2]
+		return (min(xs), min(ys), max(xs), max(ys))
+
+	def get_centerpoint(self):
+		"""Get the center of mass for the polygon"""
+		return self._cached('center', self._compute_centerpoint)
+
+	def _compute_centerpoint(self):
+		n = len(self)
+		return FrozenVector(float(sum(self._coords[0::2])) / n, float(sum(self._coords[1::2])) / n)
+
+	def get_signed_area(self):
+		"""Get the signed area of the polygon. The area is positive for clockwise and negative for counter-clockwise polygons."""
+		return self._cached('signed_area', self._compute_signed_area)
+
+	def _compute_signed_area(self):
+		xs, ys = self._coords[0::2], self._coords[1::2]
+		xs_next, ys_next = xs[1:] + xs[:1], ys[1:] + ys[:1]
+		return sum(x * yn - xn * y for x, y, xn, yn in zip(xs, ys, xs_next, ys_next)) / 2.0
+
+	def is_clockwise(self):
+		"""Determines whether the polygon has a clock-wise orientation."""
+		return self._cached('clockwise', self._compute_clockwise)
+
+	def _compute_clockwise(self):
+		c = self._coords
+		n = len(self)
+		xs = c[0::2]
+
+		# get previous, current and next points around the point with minimal x value
+		i = xs.index(min(xs))
+		a, b = 2 * (i - 1 if i > 0 else n - 1), 2 * i
+		d = 2 * ((i + 1) % n)
+
+		return (c[b] - c[a]) * (c[d+1] - c[a+1]) - (c[d] - c[a]) * (c[b+1] - c[a+1]) > 0
+
+	def is_convex(self):
+		"""Determines whether the polygon is convex."""
+		return self._cached('convex', self._compute_convex)
+
+	def _compute_convex(self):
+		c = self._coords
+		n = len(self)
+
+		def orientation(i):
+			a, b, d = 2 * ((i - 1) % n), 2 * i, 2 * ((i + 1) % n)
+			return (c[b] - c[a]) * (c[d+1] - c[a+1]) - (c[d] - c[a]) * (c[b+1] - c[a+1]) > 0
+
+		ori = orientation(0)
+		for i in range(1, n):
+			if orientation(i) != ori: return False
+
+		return True
+
+	def contains_point(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary.
+
+		Uses the O(log n) test of L{contains_point_convex} if the polygon is convex and not self-intersecting.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+		pts = self._cached('points', self._compute_points)
+		if self._cached('fan', self._compute_fan): return Polygon.contains_point_convex_s(pts, p)
+		return Polygon.contains_point_s(pts, p)
+
+	def _compute_fan(self):
+		# a star polygon turns the same way at every vertex too, but is not convex
+		return self.is_convex() and not self.is_self_intersecting()
+
+	def prepare(self):
+		"""Get a L{PreparedPolygon} for fast repeated containment queries. It is cached until the polygon is changed."""
+		return self._cached('prepared', lambda: PreparedPolygon(self.points))
+
+	def get_left(self):
+		return self.get_bounding_box()[0]
+
+	def get_top(self):
+		return self.get_bounding_box()[1]
+
+	def get_right(self):
+		return self.get_bounding_box()[2]
+
+	def get_bottom(self):
+		return self.get_bounding_box()[3]
+
+	append = add_point
+	extend = add_points
+
+	points = property(get_points, set_points)
+	coords = property(get_coords)
+
+	center = property(get_centerpoint)
+
+	left = property(get_left)
+	right = property(get_right)
+
+	top = property(get_top)
+	bottom = property(get_bottom)
+
+	bounding_box = property(get_bounding_box)
+
+	signed_area = property(get_signed_area)
+
+
+class PreparedPolygon(object):
+	"""Read-only point containment index for a polygon.
+
+	The y coordinates of all vertices cut the plane into horizontal slabs. Each slab stores the polygon edges that cross it,
+	sorted from left to right, so that a containment query only needs two binary searches: one for the slab and one for the
+	position of the point among the edges of the slab. This makes repeated queries against the same polygon O(log n) instead
+	of O(n) for L{Polygon.contains_point}. Building the index takes O(n^2) time and memory in the worst case, when many
+	edges cross many slabs, and much less for typical polygons whose edges are short compared to their extent.
+
+	The index is a snapshot: it does not follow later changes to the polygon it was created from.
+
+		>>> prepared = Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (2, 1), (0, 4)]).prepare()
+		>>> [ int(c) for c in prepared.contains_points([Vector(1, 1), Vector(2, 3), Vector(4, 2)]) ]
+		[1, 0, 2]
+	"""
+
+	def __init__(self, points):
+		"""Create a new prepared polygon.
+
+		@type points: List
+		@param points: The points of the polygon, or a Polygon
+		"""
+
+		pts = points.points if isinstance(points, Polygon) else points
+		self.points = [ Vector(p.x, p.y) for p in pts ]
+
+		n = len(self.points)
+		self.edges = [ (self.points[i], self.points[(i + 1) % n]) for i in range(n) ]
+
+		# slab k lies between ys[k] and ys[k+1]
+		self.ys = sorted(set(p.y for p in self.points))
+
+		self.slabs = [ [] for _ in range(max(len(self.ys) - 1, 0)) ]
+		self.horizontal = defaultdict(list)
+
+		# per edge: x at the lower end and dx/dy, to evaluate the x coordinate of the edge at a given y
+		self.edge_x0, self.edge_y0, self.edge_slope = [], [], []
+
+		for i, (a, b) in enumerate(self.edges):
+			if a.y > b.y: a, b = b, a
+
+			self.edge_x0.append(a.x)
+			self.edge_y0.append(a.y)
+
+			if a.y == b.y:
+				self.edge_slope.append(0.0)
+				self.horizontal[bisect.bisect_left(self.ys, a.y)].append(i)
+				continue
+
+			self.edge_slope.append(float(b.x - a.x) / (b.y - a.y))
+			for k in range(bisect.bisect_left(self.ys, a.y), bisect.bisect_left(self.ys, b.y)):
+				self.slabs[k].append(i)
+
+		# sort edges in every slab from left to right. edges of a simple polygon do not cross inside a slab, so the order is the
+		# same at every y of the slab. if that does not hold (for self-intersecting polygons), the slab is searched linearly.
+		self.slab_sorted = []
+		self.slab_reach = []
+		for k, slab in enumerate(self.slabs):
+			y_mid = (self.ys[k] + self.ys[k+1]) * 0.5
+			slab.sort(key=lambda i: self._edge_x(i, y_mid))
+
+			is_sorted = True
+			for y in (self.ys[k], self.ys[k+1]):
+				xs = [ self._edge_x(i, y) for i in slab ]
+				if any(x2 < x1 - EPSILON for x1, x2 in zip(xs, xs[1:])): is_sorted = False
+
+			self.slab_sorted.append(is_sorted)
+
+			# a point closer than EPSILON to an edge is at most EPSILON * sqrt(1 + slope^2) away from it horizontally
+			self.slab_reach.append(EPSILON * max(math.sqrt(1 + self.edge_slope[i] ** 2) for i in slab))
+
+	def _edge_x(self, i, y):
+		return self.edge_x0[i] + (y - self.edge_y0[i]) * self.edge_slope[i]
+
+	def _on_edge(self, i, p):
+		a, b = self.edges[i]
+		if a.x == b.x and a.y == b.y: return (p - a).length_squared < EPSILON * EPSILON
+		return distance_point_lineseg_squared(p, a, b) < EPSILON * EPSILON
+
+	def _on_boundary(self, p, k):
+		"""Check whether p is on an edge, given the slab k that contains p.y or None"""
+
+		ys = self.ys
+
+		# edges in the slab of p can be found by their horizontal distance to p
+		if k is not None:
+			slab = self.slabs[k]
+			if self.slab_sorted[k]:
+				reach = self.slab_reach[k]
+				pos = self._position(k, p)
+				j = pos - 1
+				while j >= 0 and p.x - self._edge_x(slab[j], p.y) <= reach:
+					if self._on_edge(slab[j], p): return True
+					j -= 1
+
+				j = pos
+				while j < len(slab) and self._edge_x(slab[j], p.y) - p.x <= reach:
+					if self._on_edge(slab[j], p): return True
+					j += 1
+			else:
+				if any(self._on_edge(i, p) for i in slab): return True
+
+		# near a slab border, the edges ending at the border and the horizontal edges on the border are also candidates
+		lo = bisect.bisect_left(ys, p.y - EPSILON)
+		hi = bisect.bisect_right(ys, p.y + EPSILON)
+		for b in range(lo, hi):
+			if any(self._on_edge(i, p) for i in self.horizontal.get(b, ())): return True
+
+			for kk in (b - 1, b):
+				if kk != k and 0 <= kk < len(self.slabs):
+					if any(self._on_edge(i, p) for i in self.slabs[kk]): return True
+
+		return False
+
+	def _position(self, k, p):
+		"""Binary search for the number of edges in sorted slab k that are left of p"""
+		slab = self.slabs[k]
+		lo, hi = 0, len(slab)
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if self._edge_x(slab[mid], p.y) < p.x:
+				lo = mid + 1
+			else:
+				hi = mid
+
+		return lo
+
+	def contains_point(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+
+		if not self.slabs:
+			return 2 if any(self._on_edge(i, p) for i in range(len(self.edges))) else 0
+
+		k = bisect.bisect_right(self.ys, p.y) - 1
+		if k < 0 or k >= len(self.slabs): k = None
+
+		if self._on_boundary(p, k): return 2
+		if k is None: return 0
+
+		# count the edges right of p, i.e. the crossings of a ray cast from p in x direction
+		slab = self.slabs[k]
+		if self.slab_sorted[k]:
+			crossings = len(slab) - self._position(k, p)
+		else:
+			crossings = sum(1 for i in slab if self._edge_x(i, p.y) > p.x)
+
+		return 1 if crossings % 2 == 1 else 0
+
+	def contains_points(self, points):
+		"""Classify many points at once, see L{contains_point}
+
+		@type points: List, VectorArray or array-like
+		@param points: The points to classify, as a list of Vectors or 2-tuples or an (N,2) NumPy array
+
+		@return: Like L{Polygon.contains_points}, an integer NumPy array with 0 (outside), 1 (inside) or 2 (boundary) for every point. Without NumPy, a list.
+		"""
+		return _classify_points(self.contains_point, points)
+
+	def get_bounding_box(self):
+		"""Get the bounding box of the polygon as a (left, top, right, bottom) tuple"""
+		xs = [p.x for p in self.points]
+		return (min(xs), self.ys[0], max(xs), self.ys[-1])
+
+	bounding_box = property(get_bounding_box)
+
+
+class PolygonWithHoles(object):
+	"""Polygon with holes.
+
+	The outline is stored counter-clockwise and the holes clockwise, which is how L{Polygon.offset} tells islands from holes.
+	Bounding boxes, prepared polygons for containment tests and a L{SegmentBVH} over all edges are computed when first needed
+	and cached, so the shape should not be changed after creating it.
+
+		>>> square = PolygonWithHoles(Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)]), [Polygon.from_tuples([(1, 1), (3, 1), (3, 3), (1, 3)])])
+		>>> [ int(c) for c in square.contains_points([Vector(0.5, 0.5), Vector(2, 2), Vector(1, 2)]) ]
+		[1, 0, 2]
+		>>> square.area
+		12.0
+	"""
+
+	def __init__(self, outline, holes=()):
+		"""Create a new polygon with holes.
+
+		@type outline: Polygon
+		@param outline: The outer boundary
+
+		@type holes: List
+		@param holes: Polygons inside of outline to be considered as holes. They must not overlap each other.
+		"""
+		self._outline = outline.clone_ccw()
+		self._holes = [ h.clone_cw() for h in holes ]
+		self._cache = {}
+
+	@staticmethod
+	def from_list(polygons):
+		"""Create a polygon with holes from a list of polygons, the first one being the outline and all additional ones being holes.
+
+		This is the format returned by L{py2d.SVG.convert_svg} and L{Polygon.union_all}.
+		"""
+		return PolygonWithHoles(polygons[0], polygons[1:])
+
+	def _cached(self, key, compute):
+		if key not in self._cache:
+			self._cache[key] = compute()
+		return self._cache[key]
+
+	def get_outline(self):
+		return self._outline
+
+	def get_holes(self):
+		return list(self._holes)
+
+	def get_polygons(self):
+		"""Get the outline followed by the holes"""
+		return [self._outline] + self._holes
+
+	def get_bounding_box(self):
+		"""Get the bounding box of the outline as a (left, top, right, bottom) tuple"""
+		return self._cached('bounding_box', lambda: tuple(self._outline.get_bounding_box()))
+
+	def get_hole_boxes(self):
+		"""Get the bounding boxes of the holes"""
+		return self._cached('hole_boxes', lambda: [ tuple(h.get_bounding_box()) for h in self._holes ])
+
+	def get_area(self):
+		"""Get the area of the outline minus the area of the holes"""
+		return self._cached('area', lambda: abs(self._outline.get_signed_area()) - sum(abs(h.get_signed_area()) for h in self._holes))
+
+	def prepare(self):
+		"""Get the L{PreparedPolygon}s of the outline and the holes"""
+		return self._cached('prepared', lambda: [ PreparedPolygon(p.points) for p in self.get_polygons() ])
+
+	def contains_point(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary. Points in holes are not contained.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+
+		left, top, right, bottom = self.get_bounding_box()
+		if p.x < left - EPSILON or p.x > right + EPSILON or p.y < top - EPSILON or p.y > bottom + EPSILON: return 0
+
+		prepared = self.prepare()
+		c = prepared[0].contains_point(p)
+		if c != 1: return c
+
+		for hole, (left, top, right, bottom) in zip(prepared[1:], self.get_hole_boxes()):
+			if p.x < left - EPSILON or p.x > right + EPSILON or p.y < top - EPSILON or p.y > bottom + EPSILON: continue
+
+			c = hole.contains_point(p)
+			if c == 2: return 2
+			if c == 1: return 0
+
+		return 1
+
+	def contains_points(self, points):
+		"""Classify many points at once, see L{contains_point} and L{PreparedPolygon.contains_points}
+
+		@return: An integer NumPy array with 0 (outside), 1 (inside) or 2 (boundary) for every point. Without NumPy, a list.
+		"""
+		return _classify_points(self.contains_point, points)
+
+	def get_edges(self):
+		"""Get the edges of the outline and the holes as a list of 2-tuples of Vectors"""
+		return self._cached('edges', lambda: [ e for poly in self.get_polygons() for e in zip(poly.points, poly.points[1:] + poly.points[:1]) ])
+
+	def get_edge_index(self):
+		"""Get a L{SegmentBVH} over L{get_edges}"""
+		return self._cached('edge_index', lambda: SegmentBVH(self.get_edges()))
+
+	def distance_point_squared(self, p):
+		"""Get the squared distance from p to the polygon. Points inside the polygon or on its boundary have a distance of 0."""
+		if self.contains_point(p): return 0
+		return self.get_edge_index().nearest(p)[1]
+
+	def __iter__(self):
+		return iter(self.get_polygons())
+
+	def __eq__(self, other):
+		if not isinstance(other, PolygonWithHoles): return False
+		return self.get_polygons() == other.get_polygons()
+
+	def __repr__(self):
+		return "PolygonWithHoles(%r, %r)" % (self._outline, self._holes)
+
+	outline = property(get_outline)
+	holes = property(get_holes)
+	polygons = property(get_polygons)
+	bounding_box = property(get_bounding_box)
+	area = property(get_area)
+	edges = property(get_edges)
+	edge_index = property(get_edge_index)
+
+
+class PolygonSet(object):
+	"""Set of non-overlapping polygons with holes.
+
+	PolygonSets can be combined with L{union}, L{intersect} and L{subtract}, which unlike the boolean operations on single
+	Polygons handle holes in both operands. L{Polygon.union}, L{Polygon.intersect} and L{Polygon.subtract} use them when
+	they get a PolygonSet or L{PolygonWithHoles}.
+
+		>>> square = PolygonSet([Polygon.from_tuples([(0, 0), (4, 0), (4, 4), (0, 4)])])
+		>>> frame = square.subtract(Polygon.from_tuples([(1, 1), (3, 1), (3, 3), (1, 3)]))
+		>>> len(frame), frame.area, len(frame[0].holes)
+		(1, 12.0, 1)
+		>>> frame.union(Polygon.from_tuples([(2, 2), (5, 2), (5, 3), (2, 3)])).area
+		14.0
+	"""
+
+	def __init__(self, regions=()):
+		"""Create a new polygon set.
+
+		@type regions: List
+		@param regions: The regions, given as PolygonWithHoles, Polygons or lists [outline, hole, hole, ...]. They must not overlap each other.
+		"""
+		self._regions = [ PolygonSet._region(r) for r in regions ]
+		self._cache = {}
+
+	@staticmethod
+	def _region(region):
+		if isinstance(region, PolygonWithHoles): return region
+		if isinstance(region, Polygon): return PolygonWithHoles(region)
+		return PolygonWithHoles.from_list(region)
+
+	@staticmethod
+	def from_any(shape):
+		"""Get a PolygonSet for a PolygonSet, a PolygonWithHoles, a Polygon or a list of regions"""
+		if isinstance(shape, PolygonSet): return shape
+		if isinstance(shape, (Polygon, PolygonWithHoles)): return PolygonSet([shape])
+		return PolygonSet(shape)
+
+	@staticmethod
+	def from_polygons(polygons):
+		"""Create a polygon set from polygons that do not cross each other, telling outlines from holes by how they are nested.
+
+		Polygons inside of an even number of other polygons are outlines, polygons inside of an odd number are holes. The
+		orientation of the polygons does not matter.
+
+		@type polygons: List
+		@param polygons: The polygons, for example the output of L{Polygon.offset} or of a boolean operation
+		"""
+
+		by_area = sorted((p for p in polygons if len(p) >= 3), key=lambda p: -abs(p.get_signed_area()))
+		prepared = [ PreparedPolygon(p.points) for p in by_area ]
+
+		def inside(j, p):
+			# the first point that is not on the boundary decides
+			return next((c for c in map(prepared[j].contains_point, p.points) if c != 2), 2) != 0
+
+		regions = []
+		region_of = []
+		for i, p in enumerate(by_area):
+
+			# the smallest larger polygon containing p
+			k = next((j for j in range(i - 1, -1, -1) if _polygons_touch(by_area[j], p) and inside(j, p)), None)
+
+			if k is None or region_of[k][1]:
+				region = [p]
+				regions.append(region)
+				region_of.append((region, False))
+			else:
+				region_of[k][0].append(p)
+				region_of.append((region_of[k][0], True))
+
+		return PolygonSet(regions)
+
+	def get_regions(self):
+		return list(self._regions)
+
+	def get_polygons(self):
+		"""Get the outlines and holes of all regions as one list. Outlines are counter-clockwise, holes clockwise, like L{Polygon.offset} expects them."""
+		return [ p for r in self._regions for p in r.get_polygons() ]
+
+	def get_bounding_box(self):
+		"""Get the bounding box of all regions as a (left, top, right, bottom) tuple, or None if the set is empty"""
+		if not self._regions: return None
+
+		boxes = [ r.get_bounding_box() for r in self._regions ]
+		return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+	def get_area(self):
+		return sum(r.get_area() for r in self._regions)
+
+	def contains_point(self, p):
+		"""Checks if p is contained in one of the regions, or on the boundary of one.
+
+		@return: 0 if outside, 1 if inside, 2 if on the boundary.
+		"""
+		for r in self._regions:
+			c = r.contains_point(p)
+			if c: return c
+		return 0
+
+	def contains_points(self, points):
+		"""Classify many points at once, see L{contains_point} and L{PreparedPolygon.contains_points}
+
+		@return: An integer NumPy array with 0 (outside), 1 (inside) or 2 (boundary) for every point. Without NumPy, a list.
+		"""
+		return _classify_points(self.contains_point, points)
+
+	def get_edges(self):
+		"""Get the edges of all regions as a list of 2-tuples of Vectors"""
+		return self._cached('edges', lambda: [ e for r in self._regions for e in r.get_edges() ])
+
+	def get_edge_index(self):
+		"""Get a L{SegmentBVH} over L{get_edges}"""
+		return self._cached('edge_index', lambda: SegmentBVH(self.get_edges()))
+
+	def _cached(self, key, compute):
+		if key not in self._cache:
+			self._cache[key] = compute()
+		return self._cache[key]
+
+	def union(self, other):
+		"""Get the union with another PolygonSet, PolygonWithHoles or Polygon as a new PolygonSet"""
+		other = PolygonSet.from_any(other)
+
+		merged = Polygon._merge_regions([ (r.get_bounding_box(), r.get_polygons()) for r in self._regions ],
+		                                [ (r.get_bounding_box(), r.get_polygons()) for r in other._regions ], False)
+
+		return PolygonSet([ r for box, r in merged ])
+
+	def intersect(self, other):
+		"""Get the intersection with another PolygonSet, PolygonWithHoles or Polygon as a new PolygonSet"""
+		other = PolygonSet.from_any(other)
+
+		out = []
+		for a in self._regions:
+			for b in other._regions:
+				if not _polygons_touch(a.outline, b.outline): continue
+
+				regions = PolygonSet._clip(a.get_polygons(), b.outline)
+				for hole in b.holes:
+					regions = [ r for region in regions for r in PolygonSet._cut(region, hole) ]
+
+				out.extend(regions)
+
+		return PolygonSet(out)
+
+	def subtract(self, other):
+		"""Subtract another PolygonSet, PolygonWithHoles or Polygon and return the result as a new PolygonSet"""
+		other = PolygonSet.from_any(other)
+
+		regions = [ r.get_polygons() for r in self._regions ]
+		for b in other._regions:
+			cut = [ r for region in regions for r in PolygonSet._cut(region, b.outline) ]
+
+			# the parts of the regions in the holes of b are kept
+			kept = [ r for region in regions for hole in b.holes for r in PolygonSet._clip(region, hole) ]
+
+			if kept:
+				merged = Polygon._merge_regions([ (tuple(r[0].get_bounding_box()), r) for r in cut ], [ (tuple(r[0].get_bounding_box()), r) for r in kept ], False)
+				regions = [ r for box, r in merged ]
+			else:
+				regions = cut
+
+		return PolygonSet(regions)
+
+	@staticmethod
+	def _clip(region, poly):
+		"""Intersect a region [outline, hole, hole, ...] with a simple polygon"""
+
+		outline, holes = region[0], region[1:]
+		if not _polygons_touch(outline, poly) or not outline.overlaps(poly): return []
+
+		fragments = Polygon.boolean_operation(outline, poly, 'i')
+		outlines = Polygon._region_parts(fragments, False)
+		if not outlines: return []
+
+		regions = Polygon._assign_holes(outlines, Polygon._region_parts(fragments, True))
+		for hole in holes:
+			regions = [ r for region in regions for r in PolygonSet._cut(region, hole) ]
+
+		return regions
+
+	@staticmethod
+	def _cut(region, poly):
+		"""Subtract a simple polygon from a region [outline, hole, hole, ...]"""
+
+		outline, holes = region[0], region[1:]
+		if not _polygons_touch(outline, poly) or not outline.overlaps(poly) or Polygon._region_in_holes(region, [poly]): return [region]
+
+		fragments = Polygon.boolean_operation(outline, poly, 'd')
+		pieces = Polygon._region_parts(fragments, False)
+		holes = holes + Polygon._region_parts(fragments, True)
+
+		out = []
+		while pieces:
+			piece = pieces.pop()
+			area = abs(piece.get_signed_area())
+
+			inner = []
+			for hole in holes:
+				if not _polygons_touch(piece, hole) or not piece.overlaps(hole): continue
+
+				fragments = Polygon.boolean_operation(piece, hole, 'd')
+				rest = Polygon._region_parts(fragments, False)
+
+				if Polygon._region_parts(fragments, True):
+					# the hole is inside of the piece
+					inner.append(hole)
+
+				elif abs(sum(abs(f.get_signed_area()) for f in rest) - area) > EPSILON:
+					# the hole crosses the boundary of the piece and cuts it, all holes need to be checked against the new pieces
+					pieces.extend(rest)
+					break
+			else:
+				out.extend(PolygonSet._merge_holes(piece, inner))
+
+		return out
+
+	@staticmethod
+	def _merge_holes(outline, holes):
+		"""Build regions from an outline and holes that may overlap each other"""
+
+		if len(holes) < 2: return [ [outline] + holes ]
+
+		merged = Polygon._merge_regions([], [ (tuple(h.get_bounding_box()), [h]) for h in holes ], True)
+
+		# overlapping holes can enclose islands, which become regions of their own
+		return [ [outline] + [ r[0] for box, r in merged ] ] + [ [island] for box, r in merged for island in r[1:] ]
+
+	def __len__(self):
+		return len(self._regions)
+
+	def __iter__(self):
+		return iter(self._regions)
+
+	def __getitem__(self, key):
+		return self._regions[key]
+
+	def __eq__(self, other):
+		if not isinstance(other, PolygonSet): return False
+		return self._regions == other._regions
+
+	def __repr__(self):
+		return "PolygonSet(%r)" % self._regions
+
+	regions = property(get_regions)
+	polygons = property(get_polygons)
+	bounding_box = property(get_bounding_box)
+	area = property(get_area)
+	edges = property(get_edges)
+	edge_index = property(get_edge_index)
+
+
+def _polygons_touch(a, b):
+	"""Check whether the bounding boxes of two polygons overlap or touch"""
+	a, b = a.get_bounding_box(), b.get_bounding_box()
+	return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def encode_polygon(polygon):
+	"""Encode the points of a polygon as the bytes of a flat array of doubles [x0, y0, x1, y1, ...]"""
+	if isinstance(polygon, ArrayPolygon): return polygon.get_coords().tobytes()
+
+	coords = array('d')
+	for p in polygon.points:
+		coords.append(p.x)
+		coords.append(p.y)
+	return coords.tobytes()
+
+def decode_polygon(data):
+	"""Create a Polygon from bytes produced by L{encode_polygon}"""
+	coords = array('d')
+	coords.frombytes(data)
+	return Polygon.from_pointlist([ Vector(coords[i], coords[i+1]) for i in range(0, len(coords), 2) ])
+
+def _boolean_operation_job(job):
+	data_a, data_b, operation = job
+	fragments = Polygon.boolean_operation(decode_polygon(data_a), decode_polygon(data_b), operation)
+	return [ encode_polygon(f) for f in fragments ]
+
+
+def _classify_points(contains_point, points):
+	"""Classify points one by one with contains_point, and return the codes in the same form as L{Polygon.contains_points}"""
+
+	if numpy is not None and isinstance(points, numpy.ndarray):
+		points = points.reshape(-1, 2).tolist()
+	elif hasattr(points, 'data'):
+		points = points.data.tolist()
+
+	codes = [ contains_point(p if isinstance(p, Vector) else Vector(p[0], p[1])) for p in points ]
+
+	if numpy is None: return codes
+	return numpy.array(codes, dtype=int)
@@ -0,0 +1,518 @@
+import sys
+import math
+import heapq
+import struct
+from array import array
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import distance_point_box_squared
+
+class RTreeNode(object):
+	"""Node of an L{RTree}.
+
+	Leaf nodes hold (box, value) entries, inner nodes hold (box, node) entries for their children.
+	"""
+
+	__slots__ = ('leaf', 'entries', 'box')
+
+	def __init__(self, leaf, entries):
+		self.leaf = leaf
+		self.entries = entries
+		self.box = union_boxes([ e[0] for e in entries ])
+
+
+class RTree(object):
+	"""R-tree over axis-aligned bounding boxes.
+
+	Every entry of the tree is a (left, top, right, bottom) box with an arbitrary value. The tree is bulk-loaded with the
+	Sort-Tile-Recursive (STR) algorithm, which packs nodes completely full with boxes that are close to each other.
+	Entries can be inserted and deleted afterwards, splitting overfull nodes with Guttman's quadratic split.
+
+		>>> tree = RTree([ ((0, 0, 2, 2), 'a'), ((5, 0, 6, 1), 'b'), ((1, 1, 5, 3), 'c') ])
+		>>> tree.query_point(Vector(1.5, 1.5))
+		['a', 'c']
+		>>> tree.query_box(4, 0, 10, 0.5)
+		['b']
+	"""
+
+	def __init__(self, entries=(), max_entries=16):
+		"""Bulk-load a new R-tree.
+
+		@type entries: List
+		@param entries: List of (box, value) tuples, where box is a (left, top, right, bottom) tuple
+
+		@type max_entries: int
+		@param max_entries: The maximum number of entries per node
+		"""
+
+		if max_entries < 2: raise ValueError("R-tree nodes need to hold at least 2 entries")
+
+		self.max_entries = max_entries
+		self.min_entries = max(1, int(max_entries * 0.4))
+		self.size = 0
+		self.root = None
+
+		entries = [ (tuple(box), value) for box, value in entries ]
+		if entries: self._bulk_load(entries)
+
+	@staticmethod
+	def from_polygons(polygons, max_entries=16):
+		"""Bulk-load an R-tree over the bounding boxes of polygons.
+
+		@type polygons: List
+		@param polygons: The polygons to index. The value stored for each polygon is its index in this list.
+		"""
+		return RTree([ (poly.get_bounding_box(), i) for i, poly in enumerate(polygons) ], max_entries)
+
+	def _bulk_load(self, entries):
+		self.size = len(entries)
+
+		leaf = True
+		while True:
+			nodes = [ RTreeNode(leaf, group) for group in str_pack(entries, self.max_entries) ]
+			if len(nodes) == 1: break
+
+			entries = [ (node.box, node) for node in nodes ]
+			leaf = False
+
+		self.root = nodes[0]
+
+	def _search(self, box_test):
+		"""Collect the values of all entries whose boxes pass box_test, descending only into nodes passing it"""
+		if self.root is None: return []
+
+		out = []
+		stack = [self.root]
+		while stack:
+			node = stack.pop()
+			if node.leaf:
+				out.extend(value for box, value in node.entries if box_test(box))
+			else:
+				stack.extend(child for box, child in node.entries if box_test(box))
+
+		return out
+
+	def query_box(self, left, top, right, bottom):
+		"""Find the values of all entries whose boxes overlap a box. Boxes that only touch count as overlapping.
+
+		@return: A list of values, sorted if the values are sortable
+		"""
+		def box_test(b):
+			return b[0] <= right and b[2] >= left and b[1] <= bottom and b[3] >= top
+
+		return _sorted_if_possible(self._search(box_test))
+
+	def query_point(self, p):
+		"""Find the values of all entries whose boxes contain the point p, including their boundaries.
+
+		@return: A list of values, sorted if the values are sortable
+		"""
+		x, y = p.x, p.y
+
+		def box_test(b):
+			return b[0] <= x <= b[2] and b[1] <= y <= b[3]
+
+		return _sorted_if_possible(self._search(box_test))
+
+	def query_polygon(self, polygon, polygons):
+		"""Find the polygons of a tree built with L{from_polygons} that overlap a polygon.
+
+		@type polygon: Polygon
+		@param polygon: The polygon to test against
+
+		@type polygons: List
+		@param polygons: The list of polygons that the values of the tree are indices into
+
+		@return: A sorted list of indices of polygons that overlap or touch polygon
+		"""
+		return [ i for i in self.query_box(*polygon.get_bounding_box()) if polygons[i].overlaps(polygon) ]
+
+	def nearest(self, p, k=1, distance=None, max_distance=float('inf')):
+		"""Find the entries closest to a point.
+
+		Nodes are visited in the order of their distance to p, so only the part of the tree near p is searched.
+
+		@type p: Vector
+		@param p: The query point
+
+		@type k: int
+		@param k: The number of entries to find
+
+		@type distance: function
+		@param distance: Optional function f(value, box) returning the squared distance from p to an entry. It must never be less than the squared distance from p to the box of the entry. Defaults to the box distance.
+
+		@type max_distance: float
+		@param max_distance: Only consider entries closer than this distance
+
+		@return: A list of up to k (value, distance_squared) tuples, closest first
+		"""
+
+		if self.root is None or k < 1: return []
+
+		limit = max_distance * max_distance
+		found = []
+
+		# the heap holds nodes and entries by (lower bound of) their distance. exact entry distances are pushed back with
+		# kind 0 so that they are reported before boxes at the same distance.
+		counter = 0
+		heap = [(distance_point_box_squared(p, self.root.box), 2, counter, self.root, None)]
+		while heap and len(found) < k:
+			d, kind, _, item, box = heapq.heappop(heap)
+			if d > limit: break
+
+			if kind == 0:
+				found.append((item, d))
+
+			elif kind == 1:
+				counter += 1
+				heapq.heappush(heap, (distance(item, box), 0, counter, item, box))
+
+			elif item.leaf:
+				for box, value in item.entries:
+					counter += 1
+					heapq.heappush(heap, (distance_point_box_squared(p, box), 1 if distance else 0, counter, value, box))
+
+			else:
+				for box, child in item.entries:
+					counter += 1
+					heapq.heappush(heap, (distance_point_box_squared(p, box), 2, counter, child, box))
+
+		return found
+
+	def insert(self, box, value):
+		"""Insert a new entry.
+
+		@type box: tuple
+		@param box: The (left, top, right, bottom) box of the entry
+
+		@param value: The value to store for the entry
+		"""
+
+		entry = (tuple(box), value)
+		self.size += 1
+
+		if self.root is None:
+			self.root = RTreeNode(True, [entry])
+			return
+
+		# descend to the leaf whose box needs the least enlargement, remembering the path
+		path = [self.root]
+		while not path[-1].leaf:
+			path.append(min(path[-1].entries, key=lambda e: (box_enlargement(e[0], entry[0]), box_area(e[0])))[1])
+
+		path[-1].entries.append(entry)
+
+		# split overfull nodes and update the boxes on the way up
+		split = None
+		for depth in range(len(path) - 1, -1, -1):
+			node = path[depth]
+
+			if split is not None:
+				node.entries = [ e for e in node.entries if e[1] is not split[0] ]
+				node.entries.extend((n.box, n) for n in split)
+				split = None
+
+			if len(node.entries) > self.max_entries:
+				split = self._split(node)
+			else:
+				node.box = union_boxes([ e[0] for e in node.entries ])
+
+				# the entry of this node in its parent needs the new box as well
+				if depth > 0:
+					parent = path[depth - 1]
+					parent.entries = [ (node.box, n) if n is node else (b, n) for b, n in parent.entries ]
+
+		if split is not None:
+			self.root = RTreeNode(False, [ (n.box, n) for n in split ])
+
+	def _split(self, node):
+		"""Split an overfull node in two with the quadratic split, returning the node itself and the new sibling"""
+
+		entries = node.entries
+
+		# pick the two entries that would waste the most area in the same node as seeds
+		best = None
+		for i in range(len(entries)):
+			for j in range(i + 1, len(entries)):
+				a, b = entries[i][0], entries[j][0]
+				waste = box_enlargement(a, b) - box_area(b)
+				if best is None or waste > best[0]: best = (waste, i, j)
+
+		_, i, j = best
+		groups = ([entries[i]], [entries[j]])
+		boxes = [entries[i][0], entries[j][0]]
+		rest = [ e for k, e in enumerate(entries) if k != i and k != j ]
+
+		while rest:
+
+			# make sure both groups reach the minimum fill
+			for g in (0, 1):
+				if len(groups[g]) + len(rest) <= self.min_entries:
+					groups[g].extend(rest)
+					rest = []
+			if not rest: break
+
+			# assign the entry with the strongest preference for one group next
+			def preference(e):
+				return abs(box_enlargement(boxes[0], e[0]) - box_enlargement(boxes[1], e[0]))
+
+			e = max(rest, key=preference)
+			rest.remove(e)
+
+			g = min((0, 1), key=lambda g: (box_enlargement(boxes[g], e[0]), box_area(boxes[g]), len(groups[g])))
+			groups[g].append(e)
+			boxes[g] = union_boxes((boxes[g], e[0]))
+
+		node.entries = groups[0]
+		node.box = union_boxes([ e[0] for e in groups[0] ])
+
+		sibling = RTreeNode(node.leaf, groups[1])
+		return (node, sibling)
+
+	def delete(self, box, value):
+		"""Delete an entry.
+
+		@type box: tuple
+		@param box: The box the entry was inserted with, or any box overlapping it
+
+		@param value: The value of the entry. The first entry with an equal value and an overlapping box is deleted.
+
+		@return: True if an entry was deleted, False if there was no such entry
+		"""
+
+		if self.root is None: return False
+
+		left, top, right, bottom = box
+		def overlaps(b):
+			return b[0] <= right and b[2] >= left and b[1] <= bottom and b[3] >= top
+
+		# depth-first search for the leaf, keeping the path from the root
+		path = self._find_leaf(self.root, overlaps, value)
+		if path is None: return False
+
+		leaf = path[-1]
+		for k, e in enumerate(leaf.entries):
+			if e[1] == value and overlaps(e[0]):
+				del leaf.entries[k]
+				break
+
+		self.size -= 1
+
+		# remove underfull nodes on the way up, reinserting their entries later
+		orphans = []
+		for depth in range(len(path) - 1, 0, -1):
+			node, parent = path[depth], path[depth - 1]
+
+			if len(node.entries) < self.min_entries:
+				parent.entries = [ e for e in parent.entries if e[1] is not node ]
+				orphans.extend(self._leaf_entries(node))
+			else:
+				node.box = union_boxes([ e[0] for e in node.entries ])
+				parent.entries = [ (node.box, n) if n is node else (b, n) for b, n in parent.entries ]
+
+		root = self.root
+		if root.entries:
+			root.box = union_boxes([ e[0] for e in root.entries ])
+
+		# shorten the tree while the root only has a single child
+		while not self.root.leaf and len(self.root.entries) == 1:
+			self.root = self.root.entries[0][1]
+
+		if not self.root.entries:
+			self.root = None
+
+		self.size -= len(orphans)
+		for b, v in orphans:
+			self.insert(b, v)
+
+		return True
+
+	def _find_leaf(self, node, overlaps, value):
+		if node.leaf:
+			for b, v in node.entries:
+				if v == value and overlaps(b): return [node]
+			return None
+
+		for b, child in node.entries:
+			if overlaps(b):
+				path = self._find_leaf(child, overlaps, value)
+				if path is not None: return [node] + path
+
+		return None
+
+	def _leaf_entries(self, node):
+		if node.leaf: return list(node.entries)
+		return [ e for b, child in node.entries for e in self._leaf_entries(child) ]
+
+	def entries(self):
+		"""Get all (box, value) entries of the tree"""
+		return self._leaf_entries(self.root) if self.root is not None else []
+
+	def to_bytes(self):
+		"""Serialize the tree to a compact binary string.
+
+		Only trees with integer values, e.g. those built with L{from_polygons}, can be serialized.
+		The tree structure is stored as is, so L{from_bytes} restores it without rebuilding.
+		"""
+
+		nodes = []
+		if self.root is not None:
+			nodes.append(self.root)
+			for node in nodes:
+				if not node.leaf: nodes.extend(child for b, child in node.entries)
+
+		node_ids = dict((id(node), i) for i, node in enumerate(nodes))
+
+		flags = array('b', [ 1 if node.leaf else 0 for node in nodes ])
+		counts = array('i', [ len(node.entries) for node in nodes ])
+		boxes = array('d', [ c for node in nodes for b, ref in node.entries for c in b ])
+
+		refs = array('q')
+		for node in nodes:
+			for b, ref in node.entries:
+				if not node.leaf:
+					refs.append(node_ids[id(ref)])
+				elif isinstance(ref, int):
+					refs.append(ref)
+				else:
+					raise TypeError("Only R-trees with integer values can be serialized, got %r" % (ref,))
+
+		if sys.byteorder != 'little':
+			for a in (counts, boxes, refs): a.byteswap()
+
+		header = struct.pack(RTREE_HEADER, RTREE_MAGIC, RTREE_VERSION, self.max_entries, self.size, len(nodes), len(refs))
+		return header + flags.tobytes() + counts.tobytes() + boxes.tobytes() + refs.tobytes()
+
+	@staticmethod
+	def from_bytes(data):
+		"""Restore a tree serialized with L{to_bytes}"""
+
+		header_size = struct.calcsize(RTREE_HEADER)
+		magic, version, max_entries, size, n_nodes, n_entries = struct.unpack(RTREE_HEADER, data[:header_size])
+		if magic != RTREE_MAGIC or version != RTREE_VERSION: raise ValueError("Not a serialized R-tree")
+
+		def read(typecode, n, offset):
+			a = array(typecode)
+			a.frombytes(data[offset:offset + n * a.itemsize])
+			if len(a) != n: raise ValueError("Serialized R-tree is truncated")
+			if sys.byteorder != 'little' and a.itemsize > 1: a.byteswap()
+			return a, offset + n * a.itemsize
+
+		flags, offset = read('b', n_nodes, header_size)
+		counts, offset = read('i', n_nodes, offset)
+		boxes, offset = read('d', 4 * n_entries, offset)
+		refs, offset = read('q', n_entries, offset)
+
+		tree = RTree(max_entries=max_entries)
+		tree.size = size
+
+		# children are always stored after their parents, so build the nodes back to front
+		starts = [0] * n_nodes
+		for i in range(1, n_nodes): starts[i] = starts[i-1] + counts[i-1]
+
+		nodes = [None] * n_nodes
+		for i in range(n_nodes - 1, -1, -1):
+			entries = []
+			for e in range(starts[i], starts[i] + counts[i]):
+				box = tuple(boxes[4*e:4*e+4])
+				entries.append((box, refs[e] if flags[i] else nodes[refs[e]]))
+
+			nodes[i] = RTreeNode(bool(flags[i]), entries)
+
+		tree.root = nodes[0] if nodes else None
+		return tree
+
+	def __len__(self):
+		return self.size
+
+	def get_bounding_box(self):
+		"""Get the bounding box of all entries as a (left, top, right, bottom) tuple, or None if the tree is empty"""
+		return self.root.box if self.root is not None else None
+
+	bounding_box = property(get_bounding_box)
+
+
+def str_pack(entries, max_entries):
+	"""Group (box, value) entries into nodes with the Sort-Tile-Recursive algorithm.
+
+	The entries are sorted by the x coordinate of their box centers and cut into vertical slices. Every slice is sorted by
+	y and cut into groups of at most max_entries entries. Entries are spread evenly over the slices and groups, so that
+	no group ends up with only a few left-over entries.
+
+	@return: A list of lists of entries
+	"""
+
+	n_groups = int(math.ceil(len(entries) / float(max_entries)))
+	n_slices = int(math.ceil(math.sqrt(n_groups)))
+
+	entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+
+	groups = []
+	for vertical_slice in split_evenly(entries, n_slices):
+		vertical_slice.sort(key=lambda e: e[0][1] + e[0][3])
+		groups.extend(split_evenly(vertical_slice, int(math.ceil(len(vertical_slice) / float(max_entries)))))
+
+	return groups
+
+def split_evenly(l, n):
+	"""Split a list into n consecutive parts whose lengths differ by at most one"""
+	size, extra = divmod(len(l), n)
+	bounds = [ i * size + min(i, extra) for i in range(n + 1) ]
+	return [ l[bounds[i]:bounds[i+1]] for i in range(n) if bounds[i] < bounds[i+1] ]
+
+RTREE_MAGIC = b'P2RT'
+RTREE_VERSION = 1
+
+# magic, version, max_entries, size, number of nodes, number of node entries
+RTREE_HEADER = '<4sBIIII'
+
+def box_area(box):
+	return (box[2] - box[0]) * (box[3] - box[1])
+
+def box_enlargement(box, other):
+	"""Get the area by which box grows when extended to contain other"""
+	width = max(box[2], other[2]) - min(box[0], other[0])
+	height = max(box[3], other[3]) - min(box[1], other[1])
+	return width * height - (box[2] - box[0]) * (box[3] - box[1])
+
+def union_boxes(boxes):
+	"""Get the smallest (left, top, right, bottom) box containing all boxes"""
+	return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+def _sorted_if_possible(values):
+	try:
+		return sorted(values)
+	except TypeError:
+		return values
+
+def spatial_join(polygons, points, tree=None):
+	"""Find the polygon containing each of a list of points.
+
+	Candidate polygons for every point are found through an R-tree of the polygon bounding boxes, and only those are tested
+	with the exact containment test of the polygons. Points on a polygon boundary count as contained.
+
+	@type polygons: List
+	@param polygons: The polygons to test against
+
+	@type points: List
+	@param points: The points to locate
+
+	@type tree: RTree
+	@param tree: An R-tree built with L{RTree.from_polygons} for the polygons. It is built on the fly if not given.
+
+	@return: A list with, for each point, the index of the first polygon containing it, or None
+	"""
+
+	if tree is None: tree = RTree.from_polygons(polygons)
+
+	result = []
+	for p in points:
+		# points just outside of a bounding box can still be on the polygon boundary
+		for i in tree.query_box(p.x - EPSILON, p.y - EPSILON, p.x + EPSILON, p.y + EPSILON):
+			if polygons[i].contains_point(p):
+				result.append(i)
+				break
+		else:
+			result.append(None)
+
+	return result
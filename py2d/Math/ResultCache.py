@@ -0,0 +1,426 @@
+import os
+import pickle
+import hashlib
+import inspect
+import functools
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from py2d.Math.Vector import *
+
+class UncacheableError(TypeError):
+	"""Raised when no cache key can be computed for an argument that is otherwise valid, such as a closure"""
+	pass
+
+class ResultCache(object):
+	"""Memoization of expensive polygon operations, keyed on the content of their inputs.
+
+	Results are looked up by a BLAKE2b digest of the operation name, the input coordinates snapped to a grid with a spacing
+	of EPSILON and all other parameters, so the same geometry gives the same key no matter which objects hold it. Results are
+	stored pickled, so every hit returns fresh objects that the caller may modify, and the memory tier is bounded by the
+	number of entries and their total size. The least recently used entries are evicted first.
+
+	If a directory is given, results are also written there and survive restarts of the program. Entries that are evicted
+	from memory are still found on disk. The directory has its own bounds, max_disk_entries and max_disk_bytes, and the
+	least recently used files are removed by L{prune} when they are exceeded. Files that can not be loaded, e.g. results
+	pickled before a class was renamed, are treated as misses and removed.
+
+	The cache is opt-in: Polygon.offset, Polygon.offset_many, Polygon.boolean_operation and Polygon.convex_decompose only use
+	it while it is installed with L{set_result_cache} or a with statement, other functions can be cached with L{call}. Calls
+	with a debug_callback or with closures, lambdas or other callables that can not be identified by name, e.g. a
+	tip_decorator made by a factory function, are never cached.
+
+		>>> from py2d.Math.Polygon import Polygon
+		>>> square = Polygon.regular(Vector(0, 0), 2, 4)
+		>>> cache = ResultCache(max_entries=16)
+		>>> a = cache.call('offset', Polygon.offset, [square], 1.0)
+		>>> b = cache.call('offset', Polygon.offset, [square.clone()], 1.0)
+		>>> a == b, cache.stats['hits'], cache.stats['misses']
+		(True, 1, 1)
+	"""
+
+	def __init__(self, max_entries=256, max_bytes=None, directory=None, max_disk_entries=4096, max_disk_bytes=None):
+		"""Create a new, empty result cache.
+
+		@type max_entries: int
+		@param max_entries: The maximum number of results kept in memory
+
+		@type max_bytes: int
+		@param max_bytes: The maximum total size of the pickled results kept in memory, or None for no limit
+
+		@type directory: str
+		@param directory: A directory to keep results in across restarts, or None to only keep them in memory
+
+		@type max_disk_entries: int
+		@param max_disk_entries: The maximum number of results kept in the directory, or None for no limit
+
+		@type max_disk_bytes: int
+		@param max_disk_bytes: The maximum total size of the results kept in the directory, or None for no limit
+		"""
+
+		if max_entries < 1: raise ValueError("The cache must hold at least one entry: %s" % max_entries)
+
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.directory = directory
+		self.max_disk_entries = max_disk_entries
+		self.max_disk_bytes = max_disk_bytes
+
+		if directory is not None and not os.path.isdir(directory): os.makedirs(directory)
+
+		# key -> pickled result, least recently used first
+		self.entries = OrderedDict()
+		self.size = 0
+
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.disk_evictions = 0
+
+		# upper estimates of the number and size of the files in the directory, so that it is only listed when it may be too large
+		self.disk_entries, self.disk_size = 0, 0
+		if directory is not None: self.prune()
+
+		self._previous = []
+
+	@staticmethod
+	def key(operation, *args, **kwargs):
+		"""Get the content hash of an operation and its arguments.
+
+		Vectors, Polygons, PolygonWithHoles, PolygonSets, numbers, strings, None, module-level functions and (nested) lists,
+		tuples and dicts of them are supported. Coordinates are snapped to a grid with a spacing of EPSILON, so points that
+		are equal according to the Vector comparison will almost always give the same key.
+
+		Functions are identified by their name only, so closures, lambdas, partials, bound methods and other callable objects
+		raise an L{UncacheableError}: two of them with the same name may behave differently.
+
+		@type operation: str
+		@param operation: The name of the operation
+
+		@return: The hexadecimal digest
+		"""
+
+		h = hashlib.blake2b(digest_size=20)
+		_feed(h, operation)
+		_feed(h, args)
+		_feed(h, kwargs)
+		return h.hexdigest()
+
+	def _path(self, key):
+		return os.path.join(self.directory, key + '.pickle')
+
+	def _store(self, key, data):
+		if key in self.entries: self.size -= len(self.entries.pop(key))
+
+		self.entries[key] = data
+		self.size += len(data)
+
+		while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.size > self.max_bytes and len(self.entries) > 1):
+			_, evicted = self.entries.popitem(last=False)
+			self.size -= len(evicted)
+			self.evictions += 1
+
+	def get(self, key, default=None):
+		"""Get the result stored for a key.
+
+		@type key: str
+		@param key: The key, as returned by L{key}
+
+		@param default: The value to return if there is no result for the key
+
+		@return: A fresh copy of the result, or default
+		"""
+
+		data = self.entries.get(key)
+		if data is not None:
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return pickle.loads(data)
+
+		if self.directory is not None:
+			path = self._path(key)
+			try:
+				with open(path, 'rb') as f:
+					data = f.read()
+			except (IOError, OSError):
+				data = None
+
+			if data is not None:
+				try:
+					result = pickle.loads(data)
+				except Exception:
+					# written by another version of the code, or damaged. drop it, so that it is replaced by a fresh result
+					self._unlink(path)
+				else:
+					self._store(key, data)
+					self.disk_hits += 1
+
+					# the modification time orders the files for pruning
+					try:
+						os.utime(path)
+					except OSError:
+						pass
+
+					return result
+
+		self.misses += 1
+		return default
+
+	def put(self, key, result):
+		"""Store a result for a key.
+
+		@type key: str
+		@param key: The key, as returned by L{key}
+
+		@param result: The result. It has to be picklable.
+		"""
+
+		data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+		self._store(key, data)
+
+		if self.directory is not None:
+			# write to a temporary file first, so that other processes never see half of a result
+			fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+			try:
+				with os.fdopen(fd, 'wb') as f:
+					f.write(data)
+				os.replace(tmp, self._path(key))
+			except:
+				os.unlink(tmp)
+				raise
+
+			self.disk_entries += 1
+			self.disk_size += len(data)
+			if (self.max_disk_entries is not None and self.disk_entries > self.max_disk_entries) or (self.max_disk_bytes is not None and self.disk_size > self.max_disk_bytes):
+				self.prune()
+
+	def prune(self, max_entries=None, max_bytes=None):
+		"""Remove the least recently used results from the cache directory until it is within its bounds.
+
+		This is done automatically when results are stored, but can be used to shrink a directory shared with other processes.
+
+		@type max_entries: int
+		@param max_entries: The number of results to keep, or None to use max_disk_entries
+
+		@type max_bytes: int
+		@param max_bytes: The total size of the results to keep, or None to use max_disk_bytes
+
+		@return: The number of removed results
+		"""
+
+		if self.directory is None: return 0
+
+		if max_entries is None: max_entries = self.max_disk_entries
+		if max_bytes is None: max_bytes = self.max_disk_bytes
+
+		files = []
+		for name in os.listdir(self.directory):
+			if not name.endswith('.pickle'): continue
+			path = os.path.join(self.directory, name)
+			try:
+				st = os.stat(path)
+			except OSError:
+				continue
+			files.append((st.st_mtime, path, st.st_size))
+
+		# oldest first
+		files.sort()
+
+		count, size = len(files), sum(f[2] for f in files)
+		removed = 0
+		for _, path, file_size in files:
+			if (max_entries is None or count <= max_entries) and (max_bytes is None or size <= max_bytes): break
+
+			self._unlink(path)
+			count -= 1
+			size -= file_size
+			removed += 1
+
+		self.disk_entries, self.disk_size = count, size
+		self.disk_evictions += removed
+		return removed
+
+	@staticmethod
+	def _unlink(path):
+		try:
+			os.unlink(path)
+		except OSError:
+			pass
+
+	def call(self, operation, func, *args, **kwargs):
+		"""Get the result of func(*args, **kwargs) from the cache, computing and storing it on a miss.
+
+		@type operation: str
+		@param operation: The name of the operation, which is part of the key
+
+		If an argument is a callable that can not be identified by name, e.g. a closure, func is called directly and nothing
+		is stored.
+		"""
+
+		try:
+			key = ResultCache.key(operation, *args, **kwargs)
+		except UncacheableError:
+			return func(*args, **kwargs)
+
+		result = self.get(key, _MISSING)
+		if result is _MISSING:
+			result = func(*args, **kwargs)
+			self.put(key, result)
+
+		return result
+
+	def clear(self, disk=False):
+		"""Remove all results from memory.
+
+		@type disk: bool
+		@param disk: Also remove all results from the cache directory
+		"""
+
+		self.entries.clear()
+		self.size = 0
+
+		if disk and self.directory is not None:
+			for name in os.listdir(self.directory):
+				if name.endswith('.pickle'): self._unlink(os.path.join(self.directory, name))
+
+			self.disk_entries, self.disk_size = 0, 0
+
+	def get_stats(self):
+		"""Get statistics about the use of the cache.
+
+		@return: A dict with the number of hits in memory and on disk, misses, evictions from memory and from the directory, as well as the number and total size of the results in memory.
+		"""
+
+		return {
+			'hits': self.hits,
+			'disk_hits': self.disk_hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+			'disk_evictions': self.disk_evictions,
+			'entries': len(self.entries),
+			'bytes': self.size,
+		}
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __contains__(self, key):
+		return key in self.entries
+
+	def __enter__(self):
+		self._previous.append(set_result_cache(self))
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		set_result_cache(self._previous.pop())
+
+	stats = property(get_stats)
+
+
+_MISSING = object()
+
+_result_cache = None
+
+def set_result_cache(cache):
+	"""Install a L{ResultCache} for the cached polygon operations, or uninstall it with None.
+
+	@return: The previously installed cache
+	"""
+
+	global _result_cache
+	previous, _result_cache = _result_cache, cache
+	return previous
+
+def get_result_cache():
+	"""Get the installed L{ResultCache}, or None"""
+	return _result_cache
+
+def cached_operation(operation, uncached=('debug_callback',)):
+	"""Decorator to look up the results of a function in the installed L{ResultCache}.
+
+	The arguments are bound to the signature of the function and its defaults are filled in, so passing an argument by
+	position or by name gives the same key.
+
+	@type operation: str
+	@param operation: The name of the operation, which is part of the key
+
+	@type uncached: tuple
+	@param uncached: Names of arguments that make a call uncacheable unless they are None, e.g. callbacks with side effects
+	"""
+
+	def decorate(func):
+		signature = inspect.signature(func)
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			cache = _result_cache
+			if cache is None: return func(*args, **kwargs)
+
+			bound = signature.bind(*args, **kwargs)
+			bound.apply_defaults()
+			if any(bound.arguments.get(name) is not None for name in uncached): return func(*args, **kwargs)
+
+			return cache.call(operation, func, *bound.args, **bound.kwargs)
+
+		return wrapper
+
+	return decorate
+
+
+def _is_named_function(obj):
+	"""Check whether a callable is fully identified by its module and qualified name"""
+
+	if inspect.isfunction(obj):
+		# lambdas and functions defined inside other functions have a '<' in their name, closures capture state
+		return obj.__closure__ is None and '<' not in obj.__qualname__
+
+	if inspect.isbuiltin(obj): return inspect.ismodule(obj.__self__)
+
+	return inspect.isclass(obj) and '<' not in obj.__qualname__
+
+def _feed_coords(h, values):
+	try:
+		h.update(array('d', [ round(v * HASH_SCALE) for v in values ]).tobytes())
+	except (OverflowError, ValueError):
+		# infinite or NaN coordinates cannot be quantized
+		h.update(array('d', values).tobytes())
+
+def _feed(h, obj):
+	"""Add an object to the hash h, with a type tag and a length for every container, so that different structures do not collide"""
+
+	if obj is None or isinstance(obj, (bool, int, float, str)):
+		h.update(('%s:%r;' % (type(obj).__name__, obj)).encode('utf-8'))
+
+	elif isinstance(obj, Vector):
+		h.update(b'V')
+		_feed_coords(h, (obj.x, obj.y))
+
+	elif hasattr(obj, 'get_regions'):
+		h.update(('%s:%d;' % (type(obj).__name__, len(obj.get_regions()))).encode('utf-8'))
+		for region in obj.get_regions(): _feed(h, region)
+
+	elif hasattr(obj, 'get_holes'):
+		h.update(('%s;' % type(obj).__name__).encode('utf-8'))
+		_feed(h, [obj.get_outline()] + list(obj.get_holes()))
+
+	elif hasattr(obj, 'points'):
+		pts = obj.points
+		h.update(('P:%d;' % len(pts)).encode('utf-8'))
+		_feed_coords(h, [ c for p in pts for c in (p.x, p.y) ])
+
+	elif isinstance(obj, (list, tuple)):
+		h.update(('%s:%d;' % (type(obj).__name__, len(obj))).encode('utf-8'))
+		for o in obj: _feed(h, o)
+
+	elif isinstance(obj, dict):
+		h.update(('dict:%d;' % len(obj)).encode('utf-8'))
+		for k in sorted(obj): _feed(h, k); _feed(h, obj[k])
+
+	elif callable(obj):
+		if not _is_named_function(obj): raise UncacheableError("Can not compute a cache key for %r" % (obj,))
+		h.update(('F:%s.%s;' % (obj.__module__, obj.__qualname__)).encode('utf-8'))
+
+	else:
+		raise TypeError("Can not compute a cache key for %r" % (obj,))
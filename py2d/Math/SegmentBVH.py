@@ -0,0 +1,258 @@
+import heapq
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import *
+from py2d.Math.Operations import _nearest_ray_hit
+
+class SegmentBVH(object):
+	"""Bounding volume hierarchy over a static set of line segments.
+
+	The hierarchy is a binary tree of axis-aligned bounding boxes that is bulk-loaded in O(n log n) by splitting the segments
+	at the median of their centers along the longer axis. It answers ray, segment, box and nearest-segment queries by only
+	descending into boxes that can contain a result.
+
+	All data is kept in plain lists, so a SegmentBVH can be pickled and precomputed.
+
+		>>> bvh = SegmentBVH([ (Vector(0, 0), Vector(4, 0)), (Vector(0, 2), Vector(4, 2)), (Vector(6, 0), Vector(6, 2)) ])
+		>>> bvh.query_lineseg(Vector(1, -1), Vector(1, 1))
+		[0]
+		>>> bvh.nearest(Vector(5, 1))
+		(2, 1.0)
+	"""
+
+	LEAF_SIZE = 4
+
+	def __init__(self, segs):
+		"""Bulk-load a new BVH.
+
+		@type segs: List
+		@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+		"""
+
+		self.segs = list(segs)
+		self.boxes = lineseg_boxes(self.segs)
+
+		# flattened tree: node i has the bounding box node_boxes[i]. inner nodes have two children node_children[i],
+		# leaves have node_children[i] == None and contain the segments order[node_start[i]:node_end[i]]
+		self.node_boxes = []
+		self.node_children = []
+		self.node_start = []
+		self.node_end = []
+		self.order = []
+
+		if self.segs: self._build()
+
+	def _build(self):
+		boxes = self.boxes
+		centers = [ ((b[0] + b[2]) * 0.5, (b[1] + b[3]) * 0.5) for b in boxes ]
+
+		by_x = sorted(range(len(boxes)), key=lambda i: centers[i][0])
+		by_y = sorted(range(len(boxes)), key=lambda i: centers[i][1])
+		in_left = [False] * len(boxes)
+
+		root = self._new_node()
+		stack = [(root, by_x, by_y)]
+		while stack:
+			node, by_x, by_y = stack.pop()
+
+			# pad node boxes a little so that rays through box corners are not lost to rounding
+			self.node_boxes[node] = (min(boxes[i][0] for i in by_x) - EPSILON, min(boxes[i][1] for i in by_x) - EPSILON,
+			                         max(boxes[i][2] for i in by_x) + EPSILON, max(boxes[i][3] for i in by_x) + EPSILON)
+
+			if len(by_x) <= self.LEAF_SIZE:
+				self.node_start[node] = len(self.order)
+				self.order.extend(by_x)
+				self.node_end[node] = len(self.order)
+				continue
+
+			# split at the median along the axis in which the centers are spread further
+			split_x = centers[by_x[-1]][0] - centers[by_x[0]][0] >= centers[by_y[-1]][1] - centers[by_y[0]][1]
+			primary, secondary = (by_x, by_y) if split_x else (by_y, by_x)
+
+			mid = len(primary) // 2
+			left, right = primary[:mid], primary[mid:]
+
+			# partition the other sorted list in linear time, keeping its order
+			for i in left: in_left[i] = True
+			secondary_left = [ i for i in secondary if in_left[i] ]
+			secondary_right = [ i for i in secondary if not in_left[i] ]
+			for i in left: in_left[i] = False
+
+			l, r = self._new_node(), self._new_node()
+			self.node_children[node] = (l, r)
+
+			if split_x:
+				stack.append((l, left, secondary_left))
+				stack.append((r, right, secondary_right))
+			else:
+				stack.append((l, secondary_left, left))
+				stack.append((r, secondary_right, right))
+
+	def _new_node(self):
+		self.node_boxes.append(None)
+		self.node_children.append(None)
+		self.node_start.append(0)
+		self.node_end.append(0)
+		return len(self.node_boxes) - 1
+
+	def _leaf_segments(self, node):
+		return self.order[self.node_start[node]:self.node_end[node]]
+
+	def _query(self, box_test, seg_test):
+		"""Collect the indices of all segments in boxes passing box_test that pass seg_test"""
+		if not self.segs: return []
+
+		out = []
+		stack = [0]
+		while stack:
+			node = stack.pop()
+			if not box_test(self.node_boxes[node]): continue
+
+			children = self.node_children[node]
+			if children:
+				stack.extend(children)
+			else:
+				out.extend(i for i in self._leaf_segments(node) if seg_test(i))
+
+		out.sort()
+		return out
+
+	def query_box(self, left, top, right, bottom):
+		"""Find all segments that intersect an axis-aligned box.
+
+		@return: A sorted list of segment indices
+		"""
+
+		def box_test(b):
+			return b[0] <= right and b[2] >= left and b[1] <= bottom and b[3] >= top
+
+		def seg_test(i):
+			a, b = self.segs[i]
+			return clip_lineseg_box(a, b, (left, top, right, bottom)) is not None
+
+		return self._query(box_test, seg_test)
+
+	def query_lineseg(self, p1, p2):
+		"""Find all segments that intersect the line segment p1, p2.
+
+		@return: A sorted list of segment indices
+		"""
+
+		left, right = min(p1.x, p2.x), max(p1.x, p2.x)
+		top, bottom = min(p1.y, p2.y), max(p1.y, p2.y)
+
+		def box_test(b):
+			return b[0] <= right and b[2] >= left and b[1] <= bottom and b[3] >= top
+
+		def seg_test(i):
+			a, b = self.segs[i]
+			return check_intersect_lineseg_lineseg(p1, p2, a, b)
+
+		return self._query(box_test, seg_test)
+
+	def query_ray(self, p1, p2):
+		"""Find all segments hit by the ray starting at p1 and passing through p2.
+
+		@return: A sorted list of segment indices
+		"""
+
+		def box_test(b):
+			return clip_ray_box(p1, p2, b) is not None
+
+		def seg_test(i):
+			a, b = self.segs[i]
+			return intersect_lineseg_ray(a, b, p1, p2) is not None
+
+		return self._query(box_test, seg_test)
+
+	def cast_ray(self, p1, p2, accept=None):
+		"""Find the nearest segment hit by a ray.
+
+		@type p1: Vector
+		@param p1: The starting point of the ray
+
+		@type p2: Vector
+		@param p2: The second point on the ray
+
+		@type accept: function
+		@param accept: Optional function f(point, i) that decides whether a hit on segment i at point should be considered
+
+		@return: A tuple (point, i) of the nearest intersection point and the index of the segment that was hit, or None
+		"""
+
+		if not self.segs: return None
+
+		dx, dy = p2.x - p1.x, p2.y - p1.y
+		if dx == 0 and dy == 0: return None
+
+		best, best_t = None, float('inf')
+
+		# visit nodes in order of the ray parameter at which the ray enters them
+		t = clip_ray_box(p1, p2, self.node_boxes[0])
+		heap = [(t[0], 0)] if t is not None else []
+		while heap:
+			t, node = heapq.heappop(heap)
+			if t > best_t: break
+
+			children = self.node_children[node]
+			if children:
+				for c in children:
+					t = clip_ray_box(p1, p2, self.node_boxes[c])
+					if t is not None and t[0] <= best_t: heapq.heappush(heap, (t[0], c))
+				continue
+
+			best, best_t = _nearest_ray_hit(self.segs, self._leaf_segments(node), p1, p2, accept, best, best_t)
+
+		return best
+
+	def cast_rays(self, rays, accept=None):
+		"""Find the nearest segment hit for many rays, see L{cast_ray}"""
+		return [ self.cast_ray(p1, p2, accept) for p1, p2 in rays ]
+
+	def nearest(self, p, max_distance=float('inf')):
+		"""Find the segment closest to a point.
+
+		@type p: Vector
+		@param p: The query point
+
+		@type max_distance: float
+		@param max_distance: Only consider segments closer than this distance
+
+		@return: A tuple (i, distance_squared) of the index of the closest segment and its squared distance to p, or None
+		"""
+
+		if not self.segs: return None
+
+		best, best_d = None, max_distance * max_distance
+
+		heap = [(distance_point_box_squared(p, self.node_boxes[0]), 0)]
+		while heap:
+			d, node = heapq.heappop(heap)
+			if d > best_d: break
+
+			children = self.node_children[node]
+			if children:
+				for c in children:
+					d = distance_point_box_squared(p, self.node_boxes[c])
+					if d <= best_d: heapq.heappush(heap, (d, c))
+				continue
+
+			for i in self._leaf_segments(node):
+				a, b = self.segs[i]
+				d = distance_point_lineseg_squared(p, a, b) if a.x != b.x or a.y != b.y else (p - a).length_squared
+				if d < best_d or (d == best_d and best is not None and i < best):
+					best, best_d = i, d
+
+		return (best, best_d) if best is not None else None
+
+	def __len__(self):
+		return len(self.segs)
+
+	def get_bounding_box(self):
+		"""Get the bounding box of all segments as a (left, top, right, bottom) tuple, or None if there are no segments"""
+		if not self.node_boxes: return None
+
+		left, top, right, bottom = self.node_boxes[0]
+		return (left + EPSILON, top + EPSILON, right - EPSILON, bottom - EPSILON)
+
+	bounding_box = property(get_bounding_box)
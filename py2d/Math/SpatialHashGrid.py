@@ -0,0 +1,183 @@
+import math
+
+from py2d.Math.Vector import *
+from py2d.Math.Operations import clip_ray_box, lineseg_boxes
+from py2d.Math.SpatialIndex import SpatialIndex, object_box
+
+class SpatialHashGrid(SpatialIndex):
+	"""Uniform hash grid for dynamic objects.
+
+	The plane is divided into square cells of a fixed size, and every object is registered in all cells covered by its bounding
+	box. Only the cells that contain objects are stored, so the grid is unbounded. Objects are referred to by integer handles
+	that are handed out by L{insert}.
+
+	Moving an object only touches the cells it leaves and enters, and queries only look at the cells they cover, so both take
+	time proportional to the number of nearby objects rather than the total number of objects.
+
+	The grid can be passed as the index argument of L{intersect_linesegs_lineseg} and L{intersect_linesegs_ray} if it was
+	created from the same segment list with L{from_linesegs}.
+
+		>>> grid = SpatialHashGrid(10)
+		>>> wall = grid.insert((Vector(0, 0), Vector(20, 0)))
+		>>> agent = grid.insert(Vector(5, 5))
+		>>> grid.query_radius(Vector(5, 3), 3)
+		[0, 1]
+		>>> grid.update(agent, Vector(35, 5))
+		>>> grid.query_radius(Vector(5, 3), 3)
+		[0]
+	"""
+
+	def __init__(self, cell_size):
+		"""Create a new, empty spatial hash grid.
+
+		@type cell_size: float
+		@param cell_size: The edge length of the grid cells. A good choice is about the size of a typical object or query.
+		"""
+
+		if cell_size <= 0: raise ValueError("Cell size must be positive: %s" % cell_size)
+
+		SpatialIndex.__init__(self)
+
+		self.cell_size = float(cell_size)
+		self.cells = {}
+		self.cell_ranges = {}
+
+		# range of cells that ever held an object, (x_min, y_min, x_max, y_max). rays do not need to go beyond it.
+		self.cell_bounds = None
+
+	@staticmethod
+	def from_linesegs(segs, cell_size=None):
+		"""Create a grid from a list of line segments, so that the handle of every segment is its index in the list.
+
+		@type segs: List
+		@param segs: The list of line segments, i.e. a list of 2-tuples of vectors
+
+		@type cell_size: float
+		@param cell_size: The edge length of the grid cells. By default, the average segment extent is used.
+		"""
+
+		segs = list(segs)
+		if not cell_size:
+			boxes = lineseg_boxes(segs)
+			cell_size = max(sum(max(b[2] - b[0], b[3] - b[1]) for b in boxes) / max(len(boxes), 1), EPSILON) if boxes else 1.0
+
+		grid = SpatialHashGrid(cell_size)
+		for seg in segs: grid.insert(seg)
+		return grid
+
+	def _cell(self, x, y):
+		return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+	def _cell_range(self, box):
+		# pad the box so that objects touching a cell boundary are registered on both sides of it
+		cx0, cy0 = self._cell(box[0] - EPSILON, box[1] - EPSILON)
+		cx1, cy1 = self._cell(box[2] + EPSILON, box[3] + EPSILON)
+		return (cx0, cy0, cx1, cy1)
+
+	def _add(self, handle, box):
+		cell_range = self._cell_range(box)
+		cx0, cy0, cx1, cy1 = cell_range
+		for cx in range(cx0, cx1 + 1):
+			for cy in range(cy0, cy1 + 1):
+				self.cells.setdefault((cx, cy), set()).add(handle)
+
+		self.cell_ranges[handle] = cell_range
+
+		if self.cell_bounds is None:
+			self.cell_bounds = cell_range
+		else:
+			b = self.cell_bounds
+			self.cell_bounds = (min(b[0], cx0), min(b[1], cy0), max(b[2], cx1), max(b[3], cy1))
+
+	def _discard(self, handle):
+		cx0, cy0, cx1, cy1 = self.cell_ranges.pop(handle)
+		for cx in range(cx0, cx1 + 1):
+			for cy in range(cy0, cy1 + 1):
+				cell = self.cells[(cx, cy)]
+				cell.discard(handle)
+				if not cell: del self.cells[(cx, cy)]
+
+	def _moved(self, handle, box):
+		return self._cell_range(box) != self.cell_ranges[handle]
+
+	def _candidates_in_box(self, box):
+		cx0, cy0, cx1, cy1 = self._cell_range(box)
+
+		# for queries larger than the occupied part of the grid, it is cheaper to go through the stored cells
+		if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+			return set(h for (cx, cy), cell in self.cells.items() if cx0 <= cx <= cx1 and cy0 <= cy <= cy1 for h in cell)
+
+		candidates = set()
+		for cx in range(cx0, cx1 + 1):
+			for cy in range(cy0, cy1 + 1):
+				cell = self.cells.get((cx, cy))
+				if cell: candidates.update(cell)
+
+		return candidates
+
+	def _search(self, box, box_test):
+		boxes = self.boxes
+		return sorted(h for h in self._candidates_in_box(box) if box_test(boxes[h]))
+
+	def _cells_along(self, p1, p2, t_min, t_max):
+		"""Generator function to list the cells that the line through p1 and p2 passes between the parameters t_min and t_max"""
+
+		dx, dy = p2.x - p1.x, p2.y - p1.y
+		cs = self.cell_size
+
+		cx, cy = self._cell(p1.x + t_min * dx, p1.y + t_min * dy)
+
+		step_x = 1 if dx > 0 else -1
+		step_y = 1 if dy > 0 else -1
+		t_next_x = (((cx + (dx > 0)) * cs) - p1.x) / dx if dx != 0 else float('inf')
+		t_next_y = (((cy + (dy > 0)) * cs) - p1.y) / dy if dy != 0 else float('inf')
+		t_delta_x = cs / abs(dx) if dx != 0 else float('inf')
+		t_delta_y = cs / abs(dy) if dy != 0 else float('inf')
+
+		while True:
+			yield (cx, cy)
+
+			if min(t_next_x, t_next_y) > t_max: break
+
+			if t_next_x < t_next_y:
+				cx += step_x
+				t_next_x += t_delta_x
+			else:
+				cy += step_y
+				t_next_y += t_delta_y
+
+	def _query_line(self, p1, p2, t_max):
+		if not self.cells: return []
+
+		if p1.x == p2.x and p1.y == p2.y: return self.query_point(p1)
+
+		# only walk the part of the line inside the occupied cells
+		cs = self.cell_size
+		b = self.cell_bounds
+		t = clip_ray_box(p1, p2, (b[0] * cs, b[1] * cs, (b[2] + 1) * cs, (b[3] + 1) * cs))
+		if t is None or t[0] > t_max: return []
+
+		candidates = set()
+		for c in self._cells_along(p1, p2, t[0], min(t[1], t_max)):
+			cell = self.cells.get(c)
+			if cell: candidates.update(cell)
+
+		return sorted(candidates)
+
+	def query_lineseg(self, p1, p2):
+		"""Find the objects registered in the cells that the line segment p1, p2 passes.
+
+		The result contains all objects whose bounding box is crossed by the segment, but can also contain objects nearby.
+
+		@return: A sorted list of handles
+		"""
+		return self._query_line(p1, p2, 1.0)
+
+	def query_ray(self, p1, p2):
+		"""Find the objects registered in the cells that the ray starting at p1 and passing through p2 passes.
+
+		The result contains all objects whose bounding box is crossed by the ray, but can also contain objects nearby.
+
+		@return: A sorted list of handles
+		"""
+		return self._query_line(p1, p2, float('inf'))
@@ -0,0 +1,131 @@
+from py2d.Math.Vector import *
+from py2d.Math.Operations import distance_point_box_squared
+
+class SpatialIndex(object):
+	"""Base class for dynamic spatial indices that refer to their objects by integer handles.
+
+	This keeps the objects and their bounding boxes and hands out the handles. Subclasses decide where an object is stored by
+	implementing the hooks
+		- _add(handle, box) to store a handle with its box
+		- _discard(handle) to remove a stored handle
+		- _moved(handle, box) to tell whether a handle has to be stored elsewhere if its box changes to box
+		- _search(box, box_test) to find the sorted handles of all objects whose boxes pass box_test. box bounds the region
+		  that passes box_test, so that an index can limit its search to it, or is None if no such bound is given.
+
+	L{SpatialHashGrid} and L{LooseQuadTree} are spatial indices.
+	"""
+
+	def __init__(self):
+		self.objects = {}
+		self.boxes = {}
+
+		self._next_handle = 0
+
+	def insert(self, obj, box=None):
+		"""Insert an object.
+
+		@param obj: The object. Vectors, line segments given as 2-tuples of Vectors and Polygons are supported directly, other objects need a box.
+
+		@type box: tuple
+		@param box: The (left, top, right, bottom) bounding box of the object. If None, it is computed from the object.
+
+		@return: The integer handle of the object
+		"""
+
+		handle = self._next_handle
+		self._next_handle += 1
+
+		box = tuple(box) if box is not None else object_box(obj)
+		self.objects[handle] = obj
+		self.boxes[handle] = box
+		self._add(handle, box)
+
+		return handle
+
+	def update(self, handle, obj=None, box=None):
+		"""Move or change an object.
+
+		@type handle: int
+		@param handle: The handle of the object
+
+		@param obj: The new object, or None to keep the current one
+
+		@type box: tuple
+		@param box: The new bounding box of the object. If None, it is computed from the object.
+		"""
+
+		if obj is None: obj = self.objects[handle]
+		box = tuple(box) if box is not None else object_box(obj)
+
+		self.objects[handle] = obj
+		self.boxes[handle] = box
+
+		# small moves often keep an object where it is stored
+		if self._moved(handle, box):
+			self._discard(handle)
+			self._add(handle, box)
+
+	def remove(self, handle):
+		"""Remove an object
+
+		@type handle: int
+		@param handle: The handle of the object
+		"""
+		self._discard(handle)
+		del self.objects[handle]
+		del self.boxes[handle]
+
+	def get(self, handle):
+		"""Get the object for a handle"""
+		return self.objects[handle]
+
+	def query_box(self, left, top, right, bottom):
+		"""Find all objects whose bounding boxes overlap a box. Boxes that only touch count as overlapping.
+
+		@return: A sorted list of handles
+		"""
+		def box_test(b):
+			return b[0] <= right and b[2] >= left and b[1] <= bottom and b[3] >= top
+
+		return self._search((left, top, right, bottom), box_test)
+
+	def query_point(self, p):
+		"""Find all objects whose bounding boxes contain the point p
+
+		@return: A sorted list of handles
+		"""
+		return self.query_box(p.x, p.y, p.x, p.y)
+
+	def query_radius(self, p, radius):
+		"""Find all objects whose bounding boxes are at most radius away from the point p
+
+		@return: A sorted list of handles
+		"""
+		radius_squared = radius * radius
+
+		def box_test(b):
+			return distance_point_box_squared(p, b) <= radius_squared
+
+		return self._search((p.x - radius, p.y - radius, p.x + radius, p.y + radius), box_test)
+
+	def __len__(self):
+		return len(self.objects)
+
+	def __contains__(self, handle):
+		return handle in self.objects
+
+
+def object_box(obj):
+	"""Get the (left, top, right, bottom) bounding box of a Vector, a line segment given as a 2-tuple of Vectors or a Polygon"""
+
+	if isinstance(obj, Vector):
+		return (obj.x, obj.y, obj.x, obj.y)
+
+	if hasattr(obj, 'get_bounding_box'):
+		return tuple(obj.get_bounding_box())
+
+	if isinstance(obj, (tuple, list)) and len(obj) == 2 and all(isinstance(p, Vector) for p in obj):
+		a, b = obj
+		return (min(a.x, b.x), min(a.y, b.y), max(a.x, b.x), max(a.y, b.y))
+
+	raise TypeError("Can not determine the bounding box of %r" % (obj,))
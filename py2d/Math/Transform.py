@@ -1,33 +1,73 @@
 import math
 
 from py2d.Math.Vector import *
+from py2d.Math.Polygon import Polygon, ArrayPolygon
+
+try:
+	import numpy
+	from py2d.Math.VectorArray import VectorArray
+except ImportError:
+	numpy = None
+	VectorArray = None
 
 class Transform(object):
-	"""Class for representing affine transformations"""
+	"""Class for representing affine transformations
+
+	A transformation is stored as the six coefficients (a, b, c, d, e, f) of the affine matrix
+
+		| a b c |
+		| d e f |
+		| 0 0 1 |
+
+	that maps a vector (x, y) to (a*x + b*y + c, d*x + e*y + f).
+	"""
 
 	def __init__(self, data):
+		"""Create a new transformation
+
+		@type data: List
+		@param data: Either the six coefficients (a, b, c, d, e, f) or the matrix as a list of two or three rows
+		"""
 		self.data = data
 
+	def get_data(self):
+		"""Get the transformation as a 3x3 matrix, given as a tuple of rows.
+
+		The matrix is read-only, so that writing into it fails instead of being lost. Assign a new matrix to change the
+		transformation.
+		"""
+		a, b, c, d, e, f = self.m
+		return ((a, b, c),
+		        (d, e, f),
+		        (0, 0, 1))
+
+	def set_data(self, data):
+		if len(data) in (2, 3):
+			data = tuple(data[0][:3]) + tuple(data[1][:3])
+
+		if len(data) != 6:
+			raise ValueError("Transform needs 6 coefficients or a list of 2 or 3 rows: %s" % (data,))
+
+		self.m = tuple(data)
+		self._inverse = None
+
 	@staticmethod
 	def unit():
 		"""Get a new unit tranformation"""
-		return Transform([[1, 0, 0],
-		                  [0, 1, 0],
-		                  [0, 0, 1]])
+		return Transform((1, 0, 0,
+		                  0, 1, 0))
 
 	@staticmethod
 	def move(dx, dy):
 		"""Get a transformation that moves by dx, dy"""
-		return Transform([[1, 0, dx],
-		                  [0, 1, dy],
-		                  [0, 0, 1]])
+		return Transform((1, 0, dx,
+		                  0, 1, dy))
 
 	@staticmethod
 	def rotate(phi):
 		"""Get a transformation that rotates by phi"""
-		return Transform([[math.cos(phi), -math.sin(phi), 0],
-		                  [math.sin(phi), math.cos(phi), 0],
-		                  [0, 0, 1]])
+		return Transform((math.cos(phi), -math.sin(phi), 0,
+		                  math.sin(phi), math.cos(phi), 0))
 
 	@staticmethod
 	def rotate_around(cx, cy, phi):
@@ -37,56 +77,263 @@ class Transform(object):
 	@staticmethod
 	def scale(sx, sy):
 		"""Get a transformation that scales by sx, sy"""
-		return Transform([[sx, 0, 0],
-		                  [0, sy, 0],
-		                  [0, 0, 1]])
+		return Transform((sx, 0, 0,
+		                  0, sy, 0))
 	@staticmethod
 	def mirror_x():
 		"""Get a transformation that mirrors along the x axis"""
-		return Transform([[-1, 0, 0],
-		                  [ 0, 1, 0],
-		                  [ 0, 0, 1]])
+		return Transform((-1, 0, 0,
+		                   0, 1, 0))
 
 	@staticmethod
 	def mirror_y():
 		"""Get a transformation that mirrors along the y axis"""
-		return Transform([[ 1, 0, 0],
-		                  [ 0,-1, 0],
-		                  [ 0, 0, 1]])
+		return Transform(( 1, 0, 0,
+		                   0,-1, 0))
+
+	def inverse(self):
+		"""Get the inverse transformation. The result is cached until the transformation is changed."""
+
+		if self._inverse is None:
+			a, b, c, d, e, f = self.m
+			det = a * e - b * d
+			if det == 0: raise ValueError("Transform is not invertible: %s" % self)
+
+			inv = Transform(( e / float(det), -b / float(det), (b * f - e * c) / float(det),
+			                 -d / float(det),  a / float(det), (d * c - a * f) / float(det)))
+			inv._inverse = self
+			self._inverse = inv
+
+		return self._inverse
+
+	def apply_many(self, points, in_place=False):
+		"""Apply the transformation to many points at once.
+
+		@type points: Polygon, VectorArray or List
+		@param points: The points to transform. ArrayPolygons and VectorArrays are transformed in a single vectorized operation if NumPy is available.
+
+		@type in_place: bool
+		@param in_place: If True, change points instead of returning a transformed copy. For Polygons and lists, the points are replaced by new Vectors.
+
+		@return: The transformed points, of the same type as the points argument
+		"""
+
+		a, b, c, d, e, f = self.m
+
+		if VectorArray is not None and isinstance(points, VectorArray):
+			out = points if in_place else VectorArray(numpy.empty_like(points.data))
+			self._apply_array(points.data, out.data)
+			return out
+
+		elif isinstance(points, ArrayPolygon):
+			out = points if in_place else points.clone()
+			coords = out.get_coords()
+
+			if numpy is not None and coords:
+				view = numpy.frombuffer(coords, dtype=float).reshape(-1, 2)
+				self._apply_array(view, view)
+				del view
+			else:
+				for i in range(0, len(coords), 2):
+					x, y = coords[i], coords[i+1]
+					coords[i] = a * x + b * y + c
+					coords[i+1] = d * x + e * y + f
+
+			out.invalidate()
+			return out
+
+		elif isinstance(points, Polygon):
+			transformed = [ Vector(a * p.x + b * p.y + c, d * p.x + e * p.y + f) for p in points.points ]
+			if not in_place: return Polygon.from_pointlist(transformed)
+
+			points.points[:] = transformed
+			return points
+
+		else:
+			transformed = [ Vector(a * p.x + b * p.y + c, d * p.x + e * p.y + f) for p in points ]
+			if not in_place: return transformed
+
+			points[:] = transformed
+			return points
+
+	def _apply_array(self, src, dst):
+		a, b, c, d, e, f = self.m
+		x, y = src[:, 0].copy(), src[:, 1]
+		dst[:, 0] = a * x + b * y + c
+		dst[:, 1] = d * x + e * y + f
 
 	def __add__(self, b):
-		t = Transform()
-		t.data = [[self.data[x][y] + b.data[x][y] for y in range(3)] for x in range(3)]
-		return t
+		return Transform([ u + v for u, v in zip(self.m, b.m) ])
 
 	def __sub__(self, b):
-		t = Transform()
-		t.data = [[self.data[x][y] - b.data[x][y] for y in range(3)] for x in range(3)]
-		return t
+		return Transform([ u - v for u, v in zip(self.m, b.m) ])
 
 	def __mul__(self, val):
 
 		if isinstance(val, Vector):
-
-			x = val.x * self.data[0][0] + val.y * self.data[0][1] + self.data[0][2]
-			y = val.x * self.data[1][0] + val.y * self.data[1][1] + self.data[1][2]
-
-			return Vector(x,y)
+			a, b, c, d, e, f = self.m
+			return Vector(a * val.x + b * val.y + c, d * val.x + e * val.y + f)
 
 		elif isinstance(val, Transform):
-			data = [[0 for y in range(3)] for x in range(3)]
-			for i in range(3):
-				for j in range(3):
-					for k in range(3):
-						data[i][j] += self.data[i][k] * val.data[k][j]
+			a1, b1, c1, d1, e1, f1 = self.m
+			a2, b2, c2, d2, e2, f2 = val.m
 
-			return Transform(data)
+			return Transform((a1 * a2 + b1 * d2, a1 * b2 + b1 * e2, a1 * c2 + b1 * f2 + c1,
+			                  d1 * a2 + e1 * d2, d1 * b2 + e1 * e2, d1 * c2 + e1 * f2 + f1))
 
-		elif isinstance(val, Polygon):
-			p_transform = [ self * v for v in val.points ]
-			return Polygon.from_pointlist(p_transform)
+		elif isinstance(val, Polygon) or (VectorArray is not None and isinstance(val, VectorArray)):
+			return self.apply_many(val)
 
 		else:
 			raise ValueError("Unknown multiplier: %s" % val)
 
+	def __repr__(self):
+		return "Transform(%.3f, %.3f, %.3f, %.3f, %.3f, %.3f)" % self.m
+
+	data = property(get_data, set_data)
+
+
+class TransformNode(object):
+	"""Node in a tree of transformations.
+
+	Every node has a local Transform relative to its parent and a list of Polygons in local coordinates.
+	The world transformation of a node (the product of all local transformations from the root down to the node) and the
+	world-space versions of its polygons are cached, and only recomputed after the node or one of its ancestors has changed.
+
+		>>> root = TransformNode(Transform.move(10, 0))
+		>>> child = TransformNode(Transform.scale(2, 2), [Polygon.from_tuples([(0, 0), (1, 0), (0, 1)])], parent=root)
+		>>> child.world_polygons
+		[Polygon [(10.00, 0.00), (12.00, 0.00), (10.00, 2.00)]]
+	"""
+
+	def __init__(self, transform=None, polygons=None, parent=None):
+		"""Create a new transform node.
+
+		@type transform: Transform
+		@param transform: The local transformation of the node. Defaults to the unit transformation.
+
+		@type polygons: List
+		@param polygons: Polygons in the local coordinate system of the node
+
+		@type parent: TransformNode
+		@param parent: The parent node, or None for a root node
+		"""
+
+		self._transform = transform if transform is not None else Transform.unit()
+		self._polygons = list(polygons) if polygons else []
+		self._parent = None
+		self._children = []
+
+		self._world_transform = None
+		self._world_polygons = None
+
+		if parent is not None: parent.add_child(self)
+
+	def invalidate(self):
+		"""Mark the cached world data of this node and all of its descendants as outdated.
+
+		This happens automatically when using the setters, but is needed when changing a Transform or Polygon object in place.
+		"""
+
+		stack = [self]
+		while stack:
+			node = stack.pop()
+
+			# a dirty node always has dirty descendants, so we can stop here
+			if node._world_transform is None and node is not self: continue
+
+			node._world_transform = None
+			node._world_polygons = None
+			stack.extend(node._children)
+
+	def add_child(self, node):
+		"""Attach node as a child of this node, detaching it from its previous parent"""
+		if node._parent is not None: node._parent.remove_child(node)
+
+		node._parent = self
+		self._children.append(node)
+		node.invalidate()
+
+	def remove_child(self, node):
+		"""Detach the child node, making it a root node"""
+		self._children.remove(node)
+		node._parent = None
+		node.invalidate()
+
+	def walk(self):
+		"""Generator function to list this node and all of its descendants in depth-first order"""
+		stack = [self]
+		while stack:
+			node = stack.pop()
+			yield node
+			stack.extend(reversed(node._children))
+
+	def get_transform(self):
+		return self._transform
+
+	def set_transform(self, transform):
+		self._transform = transform
+		self.invalidate()
+
+	def get_polygons(self):
+		return self._polygons
+
+	def set_polygons(self, polygons):
+		self._polygons = list(polygons)
+		self._world_polygons = None
+
+	def add_polygon(self, polygon):
+		"""Add a polygon in the local coordinate system of the node"""
+		self._polygons.append(polygon)
+		self._world_polygons = None
+
+	def get_parent(self):
+		return self._parent
+
+	def set_parent(self, parent):
+		if parent is None:
+			if self._parent is not None: self._parent.remove_child(self)
+		else:
+			parent.add_child(self)
+
+	def get_children(self):
+		return list(self._children)
+
+	def get_world_transform(self):
+		"""Get the transformation from the local coordinate system of the node to world coordinates"""
+
+		if self._world_transform is None:
+
+			# find the topmost ancestor that needs to be recomputed
+			chain = [self]
+			while chain[-1]._parent is not None and chain[-1]._parent._world_transform is None:
+				chain.append(chain[-1]._parent)
+
+			for node in reversed(chain):
+				if node._parent is None:
+					node._world_transform = node._transform
+				else:
+					node._world_transform = node._parent._world_transform * node._transform
+
+		return self._world_transform
+
+	def get_world_polygons(self):
+		"""Get the polygons of this node in world coordinates. They are only transformed when first requested after a change."""
+
+		if self._world_polygons is None:
+			world = self.get_world_transform()
+			self._world_polygons = [ world.apply_many(p) for p in self._polygons ]
+
+		return self._world_polygons
+
+	def get_all_world_polygons(self):
+		"""Get the polygons of this node and all of its descendants in world coordinates"""
+		return [ p for node in self.walk() for p in node.get_world_polygons() ]
+
+	transform = property(get_transform, set_transform)
+	polygons = property(get_polygons, set_polygons)
+	parent = property(get_parent, set_parent)
+	children = property(get_children)
 
+	world_transform = property(get_world_transform)
+	world_polygons = property(get_world_polygons)
@@ -0,0 +1,450 @@
+from array import array
+
+# rings with more points than this are indexed along a Z-order curve for the ear tests
+TRIANGULATE_HASH_THRESHOLD = 80
+
+class _Node(object):
+	"""A vertex in the circular doubly linked list of a ring that is being triangulated"""
+
+	__slots__ = ('i', 'x', 'y', 'prev', 'next', 'z', 'prev_z', 'next_z', 'steiner')
+
+	def __init__(self, i, x, y):
+		self.i, self.x, self.y = i, x, y
+		self.prev = self.next = None
+
+		# position on the Z-order curve and neighbours in Z-order, used to find points inside of ears quickly
+		self.z = 0
+		self.prev_z = self.next_z = None
+
+		# holes that consist of a single point
+		self.steiner = False
+
+
+def triangulate_coords(coords, hole_starts=()):
+	"""Triangulate a polygon with holes by ear clipping.
+
+	Reference:
+	Martin Held. FIST: Fast Industrial-Strength Triangulation of Polygons. Algorithmica 30(4), 563-596, 2001
+	and the earcut library by Mapbox, https://github.com/mapbox/earcut
+
+	Holes are cut into the outline along bridges to the closest visible outline vertex, so that a single ring remains. Ears
+	are then clipped off that ring. For rings with more than TRIANGULATE_HASH_THRESHOLD points, the vertices are sorted
+	along a Z-order curve, so that an ear only has to be checked against the vertices near its bounding box. Rings that
+	can not be fully clipped, because they touch or intersect themselves, are filtered, cured of local self-intersections
+	and finally split along a valid diagonal.
+
+		>>> triangles = triangulate_coords([0, 0, 4, 0, 4, 4, 0, 4, 1, 1, 1, 3, 3, 3, 3, 1], [4])
+		>>> len(triangles) // 3
+		8
+		>>> list(triangles[:6])
+		[0, 4, 5, 7, 4, 0]
+
+	@type coords: List
+	@param coords: The flat list of coordinates x0, y0, x1, y1, ... of the outline points followed by the points of all holes
+
+	@type hole_starts: List
+	@param hole_starts: The index of the first point of every hole
+
+	@return: An array of unsigned ints with three point indices for every triangle. All triangles are clockwise.
+	"""
+
+	n = len(coords) // 2
+	hole_starts = list(hole_starts)
+	outer_end = hole_starts[0] if hole_starts else n
+
+	triangles = array('I')
+
+	outer = _linked_ring(coords, 0, outer_end, True)
+	if outer is None or outer.next is outer.prev: return triangles
+
+	if hole_starts: outer = _eliminate_holes(coords, hole_starts, n, outer)
+
+	min_x = min_y = inv_size = 0
+	if n > TRIANGULATE_HASH_THRESHOLD:
+		xs, ys = coords[0:2 * outer_end:2], coords[1:2 * outer_end:2]
+		min_x, min_y = min(xs), min(ys)
+		size = max(max(xs) - min_x, max(ys) - min_y)
+		inv_size = 32767.0 / size if size else 0
+
+	_earcut_linked(outer, triangles, min_x, min_y, inv_size, 0)
+
+	return triangles
+
+
+def _signed_area(coords, start, end):
+	total = 0
+	j = end - 1
+	for i in range(start, end):
+		total += (coords[2 * j] - coords[2 * i]) * (coords[2 * i + 1] + coords[2 * j + 1])
+		j = i
+	return total
+
+def _linked_ring(coords, start, end, clockwise):
+	"""Build a circular linked list from the points start to end with the given orientation"""
+
+	indices = range(start, end) if clockwise == (_signed_area(coords, start, end) > 0) else range(end - 1, start - 1, -1)
+
+	last = None
+	for i in indices:
+		last = _insert_node(i, coords[2 * i], coords[2 * i + 1], last)
+
+	if last is not None and _equals(last, last.next):
+		_remove_node(last)
+		last = last.next
+
+	return last
+
+def _insert_node(i, x, y, last):
+	p = _Node(i, x, y)
+	if last is None:
+		p.prev = p.next = p
+	else:
+		p.next = last.next
+		p.prev = last
+		last.next.prev = p
+		last.next = p
+	return p
+
+def _remove_node(p):
+	p.next.prev = p.prev
+	p.prev.next = p.next
+
+	if p.prev_z is not None: p.prev_z.next_z = p.next_z
+	if p.next_z is not None: p.next_z.prev_z = p.prev_z
+
+def _filter_points(start, end=None):
+	"""Remove duplicate and collinear points from a ring"""
+
+	if start is None: return start
+	if end is None: end = start
+
+	p = start
+	while True:
+		again = False
+		if not p.steiner and (_equals(p, p.next) or _area(p.prev, p, p.next) == 0):
+			_remove_node(p)
+			p = end = p.prev
+			if p is p.next: break
+			again = True
+		else:
+			p = p.next
+
+		if not again and p is end: break
+
+	return end
+
+def _earcut_linked(ear, triangles, min_x, min_y, inv_size, stage):
+	if ear is None: return
+
+	if not stage and inv_size: _index_curve(ear, min_x, min_y, inv_size)
+
+	stop = ear
+	while ear.prev is not ear.next:
+		prev, next = ear.prev, ear.next
+
+		if _is_ear_hashed(ear, min_x, min_y, inv_size) if inv_size else _is_ear(ear):
+			triangles.extend((prev.i, ear.i, next.i))
+			_remove_node(ear)
+
+			# skipping the next vertex leads to less sliver triangles
+			ear = stop = next.next
+			continue
+
+		ear = next
+
+		# went all the way around without finding an ear
+		if ear is stop:
+			if stage == 0:
+				_earcut_linked(_filter_points(ear), triangles, min_x, min_y, inv_size, 1)
+			elif stage == 1:
+				ear = _cure_local_intersections(_filter_points(ear), triangles)
+				_earcut_linked(ear, triangles, min_x, min_y, inv_size, 2)
+			else:
+				_split_earcut(ear, triangles, min_x, min_y, inv_size)
+			break
+
+def _is_ear(ear):
+	a, b, c = ear.prev, ear, ear.next
+	if _area(a, b, c) >= 0: return False
+
+	ax, ay, bx, by, cx, cy = a.x, a.y, b.x, b.y, c.x, c.y
+	x0, y0, x1, y1 = min(ax, bx, cx), min(ay, by, cy), max(ax, bx, cx), max(ay, by, cy)
+
+	p = c.next
+	while p is not a:
+		if x0 <= p.x <= x1 and y0 <= p.y <= y1 and _point_in_triangle(ax, ay, bx, by, cx, cy, p.x, p.y) and _area(p.prev, p, p.next) >= 0:
+			return False
+		p = p.next
+
+	return True
+
+def _is_ear_hashed(ear, min_x, min_y, inv_size):
+	a, b, c = ear.prev, ear, ear.next
+	if _area(a, b, c) >= 0: return False
+
+	ax, ay, bx, by, cx, cy = a.x, a.y, b.x, b.y, c.x, c.y
+	x0, y0, x1, y1 = min(ax, bx, cx), min(ay, by, cy), max(ax, bx, cx), max(ay, by, cy)
+
+	# only the points between the Z-order positions of the corners of the bounding box can be inside of the ear
+	min_z = _z_order(x0, y0, min_x, min_y, inv_size)
+	max_z = _z_order(x1, y1, min_x, min_y, inv_size)
+
+	# the box test is inlined, since most points fail it
+	p = ear.prev_z
+	while p is not None and p.z >= min_z:
+		if x0 <= p.x <= x1 and y0 <= p.y <= y1 and p is not a and p is not c and \
+				_point_in_triangle(ax, ay, bx, by, cx, cy, p.x, p.y) and _area(p.prev, p, p.next) >= 0:
+			return False
+		p = p.prev_z
+
+	p = ear.next_z
+	while p is not None and p.z <= max_z:
+		if x0 <= p.x <= x1 and y0 <= p.y <= y1 and p is not a and p is not c and \
+				_point_in_triangle(ax, ay, bx, by, cx, cy, p.x, p.y) and _area(p.prev, p, p.next) >= 0:
+			return False
+		p = p.next_z
+
+	return True
+
+def _cure_local_intersections(start, triangles):
+	"""Clip off the small triangles formed by two edges crossing each other, which are left over by the first passes"""
+
+	p = start
+	while True:
+		a, b = p.prev, p.next.next
+
+		if not _equals(a, b) and _intersects(a, p, p.next, b) and _locally_inside(a, b) and _locally_inside(b, a):
+			triangles.extend((a.i, p.i, b.i))
+
+			_remove_node(p)
+			_remove_node(p.next)
+
+			p = start = b
+
+		p = p.next
+		if p is start: break
+
+	return _filter_points(p)
+
+def _split_earcut(start, triangles, min_x, min_y, inv_size):
+	"""Split the ring in two along a valid diagonal and triangulate both halves"""
+
+	a = start
+	while True:
+		b = a.next.next
+		while b is not a.prev:
+			if a.i != b.i and _is_valid_diagonal(a, b):
+				c = _split_polygon(a, b)
+
+				a = _filter_points(a, a.next)
+				c = _filter_points(c, c.next)
+
+				_earcut_linked(a, triangles, min_x, min_y, inv_size, 0)
+				_earcut_linked(c, triangles, min_x, min_y, inv_size, 0)
+				return
+			b = b.next
+
+		a = a.next
+		if a is start: break
+
+def _eliminate_holes(coords, hole_starts, n, outer):
+	"""Cut all holes into the outline, from left to right"""
+
+	queue = []
+	for k, start in enumerate(hole_starts):
+		end = hole_starts[k + 1] if k + 1 < len(hole_starts) else n
+		ring = _linked_ring(coords, start, end, False)
+		if ring is None: continue
+
+		if ring is ring.next: ring.steiner = True
+		queue.append(_leftmost(ring))
+
+	queue.sort(key=lambda p: (p.x, p.y))
+
+	for hole in queue:
+		outer = _eliminate_hole(hole, outer)
+
+	return outer
+
+def _eliminate_hole(hole, outer):
+	bridge = _find_hole_bridge(hole, outer)
+	if bridge is None: return outer
+
+	bridge_reverse = _split_polygon(bridge, hole)
+
+	_filter_points(bridge_reverse, bridge_reverse.next)
+	return _filter_points(bridge, bridge.next)
+
+def _find_hole_bridge(hole, outer):
+	"""Find an outline vertex that can be connected to the leftmost point of a hole without crossing any edge"""
+
+	p = outer
+	hx, hy = hole.x, hole.y
+	qx = float('-inf')
+	m = None
+
+	# find the segment of the outline that is closest to the hole point on its left side
+	while True:
+		if p.y >= hy >= p.next.y and p.next.y != p.y:
+			x = p.x + (hy - p.y) * (p.next.x - p.x) / (p.next.y - p.y)
+			if qx < x <= hx:
+				qx = x
+				m = p if p.x < p.next.x else p.next
+				if x == hx: return m
+
+		p = p.next
+		if p is outer: break
+
+	if m is None: return None
+
+	# points of the outline inside of the triangle between the hole point, the segment intersection and its endpoint would
+	# block the bridge. if there are any, connect to the one with the smallest angle to the ray instead.
+	stop = m
+	mx, my = m.x, m.y
+	tan_min = float('inf')
+
+	p = m
+	while True:
+		if hx >= p.x >= mx and hx != p.x and _point_in_triangle(hx if hy < my else qx, hy, mx, my, qx if hy < my else hx, hy, p.x, p.y):
+			tan = abs(hy - p.y) / (hx - p.x)
+
+			if _locally_inside(p, hole) and (tan < tan_min or (tan == tan_min and (p.x > m.x or (p.x == m.x and _sector_contains_sector(m, p))))):
+				m = p
+				tan_min = tan
+
+		p = p.next
+		if p is stop: break
+
+	return m
+
+def _sector_contains_sector(m, p):
+	return _area(m.prev, m, p.prev) < 0 and _area(p.next, m, m.next) < 0
+
+def _leftmost(start):
+	p = leftmost = start
+	while True:
+		if p.x < leftmost.x or (p.x == leftmost.x and p.y < leftmost.y): leftmost = p
+		p = p.next
+		if p is start: break
+	return leftmost
+
+def _spread(v):
+	v = (v | (v << 8)) & 0x00FF00FF
+	v = (v | (v << 4)) & 0x0F0F0F0F
+	v = (v | (v << 2)) & 0x33333333
+	v = (v | (v << 1)) & 0x55555555
+	return v
+
+def _z_order(x, y, min_x, min_y, inv_size):
+	return _spread(int((x - min_x) * inv_size)) | (_spread(int((y - min_y) * inv_size)) << 1)
+
+def _index_curve(start, min_x, min_y, inv_size):
+	"""Link the points of a ring in Z-order"""
+
+	nodes = []
+	p = start
+	while True:
+		if p.z == 0: p.z = _z_order(p.x, p.y, min_x, min_y, inv_size)
+		nodes.append(p)
+		p = p.next
+		if p is start: break
+
+	nodes.sort(key=lambda p: p.z)
+
+	for a, b in zip(nodes, nodes[1:]):
+		a.next_z = b
+		b.prev_z = a
+
+	nodes[0].prev_z = None
+	nodes[-1].next_z = None
+
+def _area(p, q, r):
+	return (q.y - p.y) * (r.x - q.x) - (q.x - p.x) * (r.y - q.y)
+
+def _equals(p1, p2):
+	return p1.x == p2.x and p1.y == p2.y
+
+def _point_in_triangle(ax, ay, bx, by, cx, cy, px, py):
+	return (cx - px) * (ay - py) >= (ax - px) * (cy - py) and \
+		(ax - px) * (by - py) >= (bx - px) * (ay - py) and \
+		(bx - px) * (cy - py) >= (cx - px) * (by - py)
+
+def _sign(v):
+	return (v > 0) - (v < 0)
+
+def _on_segment(p, q, r):
+	return min(p.x, r.x) <= q.x <= max(p.x, r.x) and min(p.y, r.y) <= q.y <= max(p.y, r.y)
+
+def _intersects(p1, q1, p2, q2):
+	o1 = _sign(_area(p1, q1, p2))
+	o2 = _sign(_area(p1, q1, q2))
+	o3 = _sign(_area(p2, q2, p1))
+	o4 = _sign(_area(p2, q2, q1))
+
+	if o1 != o2 and o3 != o4: return True
+
+	# collinear cases
+	if o1 == 0 and _on_segment(p1, p2, q1): return True
+	if o2 == 0 and _on_segment(p1, q2, q1): return True
+	if o3 == 0 and _on_segment(p2, p1, q2): return True
+	if o4 == 0 and _on_segment(p2, q1, q2): return True
+
+	return False
+
+def _intersects_polygon(a, b):
+	p = a
+	while True:
+		if p.i != a.i and p.next.i != a.i and p.i != b.i and p.next.i != b.i and _intersects(p, p.next, a, b): return True
+		p = p.next
+		if p is a: break
+	return False
+
+def _locally_inside(a, b):
+	if _area(a.prev, a, a.next) < 0:
+		return _area(a, b, a.next) >= 0 and _area(a, a.prev, b) >= 0
+	return _area(a, b, a.prev) < 0 or _area(a, a.next, b) < 0
+
+def _middle_inside(a, b):
+	p = a
+	inside = False
+	px, py = (a.x + b.x) / 2.0, (a.y + b.y) / 2.0
+
+	while True:
+		if (p.y > py) != (p.next.y > py) and p.next.y != p.y and px < (p.next.x - p.x) * (py - p.y) / (p.next.y - p.y) + p.x:
+			inside = not inside
+		p = p.next
+		if p is a: break
+
+	return inside
+
+def _is_valid_diagonal(a, b):
+	if a.next.i == b.i or a.prev.i == b.i or _intersects_polygon(a, b): return False
+
+	if _locally_inside(a, b) and _locally_inside(b, a) and _middle_inside(a, b) and (_area(a.prev, a, b.prev) or _area(a, b.prev, b)):
+		return True
+
+	# a zero-length diagonal between two copies of a point, as created by hole bridges
+	return _equals(a, b) and _area(a.prev, a, a.next) > 0 and _area(b.prev, b, b.next) > 0
+
+def _split_polygon(a, b):
+	"""Connect a and b with a diagonal. If a and b are in the same ring, it is split in two, otherwise the rings are joined.
+
+	@return: The copy of b in the second part
+	"""
+
+	a2, b2 = _Node(a.i, a.x, a.y), _Node(b.i, b.x, b.y)
+	an, bp = a.next, b.prev
+
+	a.next = b
+	b.prev = a
+
+	a2.next = an
+	an.prev = a2
+
+	b2.next = a2
+	a2.prev = b2
+
+	bp.next = b2
+	b2.prev = bp
+
+	return b2
@@ -10,8 +10,11 @@ class Vector(object):
 		- v[0], v[1]
 		- x,y = v.as_tuple()
 
+	Vectors are slotted and therefore cheap to create in large numbers. Use L{FrozenVector} for points that are hashed often.
 	"""
 
+	__slots__ = ('x', 'y')
+
 	def __init__(self, x, y):
 		"""Create a new vector object.
 
@@ -62,6 +65,10 @@ class Vector(object):
 		"""Convert the vector to a non-object tuple"""
 		return (self.x, self.y)
 
+	def freeze(self):
+		"""Return an immutable copy of this vector with a precomputed hash"""
+		return FrozenVector(self.x, self.y)
+
 	def __add__(self, b):
 		return Vector(self.x + b.x, self.y + b.y)
 
@@ -86,14 +93,19 @@ class Vector(object):
 
 	def __eq__(self, other):
 		if not isinstance(other, Vector): return False
-		d = self - other
-		return abs(d.x) < EPSILON and abs(d.y) < EPSILON
+		return abs(self.x - other.x) < EPSILON and abs(self.y - other.y) < EPSILON
 
 	def __ne__(self, other):
 		return not self.__eq__(other)
 
 	def __hash__(self):
-		return hash("%.4f %.4f" % (self.x, self.y))
+		try:
+			return hash((round(self.x * HASH_SCALE), round(self.y * HASH_SCALE)))
+		except (OverflowError, ValueError):
+			return quantized_hash(self.x, self.y)
+
+	def __reduce__(self):
+		return (self.__class__, (self.x, self.y))
 
 	def __getitem__(self, key):
 		if key == 0: return self.x
@@ -110,7 +122,63 @@ class Vector(object):
 
 	slope = property(get_slope, None, None)
 
+
+class FrozenVector(Vector):
+	"""Immutable 2D Vector with a hash that is computed only once.
+
+	FrozenVectors compare equal to and hash like Vectors with the same coordinates, so both can be mixed as keys of sets and dicts.
+	Arithmetic on FrozenVectors returns regular, mutable Vectors.
+	"""
+
+	__slots__ = ('_hash',)
+
+	def __init__(self, x, y):
+		"""Create a new frozen vector object.
+
+		@type x: float
+		@param x: The X component of the vector
+
+		@type y: float
+		@param y: The Y component of the vector
+		"""
+
+		object.__setattr__(self, 'x', x)
+		object.__setattr__(self, 'y', y)
+		object.__setattr__(self, '_hash', quantized_hash(x, y))
+
+	def freeze(self):
+		"""FrozenVectors are already immutable, so return the vector itself"""
+		return self
+
+	def __setattr__(self, name, value):
+		raise AttributeError("FrozenVector is immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("FrozenVector is immutable")
+
+	def __setitem__(self, key, value):
+		raise TypeError("FrozenVector does not support item assignment")
+
+	def __hash__(self):
+		return self._hash
+
+	def __repr__(self):
+		return "FrozenVector(%.3f, %.3f)" % (self.x, self.y)
+
+
+def quantized_hash(x, y):
+	"""Hash a coordinate pair by snapping it to an integer grid with a spacing of EPSILON.
+
+	Vectors that are equal according to the EPSILON comparison will almost always land on the same grid point.
+	"""
+	try:
+		return hash((round(x * HASH_SCALE), round(y * HASH_SCALE)))
+	except (OverflowError, ValueError):
+		# infinite or NaN coordinates cannot be quantized
+		return hash((x, y))
+
 VECTOR_NULL = Vector(0,0)
 VECTOR_X = Vector(1,0)
 VECTOR_Y = Vector(0,1)
 EPSILON = 0.0001
+HASH_SCALE = 1 / EPSILON
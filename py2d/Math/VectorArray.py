@@ -0,0 +1,170 @@
+import numpy
+
+from py2d.Math.Vector import *
+
+class VectorArray(object):
+	"""Class for batches of 2D Vectors backed by an (N,2) NumPy array.
+
+	All arithmetic is applied to every vector in the batch at once. Operands can be a VectorArray of the same length, a single Vector that is broadcast to all elements, or a scalar.
+
+		>>> a = VectorArray.from_tuples([(3, 4), (1, 0)])
+		>>> a.length
+		array([5., 1.])
+		>>> (a + Vector(1, 1)).as_tuple_list()
+		[(4.0, 5.0), (2.0, 1.0)]
+
+	"""
+
+	def __init__(self, data):
+		"""Create a new vector array.
+
+		@type data: array-like
+		@param data: The vector components, convertible to an (N,2) float array
+		"""
+
+		self.data = numpy.asarray(data, dtype=float).reshape(-1, 2)
+
+	@staticmethod
+	def from_vectors(vectors):
+		"""Create a vector array from a list of Vectors
+
+		@type vectors: List
+		@param vectors: List of Vectors
+		"""
+		return VectorArray([(v.x, v.y) for v in vectors])
+
+	@staticmethod
+	def from_tuples(tuples):
+		"""Create a vector array from 2-tuples
+
+		@type tuples: List
+		@param tuples: List of tuples of x,y coordinates
+		"""
+		return VectorArray(tuples)
+
+	@staticmethod
+	def from_polygon(polygon):
+		"""Create a vector array from the points of a polygon
+
+		@type polygon: Polygon
+		@param polygon: The polygon to take the points from
+		"""
+		return VectorArray.from_vectors(polygon.points)
+
+	def to_vectors(self):
+		"""Convert the array to a list of Vectors"""
+		return [Vector(x, y) for x, y in self.data.tolist()]
+
+	def to_polygon(self):
+		"""Convert the array to a Polygon"""
+		from py2d.Math.Polygon import Polygon
+		return Polygon.from_pointlist(self.to_vectors())
+
+	def as_tuple_list(self):
+		"""Convert the array to a list of non-object tuples"""
+		return [(x, y) for x, y in self.data.tolist()]
+
+	def clone(self):
+		"""Return a copy of this vector array"""
+		return VectorArray(self.data.copy())
+
+	def get_x(self):
+		return self.data[:, 0]
+
+	def get_y(self):
+		return self.data[:, 1]
+
+	def get_length(self):
+		"""Get the lengths of all vectors."""
+		return numpy.sqrt(self.get_length_squared())
+
+	def get_length_squared(self):
+		"""Get the squared lengths of all vectors, not calculating the square roots for a performance gain"""
+		return numpy.einsum('ij,ij->i', self.data, self.data)
+
+	def normalize(self):
+		"""Return normalized versions of all vectors that will always have a length of 1."""
+		return VectorArray(self.data / self.get_length()[:, numpy.newaxis])
+
+	def normal(self):
+		"""Return normal vectors of all vectors"""
+		return VectorArray(numpy.column_stack((-self.data[:, 1], self.data[:, 0])))
+
+	def scale(self, val):
+		"""Scale all vectors by a scalar or by an array of N scalars"""
+		val = numpy.asarray(val, dtype=float)
+		if val.ndim == 1: val = val[:, numpy.newaxis]
+		return VectorArray(self.data * val)
+
+	def dot(self, other):
+		"""Get the dot products with a Vector or with the vectors of another VectorArray"""
+		o = VectorArray._operand(other)
+		return self.data[:, 0] * o[..., 0] + self.data[:, 1] * o[..., 1]
+
+	def cross(self, other):
+		"""Get the z components of the cross products with a Vector or with the vectors of another VectorArray"""
+		o = VectorArray._operand(other)
+		return self.data[:, 0] * o[..., 1] - self.data[:, 1] * o[..., 0]
+
+	@staticmethod
+	def _operand(other):
+		if isinstance(other, VectorArray): return other.data
+		if isinstance(other, Vector): return numpy.array((other.x, other.y), dtype=float)
+		return numpy.asarray(other, dtype=float)
+
+	def __len__(self):
+		return len(self.data)
+
+	def __iter__(self):
+		return iter(self.to_vectors())
+
+	def __getitem__(self, key):
+		if isinstance(key, slice) or not numpy.isscalar(key):
+			return VectorArray(self.data[key])
+
+		x, y = self.data[key].tolist()
+		return Vector(x, y)
+
+	def __setitem__(self, key, value):
+		self.data[key] = VectorArray._operand(value)
+
+	def __add__(self, b):
+		return VectorArray(self.data + VectorArray._operand(b))
+
+	def __sub__(self, b):
+		return VectorArray(self.data - VectorArray._operand(b))
+
+	def __neg__(self):
+		return VectorArray(-self.data)
+
+	def __mul__(self, val):
+
+		if isinstance(val, (Vector, VectorArray)):
+			return self.dot(val)
+		else:
+			return self.scale(val)
+
+	def __truediv__(self, val):
+		return self.scale(1.0 / numpy.asarray(val, dtype=float))
+
+	def __div__(self, val):
+		return self.__truediv__(val)
+
+	def __eq__(self, other):
+		if not isinstance(other, VectorArray) or len(self) != len(other): return False
+		return bool(numpy.all(numpy.abs(self.data - other.data) < EPSILON))
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	__hash__ = None
+
+	def __repr__(self):
+		pts = ["(%.3f, %.3f)" % (x, y) for x, y in self.data.tolist()]
+		return "VectorArray [%s]" % ", ".join(pts)
+
+	x = property(get_x)
+	y = property(get_y)
+
+	length = property(get_length, None, None)
+	length_squared = property(get_length_squared, None, None)
@@ -3,3 +3,16 @@ from py2d.Math.Vector import *
 from py2d.Math.Polygon import *
 from py2d.Math.Transform import *
 from py2d.Math.Operations import *
+from py2d.Math.SegmentBVH import *
+from py2d.Math.SpatialIndex import *
+from py2d.Math.SpatialHashGrid import *
+from py2d.Math.LooseQuadTree import *
+from py2d.Math.RTree import *
+from py2d.Math.ResultCache import *
+from py2d.Math.Triangulation import *
+
+try:
+	from py2d.Math.VectorArray import *
+except ImportError:
+	# NumPy is optional. Without it, the array-backed types are not available.
+	pass
@@ -24,7 +24,7 @@ class NavMesh(object):
 		The method will delete wall areas from the boundary polygon and then decompose the resulting polygon into convex polygons, generating a navigation graph in the process.
 
 		@type boundary: Polygon
-		@param boundary: The boundary of the navigable area.
+		@param boundary: The boundary of the navigable area. This can also be a PolygonWithHoles or a PolygonSet, whose holes are treated like walls.
 
 		@type walls: List
 		@param walls: List of Wall Polygons to subtract from the boundary polygon. These may intersect the polygon boundary or be properly inside the polygon.
@@ -36,7 +36,7 @@ class NavMesh(object):
 		convex_decomp = py2d.Math.Polygon.convex_decompose(boundary, walls)
 
 		# make NavPolygons out of the convex decomposition polygons
-		polygons = [NavPolygon(poly) for poly in convex_decomp]
+		polygons = [NavPolygon(poly, convex=True) for poly in convex_decomp]
 
 		# create dict of shared edges
 		polygon_edges = defaultdict(list)
@@ -64,6 +64,9 @@ class NavMesh(object):
 		This is called automatically upon mesh initialization, but you might want to call it if you have changed the navigation mesh.
 		"""
 
+		# index polygon bounding boxes for point location
+		self._index = py2d.Math.RTree.from_polygons(self._polygons)
+
 		# initialize with simple distances
 		self._nav_data = [
 			[
@@ -86,11 +89,18 @@ class NavMesh(object):
 
 	def find_polygon(self, p):
 		"""Find the NavPolygon that contains p"""
-		for poly in self._polygons:
-			if poly.contains_point(p):
-				return poly
+		return self.find_polygons([p])[0]
+
+	def find_polygons(self, points):
+		"""Find the NavPolygons that contain many points at once.
+
+		@type points: List
+		@param points: The points to locate
 
-		return None
+		@return: A list with the NavPolygon containing each point, or None for points outside of the mesh
+		"""
+		indices = py2d.Math.spatial_join(self._polygons, points, self._index)
+		return [ self._polygons[i] if i is not None else None for i in indices ]
 
 
 	def get_path(self, start, stop):
@@ -150,12 +160,43 @@ class NavMesh(object):
 
 class NavPolygon(py2d.Math.Polygon):
 	"""Polygon class with added navigation data"""
-	def __init__(self, polygon):
+	def __init__(self, polygon, convex=None):
+		"""Create a new navigation polygon.
+
+		@type polygon: Polygon
+		@param polygon: The polygon to take the points from
+
+		@type convex: bool
+		@param convex: Whether the polygon is convex, enabling faster containment tests. If None, this is determined from the points.
+		"""
 		py2d.Math.Polygon.__init__(self)
 
 		self.points = polygon.points
 		self.neighbors = {}
 
+		if convex is None:
+			# star polygons turn the same way at every vertex, but are not convex
+			convex = py2d.Math.Polygon.is_convex_s(self.points) and not self.is_self_intersecting()
+
+		self.convex = convex
+
+	# NavPolygons are graph nodes and used as dict keys, so they are compared by identity
+	def __eq__(self, other):
+		return self is other
+
+	def __ne__(self, other):
+		return self is not other
+
+	__hash__ = object.__hash__
+
+	def contains_point(self, p):
+		"""Checks if p is contained in the polygon, or on the boundary.
+
+		@return: 0 if outside, 1 if in the polygon, 2 if on the boundary.
+		"""
+		if self.convex: return py2d.Math.Polygon.contains_point_convex_s(self.points, p)
+		return py2d.Math.Polygon.contains_point_s(self.points, p)
+
 
 class NavPath(object):
 	"""Class representing a solved navigation path"""
@@ -17,6 +17,7 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 
 	The hash keys will be the ids set to the corresponding <path> elements in the SVG file.
 	The hash value is a list of polygons, the first one being the outline polygon and all additional polygons being holes.
+	PolygonWithHoles.from_list turns such a list into a PolygonWithHoles.
 
 	@param f: File object or file name to a SVG file.
 
@@ -40,10 +41,8 @@ def convert_svg(f, transform=Transform.unit(), bezier_max_divisions=None, bezier
 		if m:
 			a,b,c,d,e,f = ( float(m.group(l)) for l in "abcdef" )
 
-			import pdb; pdb.set_trace()
-			nt = Transform([[ a, c, e ],
-			                [ b, d, f ],
-					[ 0, 0, 1 ]]) * nt
+			nt = Transform(( a, c, e,
+			                 b, d, f )) * nt
 
 		return nt
 
@@ -1,6 +1,17 @@
+import math
+import functools
+import os
+import pickle
+import random
+import tempfile
 import unittest
 from py2d.Math import *
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
 class TestVector(unittest.TestCase):
 
 	def setUp(self):
@@ -103,12 +114,98 @@ class TestVector(unittest.TestCase):
 
 	def test_hash(self):
 		self.assertEqual( hash(self.u), hash(Vector(3.0, 2.0) + self.y * 2) )
+		self.assertEqual( hash(Vector(0, 0)), hash(Vector(-0.00001, 0.00001)) )
+
+	def test_slots(self):
+		self.assertFalse( hasattr(self.u, "__dict__") )
+
+		try:
+			self.u.z = 1
+		except AttributeError:
+			pass
+		else:
+			self.fail("Expected AttributeError")
+
+	def test_pickle(self):
+		import pickle
+		self.assertEqual( self.u, pickle.loads(pickle.dumps(self.u)) )
+
+		f = pickle.loads(pickle.dumps(self.u.freeze()))
+		self.assertTrue( isinstance(f, FrozenVector) )
+		self.assertEqual( self.u, f )
+
+	def test_frozen(self):
+		f = self.v.freeze()
+
+		self.assertEqual( self.v, f )
+		self.assertEqual( hash(self.v), hash(f) )
+		self.assertTrue( f in set([self.v]) )
+		self.assertTrue( self.v in set([f]) )
+		self.assertEqual( Vector(2.5, 3.75), f + self.w )
+
+		try:
+			f.x = 1
+		except AttributeError:
+			pass
+		else:
+			self.fail("Expected AttributeError")
+
+		try:
+			f[0] = 1
+		except TypeError:
+			pass
+		else:
+			self.fail("Expected TypeError")
 
 	def test_slope(self):
 
 		self.assertEqual(float('inf'), self.y.slope)
 		self.assertEqual(1.5, self.v.slope)
 
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestVectorArray(unittest.TestCase):
+
+	def setUp(self):
+		self.vectors = [ Vector(3.0, 4.0), Vector(2.0, 3.0), Vector(0.5, 0.75) ]
+		self.a = VectorArray.from_vectors(self.vectors)
+
+	def test_conversion(self):
+		self.assertEqual( self.vectors, self.a.to_vectors() )
+		self.assertEqual( [(3.0, 4.0), (2.0, 3.0), (0.5, 0.75)], self.a.as_tuple_list() )
+		self.assertEqual( self.a, VectorArray.from_tuples(self.a.as_tuple_list()) )
+
+		poly = Polygon.from_pointlist(self.vectors)
+		self.assertEqual( self.a, VectorArray.from_polygon(poly) )
+		self.assertEqual( poly, self.a.to_polygon() )
+
+	def test_arithmetic(self):
+		w = Vector(1, -1)
+		self.assertEqual( [v + w for v in self.vectors], (self.a + w).to_vectors() )
+		self.assertEqual( [v - w for v in self.vectors], (self.a - w).to_vectors() )
+		self.assertEqual( [v * 2 for v in self.vectors], (self.a * 2).to_vectors() )
+		self.assertEqual( [v / 2 for v in self.vectors], (self.a / 2).to_vectors() )
+		self.assertEqual( [Vector(0, 0)] * 3, (self.a - self.a).to_vectors() )
+
+	def test_products(self):
+		w = Vector(1, -1)
+		self.assertEqual( [v * w for v in self.vectors], self.a.dot(w).tolist() )
+		self.assertEqual( [v * v for v in self.vectors], (self.a * self.a).tolist() )
+		self.assertEqual( [v.x * w.y - v.y * w.x for v in self.vectors], self.a.cross(w).tolist() )
+
+	def test_length(self):
+		self.assertEqual( 5, self.a.length[0] )
+		self.assertEqual( 25, self.a.length_squared[0] )
+		self.assertEqual( [v.normalize() for v in self.vectors], self.a.normalize().to_vectors() )
+		self.assertEqual( [v.normal() for v in self.vectors], self.a.normal().to_vectors() )
+
+	def test_item_access(self):
+		self.assertEqual( Vector(2.0, 3.0), self.a[1] )
+		self.assertEqual( 2, len(self.a[1:]) )
+
+		self.a[0] = Vector(1, 1)
+		self.assertEqual( Vector(1, 1), self.a[0] )
+
+
 class TestPolygon(unittest.TestCase):
 
 	def setUp(self):
@@ -186,6 +283,32 @@ class TestPolygon(unittest.TestCase):
 		self.assertEqual(0, self.irregular.contains_point(Vector(0,1)))
 		self.assertEqual(0, self.irregular.contains_point(Vector(0,0)))
 
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_contains_points(self):
+		points = [ Vector(2,2), Vector(1,2), Vector(2,4), Vector(1,1), Vector(2,1.5), Vector(0,4), Vector(0,1), Vector(0,0) ]
+		expected = [ self.irregular.contains_point(p) for p in points ]
+
+		self.assertEqual( expected, self.irregular.contains_points(points).tolist() )
+		self.assertEqual( expected, self.irregular.contains_points([ (p.x, p.y) for p in points ]).tolist() )
+		self.assertEqual( expected, self.irregular.contains_points(numpy.array([ (p.x, p.y) for p in points ])).tolist() )
+		self.assertEqual( expected, Polygon.contains_points_s(self.irregular.points, points, chunk_size=1).tolist() )
+		self.assertEqual( [], self.irregular.contains_points([]).tolist() )
+
+	def test_contains_point_convex(self):
+		points = [ Vector(2,2), Vector(1,2), Vector(2,4), Vector(1,1), Vector(2,1.5), Vector(0,4), Vector(0,1), Vector(0,0) ]
+
+		for p in points:
+			self.assertEqual(self.irregular.contains_point(p), self.irregular.contains_point_convex(p))
+			self.assertEqual(self.irregular.contains_point(p), self.irregular.clone().flip().contains_point_convex(p))
+
+		# flat vertices next to the fan center
+		flat = Polygon.from_tuples([ (0, 0), (0, 1), (0, 2), (0, 3), (3, 3), (3, 0) ])
+		self.assertEqual(2, flat.contains_point_convex(Vector(0, 1.5)))
+		self.assertEqual(2, flat.contains_point_convex(Vector(0.00001, 2.5)))
+		self.assertEqual(1, flat.contains_point_convex(Vector(0.1, 2.5)))
+		self.assertEqual(0, flat.contains_point_convex(Vector(-0.1, 2.5)))
+		self.assertEqual(0, flat.contains_point_convex(Vector(0, 4)))
+
 
 
 	def test_union(self):
@@ -212,6 +335,65 @@ class TestPolygon(unittest.TestCase):
 		expected = [ Polygon.from_tuples( [(13.00, 30.00), (9.00, 30.00), (10.00, 33.00), (8.00, 31.00), (8.00, 29.00), (10.00, 27.00)] )]
 		self.assertEqual(expected, subtract)
 
+	def test_boolean_apart(self):
+		far = Polygon.regular( Vector(100, 30), 3, 4 )
+		far_ccw = far.clone_ccw()
+		self.assertEqual( [self.square, far], Polygon.union(self.square, far) )
+		self.assertEqual( [self.square, far_ccw.clone_cw()], Polygon.union(self.square, far_ccw) )
+		self.assertEqual( [], Polygon.intersect(self.square, far) )
+		self.assertEqual( [self.square], Polygon.subtract(self.square, far) )
+
+	def test_boolean_collinear(self):
+		left, right, wide = Polygon.from_tuples([(0, 0), (2, 0), (2, 2), (0, 2)]), Polygon.from_tuples([(2, 0), (4, 0), (4, 2), (2, 2)]), Polygon.from_tuples([(1, 0), (3, 0), (3, 2), (1, 2)])
+
+		self.assertEqual( [Polygon.from_tuples([(0, 0), (4, 0), (4, 2), (0, 2)])], Polygon.union(left, right) )
+		self.assertEqual( [], Polygon.intersect(left, right) )
+		self.assertEqual( [Polygon.from_tuples([(0, 0), (3, 0), (3, 2), (0, 2)])], Polygon.union(left, wide) )
+		self.assertEqual( [Polygon.from_tuples([(1, 0), (2, 0), (2, 2), (1, 2)])], Polygon.intersect(left, wide) )
+		self.assertEqual( [Polygon.from_tuples([(0, 0), (1, 0), (1, 2), (0, 2)])], Polygon.subtract(left, wide) )
+
+	def test_boolean_operations(self):
+		jobs = [ (Polygon.regular(Vector(10 + i % 7, 30), 3, 4 + i % 5), self.square2, 'uid'[i % 3]) for i in range(BOOLEAN_OPERATIONS_MIN_PARALLEL) ]
+		serial = [ Polygon.boolean_operation(a, b, operation) for a, b, operation in jobs ]
+
+		self.assertEqual( serial, Polygon.boolean_operations(jobs, processes=2) )
+		self.assertEqual( serial[:3], Polygon.boolean_operations(jobs[:3]) )
+		self.assertRaises( ValueError, Polygon.boolean_operations, [(self.square, self.square2, 'x')] )
+
+		array_square = ArrayPolygon.from_polygon(self.square)
+		self.assertEqual( self.square, decode_polygon(encode_polygon(self.square)) )
+		self.assertEqual( self.square, decode_polygon(encode_polygon(array_square)) )
+
+	def test_union_all(self):
+		u = Polygon.from_tuples([(0, 0), (3, 0), (3, 3), (2, 3), (2, 1), (1, 1), (1, 3), (0, 3)])
+		bar = Polygon.from_tuples([(-1, 2), (4, 2), (4, 4), (-1, 4)])
+		small = Polygon.from_tuples([(1.2, 1.2), (1.5, 1.2), (1.5, 1.5), (1.2, 1.5)])
+
+		regions = Polygon.union_all([u, bar, small])
+		regions.sort(key=len)
+		self.assertEqual( [[small], [Polygon.from_tuples([(0, 2), (0, 0), (3, 0), (3, 2), (4, 2), (4, 4), (-1, 4), (-1, 2)]), Polygon.from_tuples([(2, 2), (2, 1), (1, 1), (1, 2)])]], regions )
+		self.assertNotEqual( regions[1][0].is_clockwise(), regions[1][1].is_clockwise() )
+
+		# overlapping squares around a courtyard
+		squares = [ Polygon.from_tuples([(x, y), (x + 1.5, y), (x + 1.5, y + 1.5), (x, y + 1.5)]) for x in range(5) for y in range(5) if x in (0, 4) or y in (0, 4) ]
+		regions = Polygon.union_all(squares)
+		self.assertEqual( 1, len(regions) )
+		self.assertEqual( [30.25, 6.25], [ abs(p.get_signed_area()) for p in regions[0] ] )
+
+		self.assertEqual( [], Polygon.union_all([]) )
+
+	def test_boolean_many_vertices(self):
+		star_a = Polygon.from_tuples([ (100 * (1 if i % 2 else 0.97) * math.cos(i * math.pi / 500), 100 * (1 if i % 2 else 0.97) * math.sin(i * math.pi / 500)) for i in range(1000) ])
+		star_b = Polygon.from_pointlist([ p + Vector(30, 10) for p in star_a.points ])
+
+		union = Polygon.union(star_a, star_b)
+		self.assertEqual( 1, len(union) )
+		self.assertTrue( abs(union[0].get_signed_area()) > abs(star_a.get_signed_area()) )
+
+		intersection = Polygon.intersect(star_a, star_b)
+		self.assertEqual( 1, len(intersection) )
+		self.assertAlmostEqual( abs(star_a.get_signed_area()) * 2, abs(union[0].get_signed_area()) + abs(intersection[0].get_signed_area()), 0 )
+
 
 	def test_offset(self):
 		#self.square = Polygon.regular( Vector( 10.0, 30.0 ), 3, 4 )
@@ -220,6 +402,334 @@ class TestPolygon(unittest.TestCase):
 		
 		self.assertEqual( [Polygon.regular( Vector(10, 30), 5, 4) ], Polygon.offset([self.square], 2.0) )
 
+	def test_offset_many_vertices(self):
+		n = 400
+		wavy = Polygon.from_pointlist([ Vector(math.cos(2 * math.pi * i / n), math.sin(2 * math.pi * i / n)) * (10 + math.sin(24 * math.pi * i / n)) for i in range(n) ]).clone_ccw()
+
+		shrunk = Polygon.offset([wavy], -0.5)
+		self.assertEqual( 1, len(shrunk) )
+		self.assertFalse( shrunk[0].is_self_intersecting() )
+		self.assertTrue( abs(shrunk[0].get_signed_area()) < abs(wavy.get_signed_area()) )
+
+		grown = Polygon.offset([wavy], 0.5)
+		self.assertEqual( 1, len(grown) )
+		self.assertFalse( grown[0].is_self_intersecting() )
+		self.assertTrue( abs(grown[0].get_signed_area()) > abs(wavy.get_signed_area()) )
+
+	def test_offset_many(self):
+		n = 100
+		wavy = Polygon.from_pointlist([ Vector(math.cos(2 * math.pi * i / n), math.sin(2 * math.pi * i / n)) * (10 + math.sin(12 * math.pi * i / n)) for i in range(n) ]).clone_ccw()
+
+		amounts = [ -1.0, -0.5, 0, 0.5, -0.5 ]
+		results = Polygon.offset_many([wavy], amounts)
+		self.assertEqual( [ -1.0, -0.5, 0, 0.5 ], sorted(results) )
+
+		for amount in amounts:
+			self.assertEqual( Polygon.offset([wavy], amount), results[amount] )
+
+	def test_self_intersecting(self):
+		self.assertFalse( self.irregular.is_self_intersecting() )
+		self.assertTrue( Polygon.from_tuples([ (0, 0), (2, 2), (2, 0), (0, 2) ]).is_self_intersecting() )
+
+		n = 400
+		circle = [ Vector(math.cos(2 * math.pi * i / n), math.sin(2 * math.pi * i / n)) * 10 for i in range(n) ]
+		self.assertFalse( Polygon.from_pointlist(circle).is_self_intersecting() )
+
+		circle[100], circle[300] = circle[300], circle[100]
+		self.assertTrue( Polygon.from_pointlist(circle).is_self_intersecting() )
+
+class TestArrayPolygon(unittest.TestCase):
+
+	def setUp(self):
+		self.irregular = Polygon.from_pointlist( [ Vector(1, 1), Vector(0, 3), Vector(4, 5), Vector(3, 2) ] )
+		self.array = ArrayPolygon.from_polygon(self.irregular)
+
+	def test_points(self):
+		self.assertEqual( self.irregular.points, self.array.points )
+		self.assertEqual( self.irregular, self.array )
+		self.assertEqual( Vector(4, 5), self.array[2] )
+		self.assertEqual( Vector(3, 2), self.array[-1] )
+		self.assertEqual( self.irregular.as_tuple_list(), self.array.as_tuple_list() )
+
+	def test_properties(self):
+		self.assertEqual( (0, 1, 4, 5), self.array.bounding_box )
+		self.assertEqual( 4, self.array.width )
+		self.assertEqual( 4, self.array.height )
+		self.assertEqual( self.irregular.center, self.array.center )
+		self.assertEqual( self.irregular.signed_area, self.array.signed_area )
+		self.assertEqual( self.irregular.is_clockwise(), self.array.is_clockwise() )
+		self.assertEqual( self.irregular.is_convex(), self.array.is_convex() )
+
+	def test_cache_invalidation(self):
+		self.assertEqual( 4, self.array.right )
+		self.assertTrue( self.array.is_convex() )
+
+		self.array[3] = Vector(2, 3.5)
+		self.assertFalse( self.array.is_convex() )
+
+		self.array[3] = Vector(5, 1)
+		self.assertEqual( 5, self.array.right )
+		self.assertTrue( self.array.is_convex() )
+
+		self.array.add_point( Vector(7, 0) )
+		self.assertEqual( 7, self.array.right )
+
+		del self.array[4]
+		self.assertEqual( 5, self.array.right )
+
+		area = self.array.signed_area
+		self.array.flip()
+		self.assertEqual( -area, self.array.signed_area )
+		self.assertTrue( self.array.is_clockwise() )
+
+	def test_contains_point_star(self):
+		from py2d.Navigation import NavPolygon
+
+		# a pentagram turns the same way at every vertex, but must not use the convex test
+		star = Polygon.from_tuples([ (0, 10), (6, -8), (-10, 3), (10, 3), (-6, -8) ])
+		expected = [ (Vector(0, 0), 0), (Vector(2, 2), 0), (Vector(-5, 1), 1) ]
+
+		self.assertTrue( ArrayPolygon.from_polygon(star).is_convex() )
+		self.assertEqual( [ e for p, e in expected ], [ star.contains_point(p) for p, e in expected ] )
+		self.assertEqual( [ e for p, e in expected ], [ ArrayPolygon.from_polygon(star).contains_point(p) for p, e in expected ] )
+		self.assertEqual( [ e for p, e in expected ], [ NavPolygon(star).contains_point(p) for p, e in expected ] )
+
+		# the fast path is still taken for convex polygons
+		self.assertEqual( 1, self.array.contains_point(Vector(2, 3)) )
+		self.assertTrue( NavPolygon(self.irregular).convex )
+
+	def test_nav_polygon_identity(self):
+		from py2d.Navigation import NavPolygon
+
+		# NavPolygons with the same points are distinct graph nodes
+		a, b = NavPolygon(self.irregular), NavPolygon(self.irregular)
+		self.assertTrue( a == a )
+		self.assertFalse( a == b )
+		self.assertTrue( a != b )
+		self.assertEqual( 2, len({ a: 1, b: 2 }) )
+
+	def test_points_are_read_only(self):
+		self.array.points.append( Vector(10, 10) )
+		self.assertEqual( 4, len(self.array) )
+		self.assertRaises( AttributeError, setattr, self.array[0], "x", 10 )
+
+	def test_clone(self):
+		c = self.array.clone()
+		c[0] = Vector(-1, -1)
+		self.assertEqual( Vector(1, 1), self.array[0] )
+		self.assertEqual( -1, c.left )
+		self.assertEqual( 0, self.array.left )
+
+
+class TestPreparedPolygon(unittest.TestCase):
+
+	def setUp(self):
+		# a comb with four teeth, so that horizontal lines cross many edges
+		pts = [ (0, 0), (9, 0) ]
+		for i in range(4, 0, -1):
+			pts += [ (2 * i, 5), (2 * i - 1, 1) ]
+		pts += [ (0, 5) ]
+
+		self.comb = Polygon.from_tuples(pts)
+		self.prepared = self.comb.prepare()
+
+	def test_contains_point(self):
+		points = [ Vector(x / 2.0, y / 2.0) for x in range(-2, 21) for y in range(-2, 13) ]
+		points += [ Vector(1.5, 3.00001), Vector(0.00001, 2), Vector(4.5 + 1e-7, 1.0) ]
+
+		for p in points:
+			self.assertEqual( self.comb.contains_point(p), self.prepared.contains_point(p), p )
+
+	def test_contains_points(self):
+		points = [ Vector(2, 4.5), Vector(2.5, 4), Vector(9, 0), Vector(4.5, 0), Vector(9, 5) ]
+		self.assertEqual( [1, 0, 2, 2, 0], list(self.prepared.contains_points(points)) )
+		self.assertEqual( [1, 0, 2, 2, 0], list(self.prepared.contains_points([ (p.x, p.y) for p in points ])) )
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_contains_points_array(self):
+		points = numpy.array([ (2, 4.5), (2.5, 4), (9, 0), (4.5, 0), (9, 5) ])
+		expected = self.comb.contains_points(points)
+
+		for classified in (self.prepared.contains_points(points), PolygonWithHoles(self.comb).contains_points(points), PolygonSet([self.comb]).contains_points(points)):
+			self.assertTrue( isinstance(classified, numpy.ndarray) )
+			self.assertEqual( expected.dtype, classified.dtype )
+			self.assertEqual( expected.tolist(), classified.tolist() )
+
+	def test_snapshot(self):
+		self.comb.add_point(Vector(-5, 5))
+		self.assertEqual( 0, self.prepared.contains_point(Vector(-1, 4)) )
+		self.assertEqual( 1, self.comb.prepare().contains_point(Vector(-1, 4)) )
+
+	def test_array_polygon_cache(self):
+		array = ArrayPolygon.from_polygon(self.comb)
+		self.assertTrue( array.prepare() is array.prepare() )
+
+		array[0] = Vector(-1, -1)
+		self.assertEqual( 1, array.prepare().contains_point(Vector(-0.5, -0.4)) )
+
+
+class TestPolygonWithHoles(unittest.TestCase):
+	def setUp(self):
+		self.outline = Polygon.from_tuples([(0, 0), (10, 0), (10, 10), (0, 10)])
+		self.hole = Polygon.from_tuples([(4, 4), (6, 4), (6, 6), (4, 6)])
+		self.shape = PolygonWithHoles(self.outline, [self.hole])
+
+	def test_orientation(self):
+		self.assertFalse( self.shape.outline.is_clockwise() )
+		self.assertTrue( self.shape.holes[0].is_clockwise() )
+		self.assertEqual( self.shape, PolygonWithHoles.from_list([self.outline.clone_cw(), self.hole.clone_ccw()]) )
+		self.assertEqual( [self.shape.outline] + self.shape.holes, list(self.shape) )
+
+	def test_queries(self):
+		self.assertEqual( 96, self.shape.area )
+		self.assertEqual( (0, 0, 10, 10), self.shape.bounding_box )
+		self.assertEqual( [1, 0, 2, 2, 0], list(self.shape.contains_points([Vector(1, 1), Vector(5, 5), Vector(4, 5), Vector(10, 5), Vector(11, 5)])) )
+		self.assertEqual( 8, len(self.shape.edges) )
+		self.assertEqual( 1, self.shape.distance_point_squared(Vector(5, 5)) )
+		self.assertEqual( 0, self.shape.distance_point_squared(Vector(2, 2)) )
+
+	def test_consumers(self):
+		parts = Polygon.convex_decompose(self.shape)
+		self.assertAlmostEqual( 96, sum(abs(p.get_signed_area()) for p in parts) )
+		self.assertEqual( len(Polygon.convex_decompose(self.outline, [self.hole])), len(parts) )
+
+		shape = PolygonWithHoles(self.outline, [Polygon.regular(Vector(5, 5), 2, 6)])
+		self.assertEqual( Polygon.offset([shape.outline, shape.holes[0]], 0.5), Polygon.offset(shape, 0.5) )
+
+class TestPolygonSet(unittest.TestCase):
+	def setUp(self):
+		self.frame = PolygonSet([ PolygonWithHoles(Polygon.from_tuples([(0, 0), (10, 0), (10, 10), (0, 10)]), [Polygon.from_tuples([(4, 4), (6, 4), (6, 6), (4, 6)])]) ])
+		self.bar = Polygon.from_tuples([(5, -1), (7, -1), (7, 11), (5, 11)])
+
+	def test_boolean(self):
+		union = self.frame.union(self.bar)
+		self.assertEqual( 1, len(union) )
+		self.assertAlmostEqual( 96 + 4 + 2, union.area )
+		self.assertEqual( 1, len(union[0].holes) )
+
+		intersection = Polygon.intersect(self.frame, self.bar)
+		self.assertEqual( 1, len(intersection) )
+		self.assertAlmostEqual( 20 - 2, intersection.area )
+
+		difference = self.frame.subtract(self.bar)
+		self.assertEqual( 2, len(difference) )
+		self.assertAlmostEqual( 96 - 18, difference.area )
+		self.assertEqual( 0, difference.contains_point(Vector(6, 5)) )
+
+		# filling the hole with an island
+		island = PolygonSet([Polygon.from_tuples([(4.5, 4.5), (5.5, 4.5), (5.5, 5.5), (4.5, 5.5)])])
+		self.assertEqual( 2, len(self.frame.union(island)) )
+		self.assertAlmostEqual( 0, self.frame.intersect(island).area )
+
+		# a new hole overlapping the old one
+		self.assertEqual( 1, len(self.frame.subtract(Polygon.from_tuples([(5, 5), (8, 5), (8, 8), (5, 8)])).regions[0].holes) )
+		self.assertAlmostEqual( 96 - 8, self.frame.subtract(Polygon.from_tuples([(5, 5), (8, 5), (8, 8), (5, 8)])).area )
+
+	def test_from_polygons(self):
+		outline = Polygon.from_tuples([(0, 0), (10, 0), (10, 10), (0, 10)])
+		hole = Polygon.from_tuples([(2, 2), (8, 2), (8, 8), (2, 8)])
+		island = Polygon.from_tuples([(4, 4), (6, 4), (6, 6), (4, 6)])
+
+		polygon_set = PolygonSet.from_polygons([island, hole, outline])
+		self.assertEqual( 2, len(polygon_set) )
+		self.assertEqual( [1, 0, 1], list(polygon_set.contains_points([Vector(1, 1), Vector(3, 3), Vector(5, 5)])) )
+		self.assertEqual( 12, len(polygon_set.edge_index) )
+		self.assertEqual( 3, len(polygon_set.polygons) )
+
+class TestTransform(unittest.TestCase):
+
+	def setUp(self):
+		self.t = Transform.rotate_around(1, 2, 0.3) * Transform.scale(2, 3) * Transform.move(1, -1)
+		self.poly = Polygon.regular( Vector(1, 1), 3, 5 )
+
+	def test_matrix(self):
+		self.assertEqual( ((1, 0, 5), (0, 1, 6), (0, 0, 1)), Transform.move(5, 6).data )
+
+		t = Transform.unit()
+		with self.assertRaises(TypeError):
+			t.data[0][2] = 5
+		t.data = [[1, 0, 5], [0, 1, 0]]
+		self.assertEqual( Vector(5, 0), t * Vector(0, 0) )
+		self.assertEqual( Transform.move(5, 6).m, Transform([[1, 0, 5], [0, 1, 6], [0, 0, 1]]).m )
+
+	def test_compose(self):
+		v = Vector(3, 4)
+		self.assertEqual( Transform.scale(2, 3) * (Transform.move(1, -1) * v), (Transform.scale(2, 3) * Transform.move(1, -1)) * v )
+		self.assertEqual( Vector(-4, 3), Transform.rotate(math.pi / 2) * v )
+
+	def test_inverse(self):
+		v = Vector(3, 4)
+		self.assertEqual( v, self.t.inverse() * (self.t * v) )
+		self.assertTrue( self.t.inverse() is self.t.inverse() )
+		self.assertTrue( self.t.inverse().inverse() is self.t )
+		self.assertRaises( ValueError, Transform.scale(0, 1).inverse )
+
+	def test_apply_many(self):
+		expected = [ self.t * p for p in self.poly.points ]
+
+		self.assertEqual( expected, (self.t * self.poly).points )
+		self.assertEqual( expected, self.t.apply_many(ArrayPolygon.from_polygon(self.poly)).points )
+		self.assertEqual( expected, self.t.apply_many(self.poly.points) )
+
+		array_poly = ArrayPolygon.from_polygon(self.poly)
+		left = array_poly.left
+		self.assertTrue( array_poly is self.t.apply_many(array_poly, in_place=True) )
+		self.assertEqual( expected, array_poly.points )
+		self.assertNotEqual( left, array_poly.left )
+
+		self.t.apply_many(self.poly, in_place=True)
+		self.assertEqual( expected, self.poly.points )
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_apply_many_vector_array(self):
+		expected = [ self.t * p for p in self.poly.points ]
+		a = VectorArray.from_polygon(self.poly)
+
+		self.assertEqual( expected, (self.t * a).to_vectors() )
+		self.t.apply_many(a, in_place=True)
+		self.assertEqual( expected, a.to_vectors() )
+
+
+class TestTransformNode(unittest.TestCase):
+
+	def setUp(self):
+		self.triangle = Polygon.from_tuples([(0, 0), (1, 0), (0, 1)])
+
+		self.root = TransformNode(Transform.move(10, 0))
+		self.child = TransformNode(Transform.scale(2, 2), [self.triangle], parent=self.root)
+		self.grandchild = TransformNode(Transform.move(0, 1), [self.triangle], parent=self.child)
+
+	def test_world_transform(self):
+		self.assertEqual( Vector(10, 2), self.grandchild.world_transform * Vector(0, 0) )
+		self.assertEqual( [Vector(10, 2), Vector(12, 2), Vector(10, 4)], self.grandchild.world_polygons[0].points )
+		self.assertEqual( 2, len(self.root.get_all_world_polygons()) )
+
+	def test_caching(self):
+		world = self.grandchild.world_transform
+		polys = self.grandchild.world_polygons
+
+		self.assertTrue( world is self.grandchild.world_transform )
+		self.assertTrue( polys is self.grandchild.world_polygons )
+
+		# changing a sibling subtree does not invalidate the cache
+		TransformNode(Transform.move(5, 5), parent=self.child).transform = Transform.move(1, 1)
+		self.assertTrue( world is self.grandchild.world_transform )
+
+	def test_invalidation(self):
+		polys = self.grandchild.world_polygons
+
+		self.root.transform = Transform.move(0, 0)
+		self.assertFalse( polys is self.grandchild.world_polygons )
+		self.assertEqual( Vector(0, 2), self.grandchild.world_polygons[0][0] )
+
+		self.grandchild.parent = self.root
+		self.assertEqual( Vector(0, 1), self.grandchild.world_polygons[0][0] )
+		self.assertEqual( [self.child, self.grandchild], self.root.children )
+
+		self.grandchild.parent = None
+		self.assertEqual( Vector(0, 1), self.grandchild.world_transform * Vector(0, 0) )
+
+
 class TestIntersection(unittest.TestCase):
 	def setUp(self):
 
@@ -270,10 +780,491 @@ class TestIntersection(unittest.TestCase):
 		self.assertEqual( [Vector(2, 3), Vector(-2, 3), Vector(-3, 2), Vector(-3, -2), Vector(-2, -3), Vector(2, -3), Vector(3, 2), Vector(3, -2)], intersect_poly_poly(self.square.points, self.diamond.points) )
 
 
+	def test_intersect_linesegs_linesegs_indexed(self):
+		segs1 = list(zip(self.square.points, self.square.points[1:])) + [ (self.a, self.b) ]
+		segs2 = list(zip(self.diamond.points, self.diamond.points[1:])) + [ (self.origin, self.c) ]
+
+		expected = []
+		for i, (p1, p2) in enumerate(segs1):
+			for j, (q1, q2) in enumerate(segs2):
+				p = intersect_lineseg_lineseg(p1, p2, q1, q2)
+				if p: expected.append((i, j, p))
+
+		self.assertEqual( expected, intersect_linesegs_linesegs_indexed(segs1, segs2) )
+		self.assertEqual( (3, 3, Vector(3.5, 1.75)), expected[-1] )
+
+	def test_sweep_overlapping_pairs(self):
+		boxes1 = [ (0, 0, 1, 1), (5, 0, 6, 1) ]
+		boxes2 = [ (1, 1, 2, 2), (0, 3, 6, 4), (2, -1, 5.5, 0.5) ]
+		self.assertEqual( [ (0, 0), (1, 2) ], sorted(sweep_overlapping_pairs(boxes1, boxes2)) )
+		self.assertEqual( [ (0, 2), (1, 4) ], sorted(sweep_overlapping_pairs(boxes1 + boxes2)) )
+
+	def test_morton_order(self):
+		boxes = [ (1, 1, 1, 1), (-1, -1, 1, 1), (0, 1, 0, 1), (1, 0, 1, 0) ]
+		self.assertEqual( [1, 3, 2, 0], morton_order(boxes) )
+		self.assertEqual( [], morton_order([]) )
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_batch_intersect(self):
+		segs = list(zip(self.square.points, self.square.points[1:] + self.square.points[:1])) + [ (self.a, self.b), (self.d, self.e) ]
+		a, b = linesegs_to_arrays(segs)
+
+		u_a, u_b, points, hit = batch_intersect_lineseg_lineseg(a, b, (0, 0), (4, 2))
+		expected = [ intersect_lineseg_lineseg(s[0], s[1], self.origin, self.c) for s in segs ]
+		self.assertEqual( [ e is not None for e in expected ], hit.tolist() )
+		self.assertEqual( [ e for e in expected if e ], [ Vector(x, y) for x, y in points[hit].tolist() ] )
+
+		u_a, u_b, points, hit = batch_intersect_lineseg_ray(a, b, (-1, 0), (1, 1))
+		expected = [ intersect_lineseg_ray(s[0], s[1], self.f, self.d) for s in segs ]
+		self.assertEqual( [ e is not None for e in expected ], hit.tolist() )
+		self.assertEqual( [ e for e in expected if e ], [ Vector(x, y) for x, y in points[hit].tolist() ] )
+
+		# all pairs of segments by broadcasting
+		u_a, u_b, points, hit = batch_intersect_lineseg_lineseg(a[:, numpy.newaxis], b[:, numpy.newaxis], a[numpy.newaxis], b[numpy.newaxis])
+		self.assertEqual( [ [ check_intersect_lineseg_lineseg(s[0], s[1], t[0], t[1]) for t in segs ] for s in segs ], hit.tolist() )
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_batch_fast_path(self):
+		import py2d.Math.Operations
+		segs = list(zip(self.diamond.points, self.diamond.points[1:] + self.diamond.points[:1])) + [ (self.a, self.b), (self.d, self.e), (self.c, self.d) ]
+
+		threshold = py2d.Math.Operations.BATCH_MIN_SEGMENTS
+		try:
+			py2d.Math.Operations.BATCH_MIN_SEGMENTS = len(segs) + 1
+			expected_lineseg = intersect_linesegs_lineseg(segs, self.f, self.c)
+			expected_ray = intersect_linesegs_ray(segs, self.origin, self.a)
+
+			py2d.Math.Operations.BATCH_MIN_SEGMENTS = 1
+			self.assertEqual( expected_lineseg, intersect_linesegs_lineseg(segs, self.f, self.c) )
+			self.assertEqual( expected_ray, intersect_linesegs_ray(segs, self.origin, self.a) )
+
+			# iterators are accepted too
+			self.assertEqual( expected_lineseg, intersect_linesegs_lineseg(iter(segs), self.f, self.c) )
+			self.assertEqual( expected_ray, intersect_linesegs_ray(filter(None, segs), self.origin, self.a) )
+		finally:
+			py2d.Math.Operations.BATCH_MIN_SEGMENTS = threshold
+
+	def test_cast_rays(self):
+		segs = list(zip(self.square.points, self.square.points[1:] + self.square.points[:1])) + [ (self.a, self.b), (Vector(-2, -2), Vector(2, -2)) ]
+		grid = SegmentGrid(segs, cell_size=1)
+
+		self.assertEqual( (Vector(3, 0), 3), grid.cast_ray(self.origin, self.x) )
+		self.assertEqual( (Vector(0, -2), 5), grid.cast_ray(self.origin, Vector(0, -1)) )
+		self.assertEqual( (Vector(2, 2.5), 4), grid.cast_ray(self.origin, Vector(4, 5)) )
+		self.assertEqual( None, grid.cast_ray(Vector(10, 10), Vector(11, 11)) )
+
+		# the accept function can reject hits
+		self.assertEqual( (Vector(0, -3), 2), grid.cast_ray(self.origin, Vector(0, -1), lambda p, i: i != 5) )
+
+		rays = [ (self.origin, Vector(1, 1)), (self.origin, Vector(-1, 0)), (self.f, self.d) ]
+		self.assertEqual( grid.cast_rays(rays), cast_rays(segs, rays) )
+		self.assertEqual( [Vector(7 / 3.0, 7 / 3.0), Vector(-3, 0), Vector(3, 2)], [ p for p, i in cast_rays(segs, rays) ] )
+
 	def test_distance_point_lineseg_squared(self):
 		self.assertEqual( 3.2, distance_point_lineseg_squared(self.d, self.a, self.b) )
 		self.assertEqual( 0, distance_point_lineseg_squared(Vector(2,4), Vector(0,3), Vector(4, 5)) )
 		self.assertNotEqual( 0, distance_point_lineseg_squared(Vector(2,2), Vector(3,2), Vector(1, 1)) )
 
+	def test_winding_numbers(self):
+		outer = Polygon.regular(Vector(0, 0), 2, 4).points
+		inner = [ p * 0.5 for p in outer ]
+		points = [ Vector(0, 0.1), Vector(1, 0.2), Vector(5, 0), Vector(-1.2, 0.3) ]
+
+		self.assertEqual( [-2, -1, 0, -1], winding_numbers([outer, inner], points) )
+		self.assertEqual( [2, 1, 0, 1], winding_numbers([outer[::-1], inner[::-1]], points) )
+		self.assertEqual( [0, 0, 0, 0], winding_numbers([outer, inner[::-1]], points[:1] * 4) )
+
+class TestSegmentBVH(unittest.TestCase):
+	def setUp(self):
+		# a 10x10 grid of short diagonal segments, enough for several levels of nodes
+		self.segs = [ (Vector(x, y), Vector(x + 0.5, y + 0.5)) for x in range(10) for y in range(10) ]
+		self.bvh = SegmentBVH(self.segs)
+
+	def test_query_lineseg(self):
+		p1, p2 = Vector(0, 0.25), Vector(10, 0.25)
+		expected = [ i for i, (a, b) in enumerate(self.segs) if check_intersect_lineseg_lineseg(p1, p2, a, b) ]
+
+		self.assertEqual( 10, len(expected) )
+		self.assertEqual( expected, self.bvh.query_lineseg(p1, p2) )
+
+	def test_query_box(self):
+		self.assertEqual( [0, 1, 10, 11], self.bvh.query_box(0, 0, 1.2, 1.2) )
+		self.assertEqual( [], self.bvh.query_box(20, 20, 30, 30) )
+
+	def test_ray(self):
+		p1, p2 = Vector(-1, 4.25), Vector(0, 4.25)
+
+		self.assertEqual( [ 10 * x + 4 for x in range(10) ], self.bvh.query_ray(p1, p2) )
+		self.assertEqual( (Vector(0.25, 4.25), 4), self.bvh.cast_ray(p1, p2) )
+		self.assertEqual( (Vector(1.25, 4.25), 14), self.bvh.cast_ray(p1, p2, lambda p, i: i != 4) )
+		self.assertEqual( None, self.bvh.cast_ray(p1, p1 - Vector(1, 0)) )
+
+		# same results as the uniform grid
+		rays = [ (Vector(5.1, 5.3), Vector(5.1 + math.cos(i), 5.3 + math.sin(i))) for i in range(16) ]
+		self.assertEqual( SegmentGrid(self.segs).cast_rays(rays), self.bvh.cast_rays(rays) )
+
+	def test_nearest(self):
+		self.assertEqual( (0, 0.5), self.bvh.nearest(Vector(-0.5, 0.5)) )
+		self.assertEqual( 44, self.bvh.nearest(Vector(4.3, 4.2))[0] )
+		self.assertEqual( None, self.bvh.nearest(Vector(-5, -5), max_distance=1) )
+
+	def test_pickle(self):
+		bvh = pickle.loads(pickle.dumps(self.bvh))
+
+		self.assertEqual( self.bvh.get_bounding_box(), bvh.get_bounding_box() )
+		self.assertEqual( self.bvh.query_box(2, 2, 4, 4), bvh.query_box(2, 2, 4, 4) )
+
+	def test_empty(self):
+		bvh = SegmentBVH([])
+
+		self.assertEqual( [], bvh.query_lineseg(Vector(0, 0), Vector(1, 1)) )
+		self.assertEqual( None, bvh.cast_ray(Vector(0, 0), Vector(1, 1)) )
+		self.assertEqual( None, bvh.nearest(Vector(0, 0)) )
+
+class TestRTree(unittest.TestCase):
+	def setUp(self):
+		# 10x10 grid of hexagons with some space between them
+		self.polygons = [ Polygon.regular(Vector(3 * x, 3 * y), 1, 6) for x in range(10) for y in range(10) ]
+		self.tree = RTree.from_polygons(self.polygons, max_entries=4)
+
+	def test_query(self):
+		self.assertEqual( 100, len(self.tree) )
+		self.assertEqual( [], self.tree.query_point(Vector(1.5, 1.5)) )
+		self.assertEqual( [11], self.tree.query_point(Vector(3.5, 3.5)) )
+		self.assertEqual( [0, 1, 10, 11], self.tree.query_box(0, 0, 3, 3) )
+
+		boxes = [ p.get_bounding_box() for p in self.polygons ]
+		expected = [ i for i, b in enumerate(boxes) if b[0] <= 10 and b[2] >= 4 and b[1] <= 20 and b[3] >= 7.5 ]
+		self.assertEqual( expected, self.tree.query_box(4, 7.5, 10, 20) )
+
+	def test_empty(self):
+		tree = RTree()
+		self.assertEqual( 0, len(tree) )
+		self.assertEqual( [], tree.query_box(0, 0, 1, 1) )
+		self.assertEqual( None, tree.bounding_box )
+
+	def test_insert_delete(self):
+		boxes = dict((i, p.get_bounding_box()) for i, p in enumerate(self.polygons))
+
+		for i in range(0, 100, 3):
+			self.assertTrue( self.tree.delete(boxes.pop(i), i) )
+		self.assertFalse( self.tree.delete((0, 0, 100, 100), 0) )
+
+		for i in range(100, 140):
+			boxes[i] = (i, 0, i + 0.5, 0.5)
+			self.tree.insert(boxes[i], i)
+
+		self.assertEqual( len(boxes), len(self.tree) )
+		self.assertEqual( sorted(boxes.items()), sorted((v, b) for b, v in self.tree.entries()) )
+		expected = sorted(i for i, b in boxes.items() if b[1] <= 3.5)
+		self.assertEqual( expected, self.tree.query_box(-1, -1, 200, 3.5) )
+
+	def test_nearest(self):
+		self.assertEqual( [(11, 0)], self.tree.nearest(Vector(3.2, 3.1)) )
+		self.assertEqual( [0, 1, 10, 11], sorted(v for v, d in self.tree.nearest(Vector(1.5, 1.5), k=4)) )
+		self.assertEqual( [], self.tree.nearest(Vector(-10, -10), max_distance=5) )
+
+		# nearest polygons by their exact distance instead of their box distance
+		p = Vector(4.4, 4.4)
+		distances = sorted((poly.distance_point_squared(p), i) for i, poly in enumerate(self.polygons))
+		exact = lambda i, box: self.polygons[i].distance_point_squared(p)
+		self.assertEqual( [ (i, d) for d, i in distances[:3] ], self.tree.nearest(p, k=3, distance=exact) )
+
+	def test_query_polygon(self):
+		# fits between four hexagons without touching them
+		diamond = Polygon.regular(Vector(4.5, 4.5), 1.5, 4)
+
+		self.assertEqual( [11, 12, 21, 22], self.tree.query_box(*diamond.get_bounding_box()) )
+		self.assertEqual( [], self.tree.query_polygon(diamond, self.polygons) )
+
+		diamond = Polygon.regular(Vector(4.5, 3), 1.6, 4)
+		self.assertEqual( [11, 21], self.tree.query_polygon(diamond, self.polygons) )
+		self.assertEqual( [11], self.tree.query_polygon(Polygon.regular(Vector(3, 3), 0.5, 4), self.polygons) )
+
+	def test_bytes(self):
+		self.tree.insert((100, 100, 101, 101), 100)
+		restored = RTree.from_bytes(self.tree.to_bytes())
+
+		self.assertEqual( self.tree.entries(), restored.entries() )
+		self.assertEqual( len(self.tree), len(restored) )
+		self.assertEqual( self.tree.query_box(4, 7.5, 10, 20), restored.query_box(4, 7.5, 10, 20) )
+		self.assertRaises( TypeError, RTree([((0, 0, 1, 1), 'a')]).to_bytes )
+		self.assertRaises( ValueError, RTree.from_bytes, b'nonsense' * 4 )
+
+	def test_spatial_join(self):
+		points = [ Vector(x / 2.0, y / 3.0) for x in range(-2, 60) for y in range(-2, 90, 7) ]
+		expected = [ next((i for i, poly in enumerate(self.polygons) if poly.contains_point(p)), None) for p in points ]
+
+		self.assertEqual( expected, spatial_join(self.polygons, points, self.tree) )
+		self.assertEqual( expected, spatial_join(self.polygons, points) )
+		self.assertTrue( 0 < sum(1 for i in expected if i is not None) < len(points) )
+
+class TestSpatialHashGrid(unittest.TestCase):
+	def setUp(self):
+		self.grid = SpatialHashGrid(2)
+		self.agents = [ self.grid.insert(Vector(x, y)) for x in range(5) for y in range(5) ]
+		self.wall = self.grid.insert((Vector(-1, 10), Vector(10, 10)))
+		self.square = self.grid.insert(Polygon.regular(Vector(20, 20), 2, 4))
+
+	def test_query(self):
+		self.assertEqual( 27, len(self.grid) )
+		self.assertEqual( [0, 1, 5, 6], self.grid.query_box(-1, -1, 1, 1) )
+		self.assertEqual( [6, 7, 11, 12], self.grid.query_radius(Vector(1.5, 1.5), 1) )
+		self.assertEqual( [self.wall], self.grid.query_point(Vector(3, 10)) )
+		self.assertEqual( [self.square], self.grid.query_box(17, 17, 100, 100) )
+
+	def test_update_remove(self):
+		self.grid.update(0, Vector(19, 19))
+		self.assertEqual( [0, self.square], self.grid.query_radius(Vector(20, 20), 2) )
+		self.assertEqual( [], self.grid.query_point(Vector(0, 0)) )
+
+		# moving within the same cell
+		self.grid.update(self.square, box=(19, 19, 21, 21))
+		self.assertEqual( [], self.grid.query_box(21.5, 21.5, 22, 22) )
+		self.assertEqual( [0, self.square], self.grid.query_box(18, 18, 19.5, 19.5) )
+
+		self.grid.remove(0)
+		self.assertFalse( 0 in self.grid )
+		self.assertEqual( [self.square], self.grid.query_radius(Vector(20, 20), 2) )
+		self.assertRaises( TypeError, self.grid.insert, "no box" )
+
+	def test_index(self):
+		segs = [ (Vector(x, 0), Vector(x + 0.5, 1)) for x in range(100) ] + [ (Vector(0, 2), Vector(100, 2)) ]
+		grid = SpatialHashGrid.from_linesegs(segs)
+		bvh = SegmentBVH(segs)
+
+		p1, p2 = Vector(10.2, -1), Vector(10.7, 3)
+		self.assertTrue( set([10, 100]) <= set(grid.query_lineseg(p1, p2)) )
+		self.assertTrue( len(grid.query_lineseg(p1, p2)) < 10 )
+
+		for index in (grid, bvh):
+			self.assertEqual( intersect_linesegs_lineseg(segs, p1, p2), intersect_linesegs_lineseg(segs, p1, p2, index=index) )
+			self.assertEqual( intersect_linesegs_ray(segs, p1, p2), intersect_linesegs_ray(segs, p1, p2, index=index) )
+			self.assertEqual( intersect_linesegs_ray(segs, p2, p1), intersect_linesegs_ray(segs, p2, p1, index=index) )
+
+class TestLooseQuadTree(unittest.TestCase):
+	def setUp(self):
+		self.tree = LooseQuadTree((0, 0, 64, 64), max_depth=5)
+		self.agents = [ self.tree.insert(Vector(x * 8 + 1, y * 8 + 1), (x * 8, y * 8, x * 8 + 2, y * 8 + 2)) for x in range(8) for y in range(8) ]
+		self.wall = self.tree.insert((Vector(0, 32), Vector(64, 32)))
+		self.far = self.tree.insert(Polygon.regular(Vector(100, 100), 2, 4))
+
+	def test_query(self):
+		self.assertEqual( 66, len(self.tree) )
+		self.assertEqual( [0, 1, 8, 9], self.tree.query_box(1, 1, 9, 9) )
+		self.assertEqual( [self.wall], self.tree.query_point(Vector(5, 32)) )
+		self.assertEqual( [self.far], self.tree.query_box(90, 90, 200, 200) )
+		self.assertEqual( [4, self.wall], self.tree.query_lineseg(Vector(1, 31), Vector(1, 34)) )
+		self.assertEqual( [4, 5, 6, 7, self.wall], self.tree.query_ray(Vector(1, 31), Vector(1, 34)) )
+
+	def test_brute_force(self):
+		random.seed(4)
+		for i in range(200):
+			x, y, w = random.uniform(-10, 70), random.uniform(-10, 70), random.choice((0.1, 1, 10, 80))
+			self.tree.insert(None, (x, y, x + random.uniform(0, w), y + random.uniform(0, w)))
+
+		for h in range(0, 266, 3): self.tree.remove(h)
+		for h in range(1, 266, 5):
+			if h not in self.tree: continue
+			x, y = random.uniform(0, 60), random.uniform(0, 60)
+			self.tree.update(h, box=(x, y, x + 1, y + 1))
+
+		boxes = self.tree.boxes
+		for i in range(50):
+			l, t = random.uniform(-10, 70), random.uniform(-10, 70)
+			r, b = l + random.uniform(0, 20), t + random.uniform(0, 20)
+			self.assertEqual( sorted(h for h in boxes if boxes[h][0] <= r and boxes[h][2] >= l and boxes[h][1] <= b and boxes[h][3] >= t),
+			                  self.tree.query_box(l, t, r, b) )
+
+			p1, p2 = Vector(l, t), Vector(r, b)
+			self.assertEqual( sorted(h for h in boxes if clip_ray_box(p1, p2, boxes[h]) is not None), self.tree.query_ray(p1, p2) )
+
+			# the same queries as the hash grid, which shares the handle API
+			self.assertEqual( sorted(h for h in boxes if distance_point_box_squared(p1, boxes[h]) <= 25), self.tree.query_radius(p1, 5) )
+
+	def test_stats(self):
+		stats = self.tree.stats
+		self.assertEqual( 66, stats['objects'] )
+		self.assertEqual( 1, stats['outside'] )
+		self.assertEqual( [1, 0, 0, 0, 0, 64], stats['objects_per_depth'] )
+		self.assertEqual( 5, stats['depth'] )
+
+		for h in range(64): self.tree.remove(h)
+		self.assertEqual( 1, self.tree.stats['nodes'] )
+		self.assertEqual( [(0, 0, 0)], list(self.tree.counts) )
+
+	def test_index(self):
+		segs = [ (Vector(x, 0), Vector(x + 0.5, 1)) for x in range(100) ] + [ (Vector(0, 2), Vector(100, 2)) ]
+		tree = LooseQuadTree.from_linesegs(segs)
+		self.assertEqual( 0, tree.stats['outside'] )
+
+		p1, p2 = Vector(10.2, -1), Vector(10.7, 3)
+		self.assertEqual( [10, 100], tree.query_lineseg(p1, p2) )
+		self.assertEqual( intersect_linesegs_lineseg(segs, p1, p2), intersect_linesegs_lineseg(segs, p1, p2, index=tree) )
+		self.assertEqual( intersect_linesegs_ray(segs, p2, p1), intersect_linesegs_ray(segs, p2, p1, index=tree) )
+
+class TestTriangulation(unittest.TestCase):
+
+	def setUp(self):
+		self.square = Polygon.from_tuples([ (0, 0), (4, 0), (4, 4), (0, 4) ])
+		self.hole = Polygon.from_tuples([ (1, 1), (1, 3), (3, 3), (3, 1) ])
+
+	def triangle_areas(self, coords, indices):
+		points = [ Vector(coords[2 * i], coords[2 * i + 1]) for i in indices ]
+		return [ Polygon.signed_area_s(points[k:k + 3]) for k in range(0, len(points), 3) ]
+
+	def test_holes(self):
+		coords, indices = Polygon.triangulate(self.square, [self.hole])
+		self.assertEqual( [0, 0, 4, 0, 4, 4, 0, 4, 1, 1, 1, 3, 3, 3, 3, 1], list(coords) )
+
+		# n + 2h - 2 triangles, all clockwise, covering everything but the hole
+		areas = self.triangle_areas(coords, indices)
+		self.assertEqual( 8, len(areas) )
+		self.assertTrue( all(a > 0 for a in areas) )
+		self.assertAlmostEqual( 12, sum(areas) )
+
+		shape = PolygonWithHoles(self.square, [self.hole])
+		coords, indices = Polygon.triangulate(shape)
+		self.assertAlmostEqual( 12, sum(self.triangle_areas(coords, indices)) )
+
+		regions = PolygonSet([ shape, Polygon.regular(Vector(10, 0), 1, 6) ])
+		coords, indices = Polygon.triangulate(regions)
+		self.assertEqual( 14, len(coords) // 2 )
+		self.assertEqual( 12, len(indices) // 3 )
+		self.assertAlmostEqual( regions.area, sum(self.triangle_areas(coords, indices)) )
+
+	def test_many_vertices(self):
+		n = 2000
+		wavy = Polygon.from_pointlist([ Vector(math.cos(2 * math.pi * i / n), math.sin(2 * math.pi * i / n)) * (100 + 10 * math.sin(40 * math.pi * i / n)) for i in range(n) ])
+		holes = [ Polygon.regular(Vector(x, y), 3, 5) for x in range(-40, 41, 20) for y in range(-40, 41, 20) ]
+
+		coords, indices = Polygon.triangulate(wavy, holes)
+		areas = self.triangle_areas(coords, indices)
+		self.assertEqual( n + 5 * len(holes) + 2 * len(holes) - 2, len(areas) )
+		self.assertTrue( all(a > -EPSILON for a in areas) )
+		self.assertAlmostEqual( abs(wavy.get_signed_area()) - sum(abs(h.get_signed_area()) for h in holes), sum(areas), 6 )
+
+	def test_degenerate(self):
+		self.assertEqual( [], list(Polygon.triangulate(Polygon.from_tuples([ (0, 0), (1, 1) ]))[1]) )
+		self.assertEqual( [], list(Polygon.triangulate(Polygon.from_tuples([ (0, 0), (1, 1), (2, 2) ]))[1]) )
+
+		# duplicate points are skipped
+		coords, indices = Polygon.triangulate(Polygon.from_tuples([ (0, 0), (4, 0), (4, 0), (4, 4), (0, 4) ]))
+		self.assertAlmostEqual( 16, sum(self.triangle_areas(coords, indices)) )
+
+class TestResultCache(unittest.TestCase):
+
+	def setUp(self):
+		self.square = Polygon.regular( Vector( 0.0, 0.0 ), 5, 4 )
+		self.triangle = Polygon.regular( Vector( 2.0, 0.0 ), 4, 3 )
+
+	def test_key(self):
+		moved = Polygon.from_pointlist([ p + Vector(EPSILON * 0.01, 0) for p in self.square.points ])
+		self.assertEqual( ResultCache.key('u', self.square, self.triangle), ResultCache.key('u', moved, self.triangle) )
+		self.assertNotEqual( ResultCache.key('u', self.square, self.triangle), ResultCache.key('i', self.square, self.triangle) )
+		self.assertNotEqual( ResultCache.key('u', self.square, self.triangle), ResultCache.key('u', self.triangle, self.square) )
+		self.assertNotEqual( ResultCache.key('u', [self.square, self.triangle]), ResultCache.key('u', [[self.square], self.triangle]) )
+		self.assertRaises( TypeError, ResultCache.key, 'u', object() )
+
+	def test_installed(self):
+		self.assertEqual( None, get_result_cache() )
+
+		with ResultCache() as cache:
+			self.assertEqual( cache, get_result_cache() )
+
+			union = Polygon.union(self.square, self.triangle)
+			self.assertEqual( union, Polygon.boolean_operation(self.square.clone(), self.triangle, operation='u') )
+
+			offset = Polygon.offset([self.square], 1.0)
+			offset[0].add_point(Vector(100, 100))
+			self.assertEqual( Polygon.offset([self.square], 1.0, tip_decorator_pointy), Polygon.offset([self.square], amount=1.0) )
+			self.assertEqual( 4, len(Polygon.offset([self.square], 1.0)[0]) )
+
+			Polygon.offset([self.square], 1.0, debug_callback=lambda p, color, text: None)
+
+		self.assertEqual( None, get_result_cache() )
+		self.assertEqual( { 'hits': 4, 'disk_hits': 0, 'misses': 2, 'evictions': 0, 'disk_evictions': 0, 'entries': 2, 'bytes': cache.size }, cache.stats )
+
+	def test_closures(self):
+		def make_tip(size):
+			def tip(a, b, c, d, is_cw):
+				return [ a + (b - a).normalize() * size ] if size else [ a ]
+			return tip
+
+		square = self.square.clone_ccw()
+		expected = [ Polygon.offset([square], 1.0, make_tip(size)) for size in (0, 0.5) ]
+		self.assertNotEqual( expected[0], expected[1] )
+
+		with ResultCache() as cache:
+			self.assertEqual( expected, [ Polygon.offset([square], 1.0, make_tip(size)) for size in (0, 0.5) ] )
+			self.assertEqual( Polygon.offset([square], 1.0), Polygon.offset([square], 1.0, functools.partial(tip_decorator_pointy)) )
+			self.assertEqual( Polygon.offset([square], 1.0), Polygon.offset([square], 1.0, lambda *args: tip_decorator_pointy(*args)) )
+
+		self.assertEqual( 1, len(cache) )
+		self.assertRaises( UncacheableError, ResultCache.key, 'o', make_tip(0) )
+		self.assertEqual( ResultCache.key('o', tip_decorator_pointy), ResultCache.key('o', tip_decorator_pointy) )
+
+	def test_eviction(self):
+		cache = ResultCache(max_entries=2)
+		for i in range(3):
+			cache.put(str(i), [i])
+
+		self.assertEqual( ['1', '2'], list(cache.entries) )
+		self.assertEqual( [1], cache.get('1') )
+
+		cache.put('3', [3])
+		self.assertEqual( ['1', '3'], list(cache.entries) )
+		self.assertEqual( None, cache.get('2') )
+		self.assertEqual( 2, cache.stats['evictions'] )
+
+		cache = ResultCache(max_bytes=len(pickle.dumps([0] * 10, pickle.HIGHEST_PROTOCOL)) + 1)
+		cache.put('a', [0] * 10)
+		cache.put('b', [0] * 10)
+		self.assertEqual( ['b'], list(cache.entries) )
+
+	def test_disk(self):
+		with tempfile.TemporaryDirectory() as directory:
+			cache = ResultCache(directory=directory)
+			union = cache.call('u', Polygon.union, self.square, self.triangle)
+
+			restarted = ResultCache(directory=directory)
+			self.assertEqual( union, restarted.call('u', Polygon.union, self.square, self.triangle) )
+			self.assertEqual( 1, restarted.stats['disk_hits'] )
+			self.assertEqual( 0, restarted.stats['misses'] )
+
+			restarted.clear(disk=True)
+			self.assertEqual( None, ResultCache(directory=directory).get(ResultCache.key('u', self.square, self.triangle)) )
+
+	def test_disk_stale(self):
+		with tempfile.TemporaryDirectory() as directory:
+			cache = ResultCache(directory=directory)
+			for i, data in enumerate([ b'ccollections\nNoSuch\n.', b'cnosuchmodule\nX\n.', b'garbage' ]):
+				with open(os.path.join(directory, 'stale%d.pickle' % i), 'wb') as f:
+					f.write(data)
+
+				self.assertEqual( None, cache.get('stale%d' % i) )
+				self.assertFalse( os.path.exists(os.path.join(directory, 'stale%d.pickle' % i)) )
+
+			self.assertEqual( 3, cache.stats['misses'] )
+
+	def test_disk_bounds(self):
+		with tempfile.TemporaryDirectory() as directory:
+			cache = ResultCache(max_entries=1, directory=directory, max_disk_entries=3)
+			for i in range(5):
+				cache.put(str(i), [i])
+				os.utime(os.path.join(directory, '%d.pickle' % i), (i, i))
+
+			self.assertEqual( ['2.pickle', '3.pickle', '4.pickle'], sorted(os.listdir(directory)) )
+			self.assertEqual( 2, cache.stats['disk_evictions'] )
+
+			# a disk hit counts as a use
+			self.assertEqual( [2], cache.get('2') )
+			self.assertEqual( 1, cache.prune(max_entries=2) )
+			self.assertEqual( ['2.pickle', '4.pickle'], sorted(os.listdir(directory)) )
+
+			size = os.path.getsize(os.path.join(directory, '2.pickle'))
+			self.assertEqual( 1, ResultCache(directory=directory, max_disk_bytes=size).stats['disk_evictions'] )
+			self.assertEqual( ['2.pickle'], sorted(os.listdir(directory)) )
+
 if __name__ == '__main__':
 	unittest.main()
@@ -20,9 +20,17 @@ setup(	name='py2d',
 		Extension("py2d.Navigation", ["py2d/Navigation.py"]),
 		Extension("py2d.SVG", ["py2d/SVG.py"]),
 		Extension("py2d.Math", ["py2d/Math/__init__.py"]),
+		Extension("py2d.Math.LooseQuadTree", ["py2d/Math/LooseQuadTree.py"]),
 		Extension("py2d.Math.Operations", ["py2d/Math/Operations.py"]),
 		Extension("py2d.Math.Polygon", ["py2d/Math/Polygon.py"]),
+		Extension("py2d.Math.ResultCache", ["py2d/Math/ResultCache.py"]),
+		Extension("py2d.Math.RTree", ["py2d/Math/RTree.py"]),
+		Extension("py2d.Math.SegmentBVH", ["py2d/Math/SegmentBVH.py"]),
+		Extension("py2d.Math.SpatialHashGrid", ["py2d/Math/SpatialHashGrid.py"]),
+		Extension("py2d.Math.SpatialIndex", ["py2d/Math/SpatialIndex.py"]),
 		Extension("py2d.Math.Transform", ["py2d/Math/Transform.py"]),
+		Extension("py2d.Math.Triangulation", ["py2d/Math/Triangulation.py"]),
 		Extension("py2d.Math.Vector", ["py2d/Math/Vector.py"]),
+		Extension("py2d.Math.VectorArray", ["py2d/Math/VectorArray.py"]),
 	]
 )